@@ -0,0 +1,93 @@
+"""
+###############################################################################
+# Library to run blocking fetch, parse and publish jobs concurrently in
+# worker threads with asyncio, with bounded concurrency and timeouts
+# seeAlso: https://docs.python.org/3/library/asyncio-task.html
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["AsyncEngine"]
+
+import asyncio
+import logging
+
+
+class AsyncEngine:
+    """
+    Class to run blocking functions concurrently
+
+    Every job runs in a worker thread, at most concurrency jobs run at the same time. The HTTP and MQTT clients are
+    blocking, so the jobs overlap the network wait times of the requests and the publishing.
+
+    :param concurrency: The maximum number of jobs running at the same time (default: 4)
+    :param timeout: The default timeout of a job in seconds, None for no timeout (default: None)
+    :raise ValueError: If the concurrency is less than 1
+    """
+
+    __unset = object()
+
+    def __init__(self, concurrency: int = 4, timeout: float = None):
+        self.logger = logging.getLogger(__name__)
+        if concurrency < 1:
+            raise ValueError(f"Invalid concurrency: {concurrency}. Must be at least 1.")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.__semaphore = None
+        self.__loop = None
+
+    def __get_semaphore(self) -> asyncio.Semaphore:
+        # a semaphore is bound to the event loop it is used in, every asyncio.run() creates a new loop
+        loop = asyncio.get_running_loop()
+        if self.__semaphore is None or self.__loop is not loop:
+            self.__semaphore = asyncio.Semaphore(self.concurrency)
+            self.__loop = loop
+        return self.__semaphore
+
+    async def run(self, function: callable, *args, timeout: float = __unset, **kwargs) -> any:
+        """
+        Run a blocking function in a worker thread
+
+        :param function: The function to run
+        :param args: The positional arguments of the function
+        :param timeout: The timeout in seconds, None for no timeout (default: the timeout of the engine)
+        :param kwargs: The keyword arguments of the function
+        :return: The return value of the function
+        :raise TimeoutError: If the function does not return within the timeout
+        """
+        if timeout is self.__unset:
+            timeout = self.timeout
+        async with self.__get_semaphore():
+            self.logger.debug("Run %s in worker thread", getattr(function, "__name__", function))
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(function, *args, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                # the worker thread cannot be cancelled, its result is dropped
+                raise TimeoutError(f"{getattr(function, '__name__', function)} did not finish within {timeout}s")
+
+    async def gather(self, jobs: list, raise_first: bool = False) -> list:
+        """
+        Wait for all jobs, a failing job does not cancel the others
+
+        :param jobs: The awaitables to wait for
+        :param raise_first: Raise the first exception after all jobs finished (default: False)
+        :return: list with the result or the exception of every job
+        :raise Exception: The first exception of the jobs if raise_first is True
+        """
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            self.logger.error("Job failed: %s", error)
+        if raise_first and len(errors) > 0:
+            raise errors[0]
+        return results
@@ -0,0 +1,226 @@
+"""
+###############################################################################
+# Library to detect significant changes of weather data payloads per topic
+# with absolute or relative deadbands, to skip or shrink redundant messages
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["ChangeDetector"]
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+
+
+class ChangeDetector:
+    """
+    Class that keeps the last published values per topic and filters payloads without significant change
+
+    The payload is compared value by value. A numeric value has changed, if the difference to the last published value
+    is larger than the deadband of the field. A deadband is absolute (e.g. 0.2) or relative to the last published
+    value (e.g. "5%"). Without deadband every change is significant.
+    Timestamps (time, date, message_timestamp, fetched_at) are not compared, but always published.
+    The filtered values are remembered as published by commit(), after the messages are completed, so a payload that
+    could not be published is not taken as unchanged in the next cycle.
+
+    :param deadbands: dict with the deadband per field name (default: None, no deadbands)
+    :param mode: "skip" to publish the full payload if anything changed or "delta" to publish only the changed
+        fields (default: "skip")
+    :param refresh_interval: Publish the full payload at least every refresh_interval seconds (default: None, never)
+    :param state_file: JSON file to persist the last published values across restarts (default: None)
+    :param clock: Function that returns the current unix timestamp (default: time.time)
+    """
+
+    __modes = ("skip", "delta")
+    __ignored = ("time", "date", "message_timestamp", "fetched_at")
+    # keys that are kept in a delta payload although they did not change
+    __context = ("location", "timezone", "stale")
+
+    def __init__(
+        self,
+        deadbands: dict = None,
+        mode: str = "skip",
+        refresh_interval: float = None,
+        state_file: str = None,
+        clock: Callable = time.time,
+    ):
+        self.logger = logging.getLogger(__name__)
+        if mode not in self.__modes:
+            raise ValueError(f"Invalid change detection mode: {mode}. Must be one of {list(self.__modes)}.")
+        self.mode = mode
+        self.deadbands = dict()
+        for field, deadband in (deadbands or dict()).items():
+            self.deadbands[field] = self.parse_deadband(deadband)
+        self.refresh_interval = refresh_interval
+        self.state_file = state_file
+        self.clock = clock
+        self.__state = dict()
+        self.__pending = dict()
+        self.__lock = threading.Lock()
+        if state_file is not None and os.path.isfile(state_file):
+            with open(state_file, encoding="utf-8") as f:
+                self.__state = json.load(f)
+            self.logger.debug("Loaded last published values of %s topics from %s", len(self.__state), state_file)
+
+    @staticmethod
+    def parse_deadband(deadband: float | str) -> tuple:
+        """
+        Parse a deadband
+
+        :param deadband: The absolute deadband as number or the relative deadband as percentage, e.g. "5%"
+        :return: tuple (absolute deadband, relative deadband as fraction)
+        :raise ValueError: If the deadband is not valid
+        """
+        if isinstance(deadband, str) and deadband.strip().endswith("%"):
+            value = (0.0, float(deadband.strip()[0:-1]) / 100)
+        else:
+            value = (float(deadband), 0.0)
+        if value[0] < 0 or value[1] < 0:
+            raise ValueError(f"Invalid deadband: {deadband}. Must not be negative.")
+        return value
+
+    @classmethod
+    def from_string(cls, deadbands: str, **kwargs) -> "ChangeDetector":
+        """
+        Create the change detector from a comma separated list of deadbands
+
+        :param deadbands: The deadbands, e.g. "temperature_2m=0.2,relative_humidity_2m=5%"
+        :param kwargs: Further arguments of the ChangeDetector
+        :return: The change detector
+        :raise ValueError: If a deadband is not valid
+        """
+        result = dict()
+        for item in deadbands.split(","):
+            if item.strip() == "":
+                continue
+            if "=" not in item:
+                raise ValueError(f"Invalid deadband: {item.strip()}. Expected <field>=<value>.")
+            field, deadband = item.split("=", 1)
+            result[field.strip()] = deadband.strip()
+        return cls(deadbands=result, **kwargs)
+
+    def __flatten(self, payload: dict, prefix: str = "") -> dict:
+        result = dict()
+        for key, value in payload.items():
+            if key in self.__ignored:
+                continue
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                result.update(self.__flatten(value, f"{path}."))
+            elif isinstance(value, (list, tuple)):
+                result.update(self.__flatten(dict(zip(map(str, range(len(value))), value)), f"{path}."))
+            else:
+                result[path] = value
+        return result
+
+    def __deadband(self, path: str) -> tuple:
+        for name in reversed(path.split(".")):
+            if name in self.deadbands.keys():
+                return self.deadbands[name]
+        return (0.0, 0.0)
+
+    def __changed(self, path: str, last: any, value: any) -> bool:
+        if isinstance(value, bool) or isinstance(last, bool):
+            return value != last
+        if isinstance(value, (int, float)) and isinstance(last, (int, float)):
+            # NaN is the only value that is not equal to itself
+            if value != value or last != last:
+                return (value != value) != (last != last)
+            absolute, relative = self.__deadband(path)
+            return abs(value - last) > max(absolute, relative * abs(last))
+        return value != last
+
+    def filter(self, topic: str, payload: dict) -> dict | None:
+        """
+        Filter a payload before it is published to a topic, the values are remembered as published by commit()
+
+        :param topic: The MQTT topic
+        :param payload: The payload
+        :return: The payload to publish, only the changed fields in delta mode, or None if nothing changed
+        """
+        values = self.__flatten(payload)
+        now = self.clock()
+        with self.__lock:
+            state = self.__state.get(topic)
+            if (
+                state is None
+                or set(state["values"].keys()) != set(values.keys())
+                or (self.refresh_interval is not None and now - state["refreshed_at"] >= self.refresh_interval)
+            ):
+                # first message, changed structure or forced refresh
+                self.__pending[topic] = {"values": values, "refreshed_at": now}
+                return payload
+
+            changed = [path for path, value in values.items() if self.__changed(path, state["values"][path], value)]
+            if len(changed) == 0:
+                self.__pending.pop(topic, None)
+                return None
+            if self.mode == "skip":
+                self.__pending[topic] = {"values": values, "refreshed_at": state["refreshed_at"]}
+                return payload
+
+            # delta: publish the changed fields of each block, a field with a list or dict is published completely
+            fields = {tuple(path.split(".")[0:2]) for path in changed}
+            result = dict()
+            for key, value in payload.items():
+                if key in self.__ignored or key in self.__context:
+                    result[key] = value
+                elif isinstance(value, dict):
+                    block = {k: v for k, v in value.items() if k in self.__ignored or (key, k) in fields}
+                    if len(block) > len([k for k in value.keys() if k in self.__ignored]):
+                        result[key] = block
+                elif (key,) in fields:
+                    result[key] = value
+            pending = {"values": dict(state["values"]), "refreshed_at": state["refreshed_at"]}
+            for path, value in values.items():
+                if tuple(path.split(".")[0:2]) in fields:
+                    pending["values"][path] = value
+            self.__pending[topic] = pending
+            return result
+
+    def commit(self, topic: str = None) -> None:
+        """
+        Remember the filtered values as published, after the messages are completed
+
+        :param topic: The MQTT topic (default: None, all filtered topics)
+        """
+        with self.__lock:
+            topics = list(self.__pending.keys()) if topic is None else [topic]
+            for name in topics:
+                if name in self.__pending.keys():
+                    self.__state[name] = self.__pending.pop(name)
+
+    def discard(self) -> None:
+        """
+        Forget the filtered values that could not be published, they are published again with the next filter()
+        """
+        with self.__lock:
+            self.__pending = dict()
+
+    def save(self) -> None:
+        """
+        Persist the last published values to the state file
+        """
+        if self.state_file is None:
+            return
+        with self.__lock:
+            data = json.dumps(self.__state)
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(f.name, self.state_file)
@@ -0,0 +1,178 @@
+"""
+###############################################################################
+# Library to combine the parsed weather data of multiple weather models into
+# ensemble statistics (mean, minimum, maximum, spread and the agreement on
+# categorical variables like the weather code)
+# seeAlso: https://open-meteo.com/en/docs (models)
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["EnsembleAggregator"]
+
+import copy
+import logging
+import numbers
+import warnings
+
+import numpy as np
+
+# the statistics that can be added per variable, the mean replaces the value of the variable
+STATISTICS = ["min", "max", "spread"]
+# variables with classes instead of amounts, they are combined to the most frequent value and its agreement
+CATEGORICAL = ["weather_code", "is_day"]
+# the blocks with a time axis
+TIMESERIES_BLOCKS = ["daily", "hourly", "minutely_15"]
+
+
+class EnsembleAggregator:
+    """
+    Class to combine the parsed weather data of the weather models of one location
+
+    Every variable gets the mean of the models, directions (e.g. wind_direction_10m) the circular mean. The statistics
+    are added as <variable>_ensemble_min, <variable>_ensemble_max and <variable>_ensemble_spread (the standard
+    deviation of the models). Categorical variables like the weather code get the most frequent value of the models,
+    the more severe one on a tie, and <variable>_ensemble_agreement with the share of the models that agree on it.
+    Timestamps (e.g. sunrise) are taken from the first model. Missing values (NaN) of a model are ignored.
+
+    :param statistics: The statistics to add per variable (default: min, max and spread)
+    :param include_models: Keep the weather data of every model in "models" (default: False)
+    """
+
+    def __init__(self, statistics: list = None, include_models: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.statistics = list(STATISTICS) if statistics is None else list(statistics)
+        for statistic in self.statistics:
+            if statistic not in STATISTICS:
+                raise ValueError(f"Invalid ensemble statistic: {statistic}. Must be one of {', '.join(STATISTICS)}.")
+        self.include_models = include_models
+
+    @staticmethod
+    def mode(values: np.ndarray) -> tuple:
+        """
+        Get the most frequent value of every column
+
+        :param values: 2D array with one row per model, NaN for missing values
+        :return: tuple with the array of the most frequent values and the array of the share of agreeing models
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        codes = np.where(valid, values, 0).astype(np.int64)
+        columns = np.broadcast_to(np.arange(values.shape[1]), values.shape)
+        counts = np.zeros((int(codes.max(initial=0)) + 1, values.shape[1]), dtype=np.int64)
+        np.add.at(counts, (codes[valid], columns[valid]), 1)
+        # the highest code wins a tie, it is the more severe weather
+        result = (len(counts) - 1 - np.argmax(counts[::-1], axis=0)).astype(np.float64)
+        models = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            agreement = np.round(counts.max(axis=0) / models, 2)
+        result[models == 0] = np.nan
+        return result, agreement
+
+    @staticmethod
+    def circular_mean(degrees: np.ndarray) -> np.ndarray:
+        """
+        Get the mean direction of every column
+
+        :param degrees: 2D array of directions in degrees with one row per model, NaN for missing values
+        :return: array of the mean directions in degrees from 0 to 360
+        """
+        radians = np.deg2rad(np.asarray(degrees, dtype=np.float64))
+        with np.errstate(invalid="ignore"):
+            mean = np.arctan2(np.nanmean(np.sin(radians), axis=0), np.nanmean(np.cos(radians), axis=0))
+        return np.round(np.rad2deg(mean), 0) % 360
+
+    def __combine_columns(self, field: str, values: np.ndarray) -> dict:
+        """
+        Combine the values of a variable of all models
+
+        :param field: The variable name
+        :param values: 2D array with one row per model
+        :return: dict with the combined column of the variable and of its statistics
+        """
+        if field in CATEGORICAL:
+            result, agreement = self.mode(values)
+            return {field: result, f"{field}_ensemble_agreement": agreement}
+        if "direction" in field:
+            return {field: self.circular_mean(values)}
+
+        result = dict()
+        with warnings.catch_warnings():
+            # columns where all models are NaN give NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            result[field] = np.round(np.nanmean(values, axis=0), 2)
+            if "min" in self.statistics:
+                result[f"{field}_ensemble_min"] = np.nanmin(values, axis=0)
+            if "max" in self.statistics:
+                result[f"{field}_ensemble_max"] = np.nanmax(values, axis=0)
+            if "spread" in self.statistics:
+                result[f"{field}_ensemble_spread"] = np.round(np.nanstd(values, axis=0), 2)
+        return result
+
+    def __combine_current(self, currents: list) -> dict:
+        result = dict()
+        for key, value in currents[0].items():
+            if not isinstance(value, numbers.Number) or isinstance(value, bool):
+                # e.g. the time and the weather code texts, the texts are translated again by the caller
+                result[key] = value
+                continue
+            values = np.array([[current.get(key, np.nan)] for current in currents], dtype=np.float64)
+            for name, column in self.__combine_columns(key, values).items():
+                result[name] = float(column[0])
+            if key in CATEGORICAL and not np.isnan(result[key]):
+                result[key] = int(result[key])
+        return result
+
+    def __combine_block(self, blocks: list) -> any:
+        result = copy.copy(blocks[0])
+        result.columns = dict()
+        result.timestamp_columns = set(blocks[0].timestamp_columns)
+        for field, column in blocks[0].columns.items():
+            if field in blocks[0].timestamp_columns:
+                result.columns[field] = column
+                continue
+            values = np.stack([block.columns.get(field, np.full(len(column), np.nan)) for block in blocks])
+            result.columns.update(self.__combine_columns(field, values))
+        return result
+
+    def combine(self, results: list, models: list) -> dict:
+        """
+        Combine the parsed weather data of the models of one location
+
+        :param results: list of the parsed weather data per model, "current" as dict, the other blocks as WeatherBlock
+        :param models: The names of the models in the order of the results
+        :return: The combined weather data with the models in "ensemble" and optional the data per model in "models"
+        """
+        if len(results) == 0:
+            raise ValueError("No weather data to combine.")
+        combined = dict(results[0])
+        combined["ensemble"] = {"models": list(models)}
+
+        if "current" in combined.keys():
+            combined["current"] = self.__combine_current([result["current"] for result in results])
+        for block in TIMESERIES_BLOCKS:
+            if block not in combined.keys():
+                continue
+            blocks = [result[block] for result in results if block in result.keys()]
+            # models with another time axis (e.g. a shorter forecast range) are not combined
+            matching = [b for b in blocks if np.array_equal(b.time, blocks[0].time)]
+            if len(matching) < len(blocks):
+                self.logger.warning(
+                    "Ignore %s of %s models with another %s time axis", len(blocks) - len(matching), len(blocks), block
+                )
+            combined[block] = self.__combine_block(matching)
+
+        if self.include_models:
+            combined["models"] = dict(zip(models, results))
+        self.logger.debug("Combined the weather data of %s models", len(results))
+        return combined
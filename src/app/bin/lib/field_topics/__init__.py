@@ -0,0 +1,147 @@
+"""
+###############################################################################
+# Library to fan out weather data payloads into one MQTT topic per field
+# and to create the matching Home Assistant MQTT discovery messages
+# seeAlso: https://www.home-assistant.io/integrations/mqtt/#mqtt-discovery
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["FieldTopics"]
+
+import json
+import logging
+import math
+import re
+
+# unit and Home Assistant device class by field name prefix, the first matching prefix is used
+FIELD_UNITS = [
+    ("temperature", "°C", "temperature"),
+    ("apparent_temperature", "°C", "temperature"),
+    ("dew_point", "°C", "temperature"),
+    ("soil_temperature", "°C", "temperature"),
+    ("relative_humidity", "%", "humidity"),
+    ("precipitation_probability", "%", None),
+    ("precipitation_hours", "h", "duration"),
+    ("precipitation", "mm", "precipitation"),
+    ("rain", "mm", "precipitation"),
+    ("showers", "mm", "precipitation"),
+    ("snowfall", "cm", None),
+    ("snow_depth", "m", "distance"),
+    ("pressure_msl", "hPa", "atmospheric_pressure"),
+    ("surface_pressure", "hPa", "atmospheric_pressure"),
+    ("cloud_cover", "%", None),
+    ("visibility", "m", "distance"),
+    ("wind_speed", "km/h", "wind_speed"),
+    ("wind_gusts", "km/h", "wind_speed"),
+    ("wind_direction", "°", None),
+    ("sunshine_duration", "s", "duration"),
+    ("daylight_duration", "s", "duration"),
+    ("shortwave_radiation", "W/m²", "irradiance"),
+    ("sunrise", None, "timestamp"),
+    ("sunset", None, "timestamp"),
+]
+
+
+class FieldTopics:
+    """
+    Class to fan out a weather data payload into one topic per field
+
+    Every field of a block is published to <topic>/<block>/<field>, e.g. <topic>/current/temperature_2m.
+    Scalar values are published as plain text, lists and dicts (e.g. hourly forecasts) as JSON.
+
+    :param discovery_prefix: The Home Assistant discovery prefix (default: "homeassistant")
+    :param device_name: The name of the Home Assistant device (default: "Weather")
+    """
+
+    def __init__(self, discovery_prefix: str = "homeassistant", device_name: str = "Weather"):
+        self.logger = logging.getLogger(__name__)
+        self.discovery_prefix = discovery_prefix.rstrip("/")
+        self.device_name = device_name
+
+    @staticmethod
+    def format_value(value: any) -> str:
+        """
+        Format a value as MQTT payload
+
+        :param value: The value
+        :return: The value as plain text for scalars, as JSON for lists and dicts, NaN as null
+        """
+        if isinstance(value, str):
+            return value
+        if isinstance(value, float) and math.isnan(value):
+            return "null"
+        if isinstance(value, list):
+            value = [None if isinstance(v, float) and math.isnan(v) else v for v in value]
+        return json.dumps(value, ensure_ascii=False)
+
+    def messages(self, topic: str, payload: dict) -> list:
+        """
+        Fan out a payload into one message per field
+
+        :param topic: The MQTT base topic
+        :param payload: The weather data payload
+        :return: list of tuples (topic, payload)
+        """
+        result = list()
+        for key, value in payload.items():
+            if isinstance(value, dict):
+                for field, field_value in value.items():
+                    result.append((f"{topic.rstrip('/')}/{key}/{field}", self.format_value(field_value)))
+            else:
+                result.append((f"{topic.rstrip('/')}/{key}", self.format_value(value)))
+        return result
+
+    def discovery_messages(self, topic: str, payload: dict, node_id: str) -> list:
+        """
+        Create the Home Assistant MQTT discovery messages for the scalar fields of a payload
+
+        :param topic: The MQTT base topic of the field topics
+        :param payload: The weather data payload
+        :param node_id: The unique id of the weather data source, e.g. the location id or the mode
+        :return: list of tuples (discovery topic, discovery config as JSON)
+        """
+        node_id = re.sub(r"[^A-Za-z0-9_-]", "_", node_id)
+        device = {
+            "identifiers": [f"weather2mqtt_{node_id}"],
+            "name": f"{self.device_name} {node_id}",
+            "manufacturer": "Open-Meteo",
+            "model": "weather2mqtt",
+        }
+        result = list()
+        for block, values in payload.items():
+            if not isinstance(values, dict) or block in ["location", "timezone"]:
+                continue
+            for field, value in values.items():
+                if isinstance(value, (list, dict)) or field == "time":
+                    continue
+                object_id = f"{node_id}_{block}_{field}"
+                config = {
+                    "name": f"{block} {field}".replace("_", " "),
+                    "unique_id": f"weather2mqtt_{object_id}",
+                    "object_id": object_id,
+                    "state_topic": f"{topic.rstrip('/')}/{block}/{field}",
+                    "device": device,
+                }
+                for prefix, unit, device_class in FIELD_UNITS:
+                    if field.startswith(prefix):
+                        if unit is not None:
+                            config["unit_of_measurement"] = unit
+                        if device_class is not None:
+                            config["device_class"] = device_class
+                        if block == "current" and unit is not None:
+                            config["state_class"] = "measurement"
+                        break
+                discovery_topic = f"{self.discovery_prefix}/sensor/weather2mqtt_{node_id}/{block}_{field}/config"
+                result.append((discovery_topic, json.dumps(config, ensure_ascii=False)))
+        return result
@@ -0,0 +1,365 @@
+"""
+###############################################################################
+# Library to cache Open-Meteo API responses by location, weather model and
+# requested variables with stale-while-revalidate semantic.
+# The cache expires with the update cadence of the weather models.
+# seeAlso: https://open-meteo.com/en/docs/model-updates
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["CacheEntry", "ForecastCache", "MODEL_UPDATE_INTERVALS"]
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+# update interval of the weather models in seconds
+MODEL_UPDATE_INTERVALS = {
+    "best_match": 3600,
+    "ecmwf_ifs04": 21600,
+    "ecmwf_ifs025": 21600,
+    "ecmwf_aifs025": 21600,
+    "ecmwf_aifs025_single": 21600,
+    "cma_grapes_global": 21600,
+    "bom_access_global": 21600,
+    "gfs_seamless": 3600,
+    "gfs_global": 21600,
+    "gfs_hrrr": 3600,
+    "gfs_graphcast025": 21600,
+    "jma_seamless": 10800,
+    "jma_msm": 10800,
+    "jma_gsm": 21600,
+    "icon_seamless": 10800,
+    "icon_global": 21600,
+    "icon_eu": 10800,
+    "icon_d2": 10800,
+    "gem_seamless": 21600,
+    "gem_global": 43200,
+    "gem_regional": 21600,
+    "gem_hrdps_continental": 21600,
+    "meteofrance_seamless": 10800,
+    "meteofrance_arpege_world": 21600,
+    "meteofrance_arpege_europe": 21600,
+    "meteofrance_arome_france": 10800,
+    "meteofrance_arome_france_hd": 3600,
+    "metno_seamless": 3600,
+    "metno_nordic": 3600,
+    "knmi_seamless": 3600,
+    "dmi_seamless": 10800,
+    "ukmo_seamless": 3600,
+    "ukmo_global_deterministic_10km": 21600,
+    "ukmo_uk_deterministic_2km": 3600,
+    "italia_meteo_arpae_icon_2i": 10800,
+    "meteoswiss_icon_ch1": 10800,
+    "meteoswiss_icon_ch2": 21600,
+}
+# current conditions and 15 minutely data are updated every 15 minutes, independent of the model
+FAST_UPDATE_INTERVAL = 900
+DEFAULT_UPDATE_INTERVAL = 3600
+
+
+class CacheEntry:
+    """
+    Class that holds a cached API response
+
+    :param body: The raw response body
+    :param fetched_at: Unix timestamp when the response was received
+    :param expires_at: Unix timestamp when the next model update is expected
+    :param stale: True, if the entry is expired and could not be refreshed (default: False)
+    """
+
+    def __init__(self, body: bytes, fetched_at: float, expires_at: float, stale: bool = False):
+        self.body = body
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.stale = stale
+
+
+class ForecastCache:
+    """
+    Class to cache Open-Meteo API responses with stale-while-revalidate semantic
+
+    A fresh entry is returned without request. An expired entry is refreshed, with background refresh the expired
+    entry is returned immediately while the refresh runs in a thread. If the refresh fails, the expired entry is
+    returned with stale marker as long as it is not older than max_stale seconds.
+    The entries are kept in memory and, with a directory, on disk to survive restarts. Entries that are too old to be
+    returned as stale are removed from memory and disk with every refresh, at most every FAST_UPDATE_INTERVAL seconds.
+    With max_entries, the least recently used entries beyond the limit are removed from memory and disk.
+
+    :param directory: Directory to persist the responses (default: None, memory only)
+    :param background: Refresh expired entries in background (default: False)
+    :param max_stale: Maximum age in seconds after expiry to return an entry as stale (default: 86400)
+    :param expire_after: Fixed expiry in seconds instead of the model update interval (default: None)
+    :param max_entries: Maximum number of entries to keep (default: None, no limit)
+    :param clock: Function that returns the current unix timestamp (default: time.time)
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        background: bool = False,
+        max_stale: float = 86400,
+        expire_after: float = None,
+        max_entries: int = None,
+        clock: Callable = time.time,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.background = background
+        self.max_stale = max_stale
+        self.expire_after = expire_after
+        self.max_entries = max_entries
+        self.clock = clock
+        self.__entries = OrderedDict()
+        self.__errors = dict()
+        self.__refreshing = dict()
+        self.__lock = threading.Lock()
+        self.__pruned_at = None
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def key(params: dict) -> str:
+        """
+        Get the cache key of an API request. The order of variables and models does not matter.
+
+        :param params: The API request parameters
+        :return: The cache key
+        """
+        normalized = dict()
+        for name, value in params.items():
+            normalized[name] = sorted(str(v) for v in value) if isinstance(value, (list, tuple)) else str(value)
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()[0:32]
+
+    def update_interval(self, params: dict) -> float:
+        """
+        Get the update interval of the requested data.
+        The shortest interval of the requested models is used, current and 15 minutely data update every 15 minutes.
+
+        :param params: The API request parameters
+        :return: The update interval in seconds
+        """
+        if self.expire_after is not None:
+            return self.expire_after
+        if "current" in params.keys() or "minutely_15" in params.keys():
+            return FAST_UPDATE_INTERVAL
+        models = params.get("models", "best_match")
+        if isinstance(models, str):
+            models = models.split(",")
+        return min(MODEL_UPDATE_INTERVALS.get(model.strip(), DEFAULT_UPDATE_INTERVAL) for model in models or [""])
+
+    def expires_at(self, params: dict, fetched_at: float) -> float:
+        """
+        Get the expiry of a response, the next update of the model (aligned to UTC) after it was fetched
+
+        :param params: The API request parameters
+        :param fetched_at: Unix timestamp when the response was received
+        :return: The expiry as unix timestamp
+        """
+        interval = self.update_interval(params)
+        return (fetched_at // interval + 1) * interval
+
+    def get(self, params: dict, fetch: Callable) -> CacheEntry:
+        """
+        Get the response of an API request from cache or by calling fetch
+
+        :param params: The API request parameters
+        :param fetch: Function that requests the API with the parameters and returns the response body
+        :return: The cache entry
+        :raise Exception: If the response is not cached (or too old) and fetch fails
+        """
+        key = self.key(params)
+        entry = self.__load(key, params)
+        now = self.clock()
+        if entry is not None and now < entry.expires_at:
+            self.logger.debug("Forecast cache hit for %s, expires in %.0f seconds", key, entry.expires_at - now)
+            return entry
+        if entry is None or now - entry.expires_at > self.max_stale:
+            return self.__refresh(key, params, fetch)
+
+        if self.background:
+            with self.__lock:
+                failed = key in self.__errors.keys()
+            self.__refresh_in_background(key, params, fetch)
+            return CacheEntry(entry.body, entry.fetched_at, entry.expires_at, stale=failed)
+        try:
+            return self.__refresh(key, params, fetch)
+        except Exception as e:
+            self.logger.warning("Failed to refresh forecast, using data from %s: %s", time.ctime(entry.fetched_at), e)
+            return CacheEntry(entry.body, entry.fetched_at, entry.expires_at, stale=True)
+
+    def join(self, timeout: float = None) -> None:
+        """
+        Wait for running background refreshes
+
+        :param timeout: Maximum seconds to wait per refresh (default: None, wait forever)
+        """
+        with self.__lock:
+            threads = list(self.__refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def prune(self) -> int:
+        """
+        Remove the entries that are too old to be returned as stale from memory and disk.
+        The entries expire daily with a new start and end date of the request, so they are not requested again.
+
+        :return: The number of removed entries
+        """
+        now = self.clock()
+        expired = list()
+        with self.__lock:
+            self.__pruned_at = now
+            for key, entry in list(self.__entries.items()):
+                if now - entry.expires_at > self.max_stale and key not in self.__refreshing.keys():
+                    del self.__entries[key]
+                    self.__errors.pop(key, None)
+                    expired.append(key)
+            cached = set(self.__entries.keys())
+        removed = set(expired)
+        if self.directory is not None:
+            # the files not loaded yet expire at the latest with the longest update interval after they were fetched
+            longest = self.expire_after if self.expire_after is not None else max(MODEL_UPDATE_INTERVALS.values())
+            files = list()
+            for name in os.listdir(self.directory):
+                key = name[: -len(".bin")]
+                if not name.endswith(".bin") or key in cached:
+                    continue
+                try:
+                    modified_at = os.path.getmtime(self.__path(key))
+                    if key in removed or now - modified_at - longest > self.max_stale:
+                        os.remove(self.__path(key))
+                        removed.add(key)
+                    else:
+                        files.append((modified_at, key))
+                except OSError as e:
+                    self.logger.warning("Failed to remove forecast cache entry %s: %s", key, e)
+            if self.max_entries is not None:
+                # the oldest files not loaded yet are removed beyond the limit
+                files.sort()
+                for modified_at, key in files[: max(0, len(cached) + len(files) - self.max_entries)]:
+                    self.__remove(key)
+                    removed.add(key)
+        if len(removed) > 0:
+            self.logger.debug("Removed %s expired forecast cache entries", len(removed))
+        return len(removed)
+
+    def __refresh(self, key: str, params: dict, fetch: Callable) -> CacheEntry:
+        try:
+            body = fetch(params)
+        except Exception as e:
+            with self.__lock:
+                self.__errors[key] = e
+            raise
+        fetched_at = self.clock()
+        entry = CacheEntry(body, fetched_at, self.expires_at(params, fetched_at))
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            self.__errors.pop(key, None)
+            evicted = self.__evict()
+        self.__store(key, entry)
+        for evicted_key in evicted:
+            self.__remove(evicted_key)
+        self.logger.debug("Forecast cache refreshed %s, expires at %s", key, time.ctime(entry.expires_at))
+        if self.__pruned_at is None or fetched_at - self.__pruned_at >= FAST_UPDATE_INTERVAL:
+            self.prune()
+        return entry
+
+    def __refresh_in_background(self, key: str, params: dict, fetch: Callable) -> None:
+        def refresh():
+            try:
+                self.__refresh(key, params, fetch)
+            except Exception as e:
+                self.logger.warning("Failed to refresh forecast in background: %s", e)
+            finally:
+                with self.__lock:
+                    self.__refreshing.pop(key, None)
+
+        with self.__lock:
+            if key in self.__refreshing.keys():
+                return
+            self.__refreshing[key] = threading.Thread(target=refresh, name=f"refresh-{key}", daemon=True)
+            self.__refreshing[key].start()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def __evict(self) -> list:
+        """
+        Remove the least recently used entries beyond max_entries from memory, the lock must be held
+
+        :return: list of the keys of the removed entries
+        """
+        evicted = list()
+        if self.max_entries is None:
+            return evicted
+        for key in list(self.__entries.keys()):
+            if len(self.__entries) <= self.max_entries:
+                break
+            if key in self.__refreshing.keys():
+                continue
+            del self.__entries[key]
+            self.__errors.pop(key, None)
+            evicted.append(key)
+        if len(evicted) > 0:
+            self.logger.debug("Removed %s least recently used forecast cache entries", len(evicted))
+        return evicted
+
+    def __remove(self, key: str) -> None:
+        if self.directory is None:
+            return
+        try:
+            os.remove(self.__path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning("Failed to remove forecast cache entry %s: %s", key, e)
+
+    def __load(self, key: str, params: dict) -> CacheEntry | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+        if entry is not None or self.directory is None or not os.path.isfile(self.__path(key)):
+            return entry
+        # the modification time of the file is the time when the response was received
+        with open(self.__path(key), "rb") as f:
+            body = f.read()
+        fetched_at = os.path.getmtime(self.__path(key))
+        entry = CacheEntry(body, fetched_at, self.expires_at(params, fetched_at))
+        with self.__lock:
+            self.__entries.setdefault(key, entry)
+            evicted = self.__evict()
+        for evicted_key in evicted:
+            if evicted_key != key:
+                self.__remove(evicted_key)
+        return entry
+
+    def __store(self, key: str, entry: CacheEntry) -> None:
+        if self.directory is None:
+            return
+        try:
+            with tempfile.NamedTemporaryFile("wb", dir=self.directory, delete=False, suffix=".tmp") as f:
+                f.write(entry.body)
+            os.utime(f.name, (entry.fetched_at, entry.fetched_at))
+            os.replace(f.name, self.__path(key))
+        except OSError as e:
+            self.logger.warning("Failed to persist forecast cache entry %s: %s", key, e)
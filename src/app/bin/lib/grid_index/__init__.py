@@ -0,0 +1,163 @@
+"""
+###############################################################################
+# Library to learn the weather model grid cell of each location, so locations
+# in the same grid cell are requested and parsed only once
+# seeAlso: https://open-meteo.com/en/docs (cell_selection)
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["GridIndex"]
+
+import json
+import logging
+import os
+import tempfile
+import threading
+
+
+class GridIndex:
+    """
+    Class that maps locations to the grid cell the Open-Meteo API snapped them to
+
+    The grid cell is identified by the latitude, longitude and elevation of the response. Two locations with the same
+    grid cell get the same weather data, because the elevation used for the downscaling is part of the cell.
+    The grid cells depend on the weather models and the cell selection, so they are learned per request namespace.
+    Locations with an unknown grid cell are requested on their own until their cell is learned.
+    The other locations of a grid cell are not requested, so if the grid cell of a requested location changes (e.g. a
+    new version of the weather model), all learned grid cells of the namespace are dropped and learned again.
+
+    :param state_file: JSON file to persist the learned grid cells across restarts (default: None)
+    """
+
+    def __init__(self, state_file: str = None):
+        self.logger = logging.getLogger(__name__)
+        self.state_file = state_file
+        self.__cells = dict()
+        self.__lock = threading.Lock()
+        if state_file is not None and os.path.isfile(state_file):
+            with open(state_file, encoding="utf-8") as f:
+                self.__cells = json.load(f)
+            self.logger.debug("Loaded grid cells of %s namespaces from %s", len(self.__cells), state_file)
+
+    @staticmethod
+    def namespace(params: dict) -> str:
+        """
+        Get the namespace of the grid cells of a request
+
+        :param params: The request parameters
+        :return: The namespace, built from the weather models and the cell selection
+        """
+        models = params.get("models", "best_match")
+        if isinstance(models, (list, tuple)):
+            models = ",".join(models)
+        return f"{models}|{params.get('cell_selection', 'land')}"
+
+    @staticmethod
+    def site_key(location: any) -> str:
+        """
+        Get the key of a configured location
+
+        :param location: The location with latitude, longitude and elevation
+        :return: The key, built from the configured coordinates
+        """
+        return f"{location.latitude},{location.longitude},{location.elevation}"
+
+    @staticmethod
+    def cell_key(latitude: float, longitude: float, elevation: float) -> str:
+        """
+        Get the key of a grid cell
+
+        :param latitude: The latitude of the response
+        :param longitude: The longitude of the response
+        :param elevation: The elevation of the response
+        :return: The key of the grid cell
+        """
+        return f"{round(latitude, 4)},{round(longitude, 4)},{round(elevation, 1)}"
+
+    def cell(self, namespace: str, location: any) -> str | None:
+        """
+        Get the learned grid cell of a location
+
+        :param namespace: The namespace of the request
+        :param location: The location
+        :return: The key of the grid cell or None, if not learned yet
+        """
+        with self.__lock:
+            return self.__cells.get(namespace, dict()).get(self.site_key(location))
+
+    def learn(self, namespace: str, location: any, latitude: float, longitude: float, elevation: float) -> bool:
+        """
+        Learn the grid cell of a location from a response
+
+        :param namespace: The namespace of the request
+        :param location: The location
+        :param latitude: The latitude of the response
+        :param longitude: The longitude of the response
+        :param elevation: The elevation of the response
+        :return: True if the grid cell of the location was new or has changed
+        """
+        cell = self.cell_key(latitude, longitude, elevation)
+        with self.__lock:
+            cells = self.__cells.setdefault(namespace, dict())
+            previous = cells.get(self.site_key(location))
+            if previous == cell:
+                return False
+            if previous is not None:
+                # the cells of the locations served by this one are not known anymore
+                cells.clear()
+            cells[self.site_key(location)] = cell
+        if previous is not None:
+            self.logger.info(
+                "Grid cell of location %s changed from %s to %s, learn the grid cells of %s again",
+                location.id,
+                previous,
+                cell,
+                namespace,
+            )
+        self.logger.debug("Location %s is in grid cell %s", location.id, cell)
+        return True
+
+    def plan(self, namespace: str, locations: list) -> dict:
+        """
+        Group the locations by their learned grid cell
+
+        :param namespace: The namespace of the request
+        :param locations: The locations
+        :return: dict with the location to request as key and the list of locations in the same grid cell as value
+        """
+        groups = dict()
+        representatives = dict()
+        for location in locations:
+            cell = self.cell(namespace, location)
+            if cell is not None and cell in representatives.keys():
+                groups[representatives[cell]].append(location)
+                continue
+            if cell is not None:
+                representatives[cell] = location.id
+            groups[location.id] = [location]
+        by_id = {location.id: location for location in locations}
+        return {by_id[location_id]: sites[1:] for location_id, sites in groups.items()}
+
+    def save(self) -> None:
+        """
+        Persist the learned grid cells to the state file
+        """
+        if self.state_file is None:
+            return
+        with self.__lock:
+            data = json.dumps(self.__cells)
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(f.name, self.state_file)
@@ -0,0 +1,219 @@
+"""
+###############################################################################
+# Library to keep a local, columnar and append-only history of weather
+# values in fixed-width numpy memmap segments with retention compaction
+# seeAlso: https://numpy.org/doc/stable/reference/generated/numpy.memmap.html
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["HistoryStore"]
+
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+# one record is the unix timestamp and the value, 16 bytes
+RECORD = np.dtype([("time", "<i8"), ("value", "<f8")])
+SEGMENT_SUFFIX = ".seg"
+
+
+class HistoryStore:
+    """
+    Class to store time series of numeric values per series (e.g. location/block/variable)
+
+    Every series is a directory of segment files. A segment is a raw array of fixed-width records (timestamp, value),
+    sorted by time and named by its first timestamp. New records are appended to the last segment, a new segment is
+    started when it is full. Records with a timestamp that is already in the last segment update the value in place
+    (e.g. a revised daily forecast), older timestamps are ignored. Segments are read with numpy memmap, a range query
+    only reads the segments of the range.
+
+    :param directory: The directory of the store
+    :param retention: The seconds to keep records, older records are removed by compact() (default: None, forever)
+    :param segment_size: The maximum number of records per segment (default: 4096)
+    :param clock: Function that returns the current unix timestamp (default: time.time)
+    """
+
+    __invalid_characters = re.compile(r"[^A-Za-z0-9_.-]")
+
+    def __init__(self, directory: str, retention: float = None, segment_size: int = 4096, clock: Callable = time.time):
+        self.logger = logging.getLogger(__name__)
+        if segment_size < 1:
+            raise ValueError(f"Invalid segment size: {segment_size}. Must be at least 1.")
+        self.directory = directory
+        self.retention = retention
+        self.segment_size = segment_size
+        self.clock = clock
+        self.__lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def series_name(cls, *parts: str) -> str:
+        """
+        Build a series name from its parts, e.g. location id, block and variable
+
+        :param parts: The parts of the name
+        :return: The series name, the parts joined by "/" with unsafe characters replaced by "_"
+        """
+        return "/".join(cls.__invalid_characters.sub("_", str(part)) or "_" for part in parts)
+
+    def __path(self, series: str) -> str:
+        return os.path.join(self.directory, *[self.series_name(part) for part in series.split("/")])
+
+    def __segments(self, path: str) -> list:
+        """
+        Get the segment files of a series, sorted by their first timestamp
+
+        :param path: The directory of the series
+        :return: list of segment file paths
+        """
+        if not os.path.isdir(path):
+            return list()
+        names = [name for name in os.listdir(path) if name.endswith(SEGMENT_SUFFIX)]
+        return [os.path.join(path, name) for name in sorted(names, key=lambda name: int(name[: -len(SEGMENT_SUFFIX)]))]
+
+    @staticmethod
+    def __read(segment: str, mode: str = "r") -> np.ndarray:
+        if os.path.getsize(segment) < RECORD.itemsize:
+            return np.zeros(0, dtype=RECORD)
+        return np.memmap(segment, dtype=RECORD, mode=mode, shape=(os.path.getsize(segment) // RECORD.itemsize,))
+
+    def series(self) -> list:
+        """
+        Get the names of all stored series
+
+        :return: sorted list of series names
+        """
+        result = list()
+        for root, _, files in os.walk(self.directory):
+            if any(name.endswith(SEGMENT_SUFFIX) for name in files):
+                result.append(os.path.relpath(root, self.directory).replace(os.sep, "/"))
+        return sorted(result)
+
+    def append(self, series: str, times: np.ndarray, values: np.ndarray) -> int:
+        """
+        Append records to a series
+
+        :param series: The series name
+        :param times: array of unix timestamps in ascending order
+        :param values: array of values, NaN for missing values
+        :return: The number of appended or updated records
+        """
+        records = np.zeros(len(times), dtype=RECORD)
+        records["time"] = np.asarray(times, dtype=np.int64)
+        records["value"] = np.asarray(values, dtype=np.float64)
+        if len(records) == 0:
+            return 0
+        path = self.__path(series)
+        with self.__lock:
+            os.makedirs(path, exist_ok=True)
+            segments = self.__segments(path)
+            changed = 0
+            if len(segments) > 0:
+                # an interrupted append leaves an incomplete record
+                size = os.path.getsize(segments[-1])
+                if size % RECORD.itemsize != 0:
+                    os.truncate(segments[-1], size - size % RECORD.itemsize)
+                last = self.__read(segments[-1], mode="r+")
+                if len(last) > 0:
+                    # timestamps of the last segment are updated in place, older ones are ignored
+                    known = records["time"] <= last["time"][-1]
+                    index = np.searchsorted(last["time"], records["time"][known])
+                    index = np.minimum(index, len(last) - 1)
+                    match = last["time"][index] == records["time"][known]
+                    last["value"][index[match]] = records["value"][known][match]
+                    changed += int(match.sum())
+                    if match.any():
+                        last.flush()
+                    records = records[~known]
+                del last
+            while len(records) > 0:
+                if len(segments) > 0 and os.path.getsize(segments[-1]) // RECORD.itemsize < self.segment_size:
+                    segment = segments[-1]
+                    free = self.segment_size - os.path.getsize(segment) // RECORD.itemsize
+                else:
+                    segment = os.path.join(path, f"{records['time'][0]}{SEGMENT_SUFFIX}")
+                    segments.append(segment)
+                    free = self.segment_size
+                with open(segment, "ab") as f:
+                    f.write(records[:free].tobytes())
+                changed += min(free, len(records))
+                records = records[free:]
+        return changed
+
+    def query(self, series: str, start: float = None, end: float = None) -> tuple:
+        """
+        Read the records of a series in a time range
+
+        :param series: The series name
+        :param start: The first unix timestamp to include (default: None, from the beginning)
+        :param end: The last unix timestamp to include (default: None, to the end)
+        :return: tuple with the array of timestamps and the array of values
+        """
+        with self.__lock:
+            segments = self.__segments(self.__path(series))
+            first_times = [int(os.path.basename(segment)[: -len(SEGMENT_SUFFIX)]) for segment in segments]
+            parts = list()
+            for i, segment in enumerate(segments):
+                # the segment ends before the next segment starts
+                if end is not None and first_times[i] > end:
+                    break
+                if start is not None and i + 1 < len(segments) and first_times[i + 1] <= start:
+                    continue
+                records = self.__read(segment)
+                lower = 0 if start is None else np.searchsorted(records["time"], start, side="left")
+                upper = len(records) if end is None else np.searchsorted(records["time"], end, side="right")
+                parts.append(np.array(records[lower:upper]))
+        records = np.concatenate(parts) if len(parts) > 0 else np.zeros(0, dtype=RECORD)
+        return records["time"], records["value"]
+
+    def compact(self) -> int:
+        """
+        Remove the records that are older than the retention
+
+        :return: The number of removed records
+        """
+        if self.retention is None:
+            return 0
+        cutoff = self.clock() - self.retention
+        removed = 0
+        with self.__lock:
+            for series in self.series():
+                segments = self.__segments(self.__path(series))
+                for segment in segments:
+                    records = self.__read(segment)
+                    if len(records) == 0 or records["time"][-1] >= cutoff:
+                        # the first segment with current records is kept without its expired head
+                        keep = np.array(records[records["time"] >= cutoff])
+                        del records
+                        if len(keep) < os.path.getsize(segment) // RECORD.itemsize:
+                            removed += os.path.getsize(segment) // RECORD.itemsize - len(keep)
+                            directory = os.path.dirname(segment)
+                            target = os.path.join(directory, f"{keep['time'][0]}{SEGMENT_SUFFIX}")
+                            with open(target + ".tmp", "wb") as f:
+                                f.write(keep.tobytes())
+                            os.replace(target + ".tmp", target)
+                            if target != segment:
+                                os.remove(segment)
+                        break
+                    removed += len(records)
+                    del records
+                    os.remove(segment)
+        if removed > 0:
+            self.logger.debug("Removed %s records older than %s seconds", removed, self.retention)
+        return removed
@@ -0,0 +1,195 @@
+"""
+###############################################################################
+# Library to handle a list of locations and batch them into Open-Meteo API calls
+# seeAlso: https://open-meteo.com/en/docs (multiple coordinates, comma separated)
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["Location", "Locations"]
+
+import json
+import logging
+import os
+import re
+from urllib.parse import urlencode
+
+
+class Location:
+    """
+    Class that represents a single location to request the weather for
+    """
+
+    __id_pattern = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+    def __init__(self, id: str, latitude: float, longitude: float, elevation: float | None = None):
+        if not self.__id_pattern.match(str(id)):
+            raise ValueError(f"Invalid location id: {id}. Allowed characters are A-Z, a-z, 0-9, '_', '.' and '-'.")
+        self.id = str(id)
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.elevation = None if elevation is None else float(elevation)
+
+    def __repr__(self) -> str:
+        return (
+            f"Location(id={self.id}, latitude={self.latitude}, longitude={self.longitude}, elevation={self.elevation})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Location):
+            return NotImplemented
+        return (self.id, self.latitude, self.longitude, self.elevation) == (
+            other.id,
+            other.latitude,
+            other.longitude,
+            other.elevation,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.latitude, self.longitude, self.elevation))
+
+
+class Locations:
+    """
+    Class to load a list of locations and split them into as few Open-Meteo API calls as possible
+    """
+
+    def __init__(self, locations: list):
+        self.logger = logging.getLogger(__name__)
+        if len(locations) == 0:
+            raise ValueError("The location list is empty.")
+        ids = [location.id for location in locations]
+        if len(ids) != len(set(ids)):
+            raise ValueError("The location ids must be unique.")
+        self.locations = locations
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __iter__(self):
+        return iter(self.locations)
+
+    @classmethod
+    def from_list(cls, data: list) -> "Locations":
+        """
+        Create the locations from a list of dictionaries with the keys id, latitude, longitude and (optional) elevation
+
+        :param data: list of location dictionaries
+        :return: Locations object
+        :raise ValueError: If a location is not valid
+        """
+        locations = list()
+        for i, item in enumerate(data):
+            if "latitude" not in item or "longitude" not in item:
+                raise ValueError(f"Location {i} needs a latitude and a longitude.")
+            locations.append(
+                Location(
+                    id=item.get("id", str(i)),
+                    latitude=item["latitude"],
+                    longitude=item["longitude"],
+                    elevation=item.get("elevation"),
+                )
+            )
+        return cls(locations)
+
+    @classmethod
+    def from_string(cls, value: str) -> "Locations":
+        """
+        Create the locations from a string. Either a JSON list of location dictionaries
+        or a semicolon separated list in the format "id:latitude,longitude[,elevation]"
+
+        :param value: The location string
+        :return: Locations object
+        :raise ValueError: If a location is not valid
+        """
+        value = value.strip()
+        if value.startswith("["):
+            return cls.from_list(json.loads(value))
+
+        data = list()
+        for entry in filter(None, [e.strip() for e in value.split(";")]):
+            if ":" not in entry:
+                raise ValueError(f"Invalid location: {entry}. Expected format is id:latitude,longitude[,elevation]")
+            location_id, coordinates = entry.split(":", 1)
+            coordinates = [c.strip() for c in coordinates.split(",")]
+            if len(coordinates) not in [2, 3]:
+                raise ValueError(f"Invalid location: {entry}. Expected format is id:latitude,longitude[,elevation]")
+            item = {"id": location_id.strip(), "latitude": coordinates[0], "longitude": coordinates[1]}
+            if len(coordinates) == 3:
+                item["elevation"] = coordinates[2]
+            data.append(item)
+        return cls.from_list(data)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Locations":
+        """
+        Create the locations from a JSON file that contains a list of location dictionaries
+
+        :param path: The path to the JSON file
+        :return: Locations object
+        :raise ValueError: If the file does not exist or a location is not valid
+        """
+        if not os.path.isfile(path):
+            raise ValueError(f"Location file {path} not found.")
+        with open(path, encoding="utf-8") as f:
+            return cls.from_list(json.load(f))
+
+    @staticmethod
+    def __batch_params(params: dict, locations: list) -> dict:
+        """
+        Build the request parameters for a batch of locations
+
+        :param params: The request parameters without coordinates
+        :param locations: The locations of the batch
+        :return: The request parameters with comma separated coordinates
+        """
+        batch_params = dict(params)
+        batch_params["latitude"] = ",".join(str(location.latitude) for location in locations)
+        batch_params["longitude"] = ",".join(str(location.longitude) for location in locations)
+        if locations[0].elevation is not None:
+            batch_params["elevation"] = ",".join(str(location.elevation) for location in locations)
+        else:
+            batch_params.pop("elevation", None)
+        return batch_params
+
+    def batches(self, params: dict, url: str, max_url_length: int = 4000) -> list:
+        """
+        Split the locations into batches, so that each request URL stays below the maximum URL length.
+        Locations with and without elevation are requested in separate batches, because the API expects
+        one elevation per coordinate.
+
+        :param params: The request parameters without coordinates
+        :param url: The API URL
+        :param max_url_length: The maximum length of the request URL (default: 4000)
+        :return: list of tuples (list of locations, request parameters)
+        """
+        groups = [
+            [location for location in self.locations if location.elevation is not None],
+            [location for location in self.locations if location.elevation is None],
+        ]
+
+        result = list()
+        for group in filter(None, groups):
+            batch = list()
+            for location in group:
+                candidate = batch + [location]
+                candidate_params = self.__batch_params(params, candidate)
+                length = len(url) + 1 + len(urlencode(candidate_params, doseq=True))
+                if length > max_url_length and len(batch) > 0:
+                    result.append((batch, self.__batch_params(params, batch)))
+                    candidate = [location]
+                batch = candidate
+            result.append((batch, self.__batch_params(params, batch)))
+
+        self.logger.debug("Split %s locations into %s API requests", len(self.locations), len(result))
+        return result
@@ -0,0 +1,197 @@
+"""
+###############################################################################
+# Library to collect processing metrics and export them in Prometheus text
+# format (textfile or /metrics endpoint) or as JSON
+# seeAlso: https://prometheus.io/docs/instrumenting/exposition_formats/
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["Metrics"]
+
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+
+class Metrics:
+    """
+    Class to collect stage durations, counters and gauges
+
+    Stage durations are recorded as gauge of the last run plus counters of the total duration and the number of runs.
+    """
+
+    def __init__(self, prefix: str = "weather2mqtt"):
+        self.logger = logging.getLogger(__name__)
+        self.prefix = prefix
+        self.__lock = threading.Lock()
+        self.__stage_last = dict()
+        self.__stage_total = dict()
+        self.__stage_runs = dict()
+        self.__counters = dict()
+        self.__gauges = dict()
+        self.__help = dict()
+        self.__server = None
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        """
+        Context manager that records the duration of a processing stage
+
+        :param stage: The name of the stage, e.g. "fetch"
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started_at)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of a processing stage
+
+        :param stage: The name of the stage
+        :param seconds: The duration in seconds
+        """
+        with self.__lock:
+            self.__stage_last[stage] = seconds
+            self.__stage_total[stage] = self.__stage_total.get(stage, 0.0) + seconds
+            self.__stage_runs[stage] = self.__stage_runs.get(stage, 0) + 1
+
+    def increment(self, name: str, value: float = 1, help: str = None) -> None:
+        """
+        Increment a counter
+
+        :param name: The name of the counter without prefix, should end with _total
+        :param value: The value to add (default: 1)
+        :param help: The description of the counter (default: None)
+        """
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+            if help is not None:
+                self.__help[name] = help
+
+    def set(self, name: str, value: float, help: str = None) -> None:
+        """
+        Set a gauge
+
+        :param name: The name of the gauge without prefix
+        :param value: The value
+        :param help: The description of the gauge (default: None)
+        """
+        with self.__lock:
+            self.__gauges[name] = value
+            if help is not None:
+                self.__help[name] = help
+
+    def to_dict(self) -> dict:
+        """
+        Get a snapshot of all metrics
+
+        :return: dict with the stages, counters and gauges
+        """
+        with self.__lock:
+            return {
+                "stages": {
+                    stage: {
+                        "last_seconds": self.__stage_last[stage],
+                        "total_seconds": self.__stage_total[stage],
+                        "runs": self.__stage_runs[stage],
+                    }
+                    for stage in self.__stage_last.keys()
+                },
+                "counters": dict(self.__counters),
+                "gauges": dict(self.__gauges),
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Format all metrics in the Prometheus text exposition format
+
+        :return: The metrics as text
+        """
+        snapshot = self.to_dict()
+        lines = list()
+        if len(snapshot["stages"]) > 0:
+            for name, key, metric_type, description in [
+                ("stage_duration_seconds", "last_seconds", "gauge", "Duration of the last run of a processing stage"),
+                ("stage_duration_seconds_total", "total_seconds", "counter", "Total duration of a processing stage"),
+                ("stage_runs_total", "runs", "counter", "Number of runs of a processing stage"),
+            ]:
+                lines.append(f"# HELP {self.prefix}_{name} {description}")
+                lines.append(f"# TYPE {self.prefix}_{name} {metric_type}")
+                for stage, values in sorted(snapshot["stages"].items()):
+                    lines.append(f'{self.prefix}_{name}{{stage="{stage}"}} {values[key]}')
+        for metric_type, values in [("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])]:
+            for name, value in sorted(values.items()):
+                if name in self.__help.keys():
+                    lines.append(f"# HELP {self.prefix}_{name} {self.__help[name]}")
+                lines.append(f"# TYPE {self.prefix}_{name} {metric_type}")
+                lines.append(f"{self.prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Write the metrics into a file for the Prometheus node exporter textfile collector.
+        The file is replaced atomically, so the collector never reads a partially written file.
+
+        :param path: The path of the textfile, should end with .prom
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+
+    def start_http_server(self, port: int, address: str = "") -> None:
+        """
+        Serve the metrics on http://<address>:<port>/metrics in a background thread
+
+        :param port: The TCP port
+        :param address: The address to bind to (default: all addresses)
+        """
+        # the HTTP server is only imported if the metrics endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                metrics.logger.debug("Metrics request: " + format, *args)
+
+        self.__server = ThreadingHTTPServer((address, port), MetricsHandler)
+        threading.Thread(target=self.__server.serve_forever, name="metrics", daemon=True).start()
+        self.logger.debug("Serving metrics on port %s", port)
+
+    def stop_http_server(self) -> None:
+        """
+        Stop the metrics HTTP server
+        """
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
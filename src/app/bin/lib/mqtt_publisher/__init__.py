@@ -0,0 +1,251 @@
+"""
+###############################################################################
+# Library to publish many MQTT messages over one persistent connection
+# with a bounded in-flight window and publish completion tracking
+# seeAlso: https://eclipse.dev/paho/files/paho.mqtt.python/html/client.html
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["MqttPublisher", "MqttPublishError"]
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+import paho.mqtt.client as mqtt
+
+
+class MqttPublishError(Exception):
+    """
+    Exception raised if messages could not be published to the MQTT broker
+    """
+
+
+class MqttPublisher:
+    """
+    Class to publish messages over one persistent MQTT session.
+    The paho network loop runs in a background thread, so the QoS 1/2 handshakes (PUBACK, PUBREC/PUBCOMP)
+    are completed. The number of unacknowledged messages is limited by the in-flight window.
+    """
+
+    def __init__(
+        self,
+        client: mqtt.Client,
+        host: str,
+        port: int = 1883,
+        keepalive: int = 60,
+        max_inflight: int = 20,
+        timeout: float = 10.0,
+    ):
+        self.logger = logging.getLogger(__name__)
+        if max_inflight < 1:
+            raise ValueError(f"Invalid in-flight window: {max_inflight}. Must be greater than 0.")
+        self.client = client
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+
+        self.__connected = threading.Event()
+        self.__window = threading.BoundedSemaphore(max_inflight)
+        self.__completion = threading.Condition()
+        self.__pending = dict()
+        self.__completed = dict()
+        self.__dropped = set()
+        self.__latencies = list()
+        self.__published = 0
+        self.__failed = 0
+        self.__max_inflight_seen = 0
+        self.__subscriptions = dict()
+
+        self.client.max_inflight_messages_set(max_inflight)
+        self.client.on_connect = self.__on_connect
+        self.client.on_disconnect = self.__on_disconnect
+        self.client.on_publish = self.__on_publish
+
+    def __on_connect(self, client, userdata, flags, reason_code, properties) -> None:
+        if reason_code.is_failure:
+            self.logger.error(f"Connection to MQTT server refused: {reason_code}")
+            return
+        self.logger.debug("Connected to MQTT server")
+        # the subscriptions are renewed with every (re)connect, the broker may not keep the session
+        for topic, qos in list(self.__subscriptions.items()):
+            self.client.subscribe(topic, qos)
+        self.__connected.set()
+
+    def __on_disconnect(self, client, userdata, flags, reason_code, properties) -> None:
+        self.logger.debug("Disconnected from MQTT server: %s", reason_code)
+        self.__connected.clear()
+
+    def __on_publish(self, client, userdata, mid, reason_code, properties) -> None:
+        # the callback can arrive before publish() returned, so the completion time is stored by message ID
+        with self.__completion:
+            if mid in self.__dropped:
+                # the message was already given up and its in-flight slot released
+                self.__dropped.discard(mid)
+                return
+            self.__completed[mid] = time.monotonic()
+            self.__completion.notify_all()
+        self.__window.release()
+
+    @property
+    def connected(self) -> bool:
+        """
+        True while the connection to the MQTT server is established
+        """
+        return self.__connected.is_set()
+
+    @property
+    def inflight(self) -> int:
+        """
+        The number of messages that are published but not yet completed
+        """
+        with self.__completion:
+            return len([mid for mid in self.__pending.keys() if mid not in self.__completed.keys()])
+
+    def connect(self) -> None:
+        """
+        Connect to the MQTT server and start the network loop
+
+        :raise MqttPublishError: If the connection is not established within the timeout
+        """
+        self.client.connect(self.host, self.port, self.keepalive)
+        self.client.loop_start()
+        if not self.__connected.wait(timeout=self.timeout):
+            self.client.loop_stop()
+            raise MqttPublishError(f"Connection to MQTT server {self.host}:{self.port} timed out.")
+
+    def subscribe(self, topic: str, callback: Callable, qos: int = 0) -> None:
+        """
+        Subscribe to a topic, the subscription is renewed after a reconnect
+
+        :param topic: The MQTT topic filter, also as shared subscription ($share/<group>/<topic>)
+        :param callback: Function called with client, userdata and message from the network loop
+        :param qos: The MQTT quality of service (default: 0)
+        """
+        # the messages of a shared subscription are delivered with the topic without the share prefix
+        topic_filter = topic.split("/", 2)[2] if topic.startswith("$share/") else topic
+        self.client.message_callback_add(topic_filter, callback)
+        self.__subscriptions[topic] = qos
+        if self.__connected.is_set():
+            self.client.subscribe(topic, qos)
+        self.logger.debug("Subscribed to MQTT topic %s", topic)
+
+    def publish(
+        self, topic: str, payload: bytes | str, qos: int = 0, retain: bool = False, properties: any = None
+    ) -> mqtt.MQTTMessageInfo:
+        """
+        Publish a message. Blocks while the in-flight window is full.
+
+        :param topic: The MQTT topic
+        :param payload: The message payload
+        :param qos: The MQTT quality of service (default: 0)
+        :param retain: Publish as retained message (default: False)
+        :param properties: The MQTT v5 properties of the message, e.g. the correlation data (default: None)
+        :return: The paho message info of the message
+        :raise MqttPublishError: If the in-flight window does not free up within the timeout
+        """
+        if not self.__window.acquire(timeout=self.timeout):
+            raise MqttPublishError(f"Timeout while waiting for a free in-flight slot to publish to {topic}.")
+
+        started_at = time.monotonic()
+        info = self.client.publish(topic=topic, payload=payload, qos=qos, retain=retain, properties=properties)
+        # QoS 1/2 messages are queued by paho while the connection is lost and sent after reconnect
+        if info.rc != mqtt.MQTT_ERR_SUCCESS and not (qos > 0 and info.rc == mqtt.MQTT_ERR_NO_CONN):
+            # the message is not queued, no publish callback will follow
+            self.__window.release()
+            with self.__completion:
+                self.__failed += 1
+            raise MqttPublishError(f"Failed to publish to MQTT topic {topic}. Error code: {info.rc}")
+
+        with self.__completion:
+            self.__pending[info.mid] = (topic, started_at)
+            inflight = len([mid for mid in self.__pending.keys() if mid not in self.__completed.keys()])
+            self.__max_inflight_seen = max(self.__max_inflight_seen, inflight)
+        self.logger.debug("Queued message ID %s for MQTT topic %s (%s in-flight)", info.mid, topic, inflight)
+        return info
+
+    def flush(self, timeout: float | None = None) -> None:
+        """
+        Wait until all published messages are completed (QoS 0 sent, QoS 1 PUBACK, QoS 2 PUBCOMP received)
+
+        :param timeout: The maximum time to wait in seconds (default: publisher timeout)
+        :raise MqttPublishError: If not all messages are completed within the timeout
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self.__completion:
+            while not all(mid in self.__completed.keys() for mid in self.__pending.keys()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.__completion.wait(timeout=remaining)
+
+            incomplete = list()
+            for mid, (topic, started_at) in list(self.__pending.items()):
+                del self.__pending[mid]
+                completed_at = self.__completed.pop(mid, None)
+                if completed_at is None:
+                    # give up the message and free its in-flight slot
+                    incomplete.append(topic)
+                    self.__dropped.add(mid)
+                    self.__window.release()
+                    continue
+                self.__latencies.append(completed_at - started_at)
+                self.__published += 1
+                self.logger.debug(
+                    f"Message ID {mid} to MQTT topic {topic} completed in {(completed_at - started_at) * 1000:.1f} ms"
+                )
+            self.__failed += len(incomplete)
+
+        if len(incomplete) > 0:
+            topics = ", ".join(sorted(set(incomplete)))
+            raise MqttPublishError(f"{len(incomplete)} messages were not completed in time: {topics}")
+
+    def statistics(self, reset: bool = True) -> dict:
+        """
+        Get the publish statistics since the last reset
+
+        :param reset: Reset the statistics (default: True)
+        :return: dict with the number of published and failed messages, in-flight counts and latencies in seconds
+        """
+        with self.__completion:
+            latencies = sorted(self.__latencies)
+            result = {
+                "published": self.__published,
+                "failed": self.__failed,
+                "inflight": len([mid for mid in self.__pending.keys() if mid not in self.__completed.keys()]),
+                "inflight_max": self.__max_inflight_seen,
+                "latency_min": latencies[0] if latencies else None,
+                "latency_avg": sum(latencies) / len(latencies) if latencies else None,
+                "latency_max": latencies[-1] if latencies else None,
+            }
+            if reset:
+                self.__latencies = list()
+                self.__published = 0
+                self.__failed = 0
+                self.__max_inflight_seen = 0
+        return result
+
+    def disconnect(self) -> None:
+        """
+        Wait for pending messages, stop the network loop and disconnect from the MQTT server
+        """
+        try:
+            self.flush()
+        finally:
+            self.client.disconnect()
+            self.client.loop_stop()
+            self.__connected.clear()
@@ -0,0 +1,257 @@
+"""
+###############################################################################
+# Library to publish the same MQTT messages to multiple MQTT brokers in
+# parallel, every broker with its own worker, options and timeout
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["MultiPublisher", "MultiPublishError", "PublishTarget"]
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MultiPublishError(Exception):
+    """
+    Exception raised if messages could not be published to one or more MQTT brokers
+    """
+
+
+class PublishTarget:
+    """
+    One MQTT broker of the MultiPublisher
+
+    :param name: The name of the target, used in the logs and errors
+    :param publisher: The connected publisher of the broker, e.g. a MqttPublisher or SpoolingPublisher
+    :param qos: The MQTT quality of service of the messages without explicit QoS (default: 0)
+    :param retain: The retain flag of the messages without explicit retain flag (default: False)
+    :param timeout: The maximum time in seconds to wait for the broker on flush() (default: 10)
+    """
+
+    def __init__(self, name: str, publisher: any, qos: int = 0, retain: bool = False, timeout: float = 10.0):
+        self.name = name
+        self.publisher = publisher
+        self.qos = qos
+        self.retain = retain
+        self.timeout = timeout
+
+
+class MultiPublisher:
+    """
+    Class to publish every message to all targets. The messages of a target are published in order by its own worker
+    thread, so a slow or unreachable broker does not delay the others. Every target is flushed with its own timeout,
+    a failed target does not stop the others, the failures are raised together after all targets are done.
+
+    :param targets: list of PublishTarget
+    :param max_pending: The maximum number of messages waiting for the worker of a target, further messages to the
+        target are dropped (default: 1000)
+    """
+
+    def __init__(self, targets: list, max_pending: int = 1000):
+        self.logger = logging.getLogger(__name__)
+        if len(targets) == 0:
+            raise ValueError("No MQTT targets to publish to.")
+        names = [target.name for target in targets]
+        if len(set(names)) < len(names):
+            raise ValueError(f"The names of the MQTT targets are not unique: {', '.join(names)}.")
+        self.targets = list(targets)
+        self.max_pending = max_pending
+        self.__lock = threading.Lock()
+        self.__workers = dict()
+        self.__pending = dict()
+        self.__errors = dict()
+        self.__dropped = dict()
+        # the dropped messages since the last flush, the statistics count them until their own reset
+        self.__unreported = dict()
+        for target in self.targets:
+            # one worker per target keeps the order of the messages
+            self.__workers[target.name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"mqtt-{target.name}")
+            self.__pending[target.name] = 0
+            self.__errors[target.name] = list()
+            self.__dropped[target.name] = 0
+            self.__unreported[target.name] = 0
+
+    @property
+    def primary(self) -> any:
+        """
+        The publisher of the first target, e.g. to subscribe and answer requests on one broker only
+        """
+        return self.targets[0].publisher
+
+    @property
+    def connected(self) -> bool:
+        """
+        True if the publishers of all targets are connected
+        """
+        return all(target.publisher.connected for target in self.targets)
+
+    def __run(self, target: PublishTarget, function: Callable, *args, **kwargs) -> any:
+        try:
+            return function(*args, **kwargs)
+        except Exception as e:
+            with self.__lock:
+                self.__errors[target.name].append(str(e))
+            self.logger.warning("MQTT target %s failed: %s", target.name, e)
+        finally:
+            with self.__lock:
+                self.__pending[target.name] -= 1
+
+    def __submit(self, target: PublishTarget, function: Callable, *args, **kwargs) -> any:
+        with self.__lock:
+            self.__pending[target.name] += 1
+        return self.__workers[target.name].submit(self.__run, target, function, *args, **kwargs)
+
+    def publish(
+        self, topic: str, payload: bytes | str, qos: int = None, retain: bool = None, properties: any = None
+    ) -> list:
+        """
+        Queue a message for all targets, the message is published by the workers of the targets
+
+        :param topic: The MQTT topic
+        :param payload: The message payload, the same bytes are published to every target
+        :param qos: The MQTT quality of service (default: None, QoS of the target)
+        :param retain: Publish as retained message (default: None, retain flag of the target)
+        :param properties: The MQTT v5 properties of the message (default: None)
+        :return: list of the futures of the targets, the dropped messages are left out
+        """
+        futures = list()
+        for target in self.targets:
+            with self.__lock:
+                full = self.__pending[target.name] >= self.max_pending
+                if full:
+                    self.__dropped[target.name] += 1
+                    self.__unreported[target.name] += 1
+            if full:
+                self.logger.warning("MQTT target %s is not keeping up, dropped message to %s", target.name, topic)
+                continue
+            futures.append(
+                self.__submit(
+                    target,
+                    target.publisher.publish,
+                    topic=topic,
+                    payload=payload,
+                    qos=target.qos if qos is None else qos,
+                    retain=target.retain if retain is None else retain,
+                    properties=properties,
+                )
+            )
+        return futures
+
+    def __call_all(self, function: Callable, timeout: float = None, wait: bool = False) -> dict:
+        """
+        Call a function for all targets after their queued messages, every target has its own deadline
+
+        :param function: Function called with the PublishTarget
+        :param timeout: The maximum time to wait in seconds (default: None, timeout of the target)
+        :param wait: Wait without deadline, e.g. for the rate limited drain (default: False)
+        :return: dict with the result per target name, None for the failed targets
+        :raise MultiPublishError: If the function failed or did not return in time for one or more targets
+        """
+        started_at = time.monotonic()
+        futures = [(target, self.__submit(target, function, target)) for target in self.targets]
+        results = dict()
+        timed_out = list()
+        for target, future in futures:
+            # the deadlines of all targets are counted from the same start, so they are waited for in parallel
+            deadline = None if wait else started_at + (target.timeout if timeout is None else timeout)
+            try:
+                results[target.name] = future.result(
+                    timeout=None if deadline is None else max(0.0, deadline - time.monotonic())
+                )
+            except TimeoutError:
+                # the worker continues in the background, the next messages are queued behind
+                timed_out.append(target.name)
+                results[target.name] = None
+
+        errors = list()
+        with self.__lock:
+            for target in self.targets:
+                if target.name in timed_out:
+                    errors.append(f"{target.name}: timed out")
+                errors.extend(f"{target.name}: {error}" for error in self.__errors[target.name])
+                self.__errors[target.name] = list()
+                if self.__unreported[target.name] > 0:
+                    errors.append(f"{target.name}: {self.__unreported[target.name]} messages dropped")
+                    self.__unreported[target.name] = 0
+        if len(errors) > 0:
+            raise MultiPublishError("; ".join(errors))
+        return results
+
+    def flush(self, timeout: float | None = None) -> None:
+        """
+        Wait until all queued messages are published and completed by every target
+
+        :param timeout: The maximum time to wait in seconds per target (default: timeout of the target)
+        :raise MultiPublishError: If not all messages are completed by one or more targets
+        """
+        self.__call_all(lambda target: target.publisher.flush(timeout=timeout), timeout=timeout)
+
+    def drain(self) -> int:
+        """
+        Forward the spooled messages of the targets in parallel, the targets without spool are skipped
+
+        :return: The number of forwarded messages of all targets
+        """
+
+        def drain(target: PublishTarget) -> int:
+            return target.publisher.drain() if hasattr(target.publisher, "drain") else 0
+
+        try:
+            results = self.__call_all(drain, wait=True)
+        except MultiPublishError as e:
+            self.logger.warning("Failed to forward the spooled messages: %s", e)
+            return 0
+        return sum(results.values())
+
+    def statistics(self, reset: bool = True) -> dict:
+        """
+        Get the publish statistics of all targets since the last reset
+
+        :param reset: Reset the statistics (default: True)
+        :return: dict like MqttPublisher.statistics() over all targets and the statistics per target in "targets"
+        """
+        targets = dict()
+        for target in self.targets:
+            targets[target.name] = dict(target.publisher.statistics(reset=reset))
+            with self.__lock:
+                targets[target.name]["failed"] += self.__dropped[target.name]
+                if reset:
+                    self.__dropped[target.name] = 0
+
+        published = [statistics for statistics in targets.values() if statistics["latency_avg"] is not None]
+        count = sum(statistics["published"] for statistics in published)
+        return {
+            "published": sum(statistics["published"] for statistics in targets.values()),
+            "failed": sum(statistics["failed"] for statistics in targets.values()),
+            "inflight": sum(statistics["inflight"] for statistics in targets.values()),
+            "inflight_max": max(statistics["inflight_max"] for statistics in targets.values()),
+            "latency_min": min((s["latency_min"] for s in published), default=None),
+            "latency_avg": (sum(s["latency_avg"] * s["published"] for s in published) / count if count > 0 else None),
+            "latency_max": max((s["latency_max"] for s in published), default=None),
+            "targets": targets,
+        }
+
+    def disconnect(self) -> None:
+        """
+        Wait for the queued messages and disconnect the publishers of all targets in parallel
+        """
+        try:
+            # the publishers limit the time to wait for every message themselves
+            self.__call_all(lambda target: target.publisher.disconnect(), wait=True)
+        finally:
+            for worker in self.__workers.values():
+                worker.shutdown(wait=False)
@@ -0,0 +1,288 @@
+"""
+###############################################################################
+# Library to account the weighted Open-Meteo API calls and to throttle the
+# requests with token buckets per minute, hour and day
+# seeAlso: https://open-meteo.com/en/terms
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["ApiQuota", "QuotaExceededError"]
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+
+# length of the quota windows in seconds
+WINDOWS = {"minute": 60, "hour": 3600, "day": 86400}
+# limits of the free Open-Meteo API
+DEFAULT_LIMITS = {"minute": 600, "hour": 5000, "day": 10000}
+# a call with more variables or a longer time range counts as multiple calls
+VARIABLES_PER_CALL = 10
+DAYS_PER_CALL = 14
+
+
+class QuotaExceededError(Exception):
+    """
+    Raised if a request cannot be made within the maximum wait time without exceeding the quota
+    """
+
+
+class ApiQuota:
+    """
+    Class to throttle the Open-Meteo API requests by their weight
+
+    Every window (minute, hour, day) is a token bucket with the limit as capacity, that refills continuously over the
+    length of the window. A request takes its weight from all buckets and waits until every bucket has enough tokens.
+    The bucket levels and the usage counters can be persisted, so one-shot runs share the quota.
+
+    :param limits: dict with the maximum weighted calls per window name (default: the limits of the free API)
+    :param state_file: JSON file to persist the bucket levels and usage counters (default: None)
+    :param max_wait: The maximum seconds a request waits for the quota (default: 60)
+    :param clock: Function that returns the current unix timestamp (default: time.time)
+    :param sleep: Function to wait the given seconds (default: time.sleep)
+    :raise ValueError: If a window or a limit is not valid
+    """
+
+    def __init__(
+        self,
+        limits: dict = None,
+        state_file: str = None,
+        max_wait: float = 60,
+        clock: Callable = time.time,
+        sleep: Callable = time.sleep,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        for window, limit in self.limits.items():
+            if window not in WINDOWS.keys():
+                raise ValueError(f"Invalid quota window: {window}. Must be one of {list(WINDOWS.keys())}.")
+            if limit <= 0:
+                raise ValueError(f"Invalid quota limit for {window}: {limit}. Must be greater than 0.")
+        self.state_file = state_file
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.__lock = threading.Lock()
+        now = self.clock()
+        self.__tokens = {window: float(limit) for window, limit in self.limits.items()}
+        self.__updated = now
+        self.__blocked_until = 0.0
+        self.__usage = {
+            window: {"start": self.__window_start(window, now), "calls": 0, "weight": 0.0} for window in WINDOWS
+        }
+        self.calls_total = 0
+        self.weight_total = 0.0
+        if state_file is not None and os.path.isfile(state_file):
+            self.__load(state_file)
+
+    @classmethod
+    def from_string(cls, limits: str, **kwargs) -> "ApiQuota":
+        """
+        Create the quota from a comma separated list of limits
+
+        :param limits: The limits, e.g. "minute=600,hour=5000,day=10000", missing windows use the default limit
+        :param kwargs: Further arguments of the ApiQuota
+        :return: The quota
+        :raise ValueError: If a limit is not valid
+        """
+        result = dict(DEFAULT_LIMITS)
+        for item in limits.split(","):
+            if item.strip() == "":
+                continue
+            if "=" not in item:
+                raise ValueError(f"Invalid quota limit: {item}. Use <window>=<calls>.")
+            window, limit = item.split("=", 1)
+            result[window.strip()] = float(limit)
+        return cls(limits=result, **kwargs)
+
+    @staticmethod
+    def weight(params: dict) -> float:
+        """
+        Estimate the number of API calls a request counts as
+        A request with more than 10 variables or more than 14 days counts as multiple calls, every location and
+        every weather model counts separately. A request with start_date and end_date counts the days between them.
+
+        :param params: The request parameters
+        :return: The weight of the request
+        """
+
+        def count(value: any) -> int:
+            if value is None or value == "":
+                return 0
+            if isinstance(value, (list, tuple)):
+                return len(value)
+            return len(str(value).split(","))
+
+        variables = sum(count(params.get(block)) for block in ("current", "hourly", "daily", "minutely_15"))
+        if params.get("start_date") is not None and params.get("end_date") is not None:
+            days = (
+                datetime.date.fromisoformat(params["end_date"]) - datetime.date.fromisoformat(params["start_date"])
+            ).days + 1
+        else:
+            days = int(params.get("forecast_days", 7)) + int(params.get("past_days", 0))
+        locations = max(1, count(params.get("latitude")))
+        models = max(1, count(params.get("models")))
+        return locations * models * max(1.0, variables / VARIABLES_PER_CALL) * max(1.0, days / DAYS_PER_CALL)
+
+    @staticmethod
+    def __window_start(window: str, now: float) -> float:
+        return now - now % WINDOWS[window]
+
+    def __refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.__updated)
+        for window, limit in self.limits.items():
+            self.__tokens[window] = min(float(limit), self.__tokens[window] + elapsed * limit / WINDOWS[window])
+        self.__updated = now
+        for window, usage in self.__usage.items():
+            start = self.__window_start(window, now)
+            if usage["start"] != start:
+                self.__usage[window] = {"start": start, "calls": 0, "weight": 0.0}
+
+    def __wait_time(self, weight: float, now: float) -> float:
+        wait = max(0.0, self.__blocked_until - now)
+        for window, limit in self.limits.items():
+            missing = weight - self.__tokens[window]
+            if missing > 0:
+                wait = max(wait, missing * WINDOWS[window] / limit)
+        return wait
+
+    def wait_time(self, weight: float) -> float:
+        """
+        Calculate how long a request with the given weight has to wait for the quota
+
+        :param weight: The weight of the request
+        :return: The wait time in seconds
+        """
+        with self.__lock:
+            now = self.clock()
+            self.__refill(now)
+            return self.__wait_time(weight, now)
+
+    def acquire(self, weight: float) -> float:
+        """
+        Wait until the quota allows a request with the given weight and account it
+
+        :param weight: The weight of the request
+        :return: The seconds waited for the quota
+        :raise QuotaExceededError: If the quota does not allow the request within the maximum wait time
+        """
+        for window, limit in self.limits.items():
+            if weight > limit:
+                raise QuotaExceededError(f"Request weight {weight:.1f} exceeds the limit of {limit} calls per {window}")
+        waited = 0.0
+        while True:
+            with self.__lock:
+                now = self.clock()
+                self.__refill(now)
+                wait = self.__wait_time(weight, now)
+                if wait <= 0:
+                    for window in self.limits.keys():
+                        self.__tokens[window] -= weight
+                    for usage in self.__usage.values():
+                        usage["calls"] += 1
+                        usage["weight"] += weight
+                    self.calls_total += 1
+                    self.weight_total += weight
+                    return waited
+            if waited + wait > self.max_wait:
+                raise QuotaExceededError(
+                    f"Request weight {weight:.1f} needs to wait {wait:.0f}s for the quota, maximum is {self.max_wait}s"
+                )
+            self.logger.info("Wait %.1f seconds for the Open-Meteo API quota", wait)
+            self.sleep(wait)
+            waited += wait
+
+    def block(self, seconds: float) -> None:
+        """
+        Block all requests for the given seconds, e.g. after the API answered with HTTP 429
+
+        :param seconds: The seconds to block
+        """
+        with self.__lock:
+            self.__blocked_until = max(self.__blocked_until, self.clock() + seconds)
+            for window in self.limits.keys():
+                self.__tokens[window] = min(self.__tokens[window], 0.0)
+        self.logger.warning("Open-Meteo API quota exhausted, block requests for %s seconds", seconds)
+
+    def statistics(self) -> dict:
+        """
+        Get the usage counters
+
+        :return: dict with the limit, the available weight and the calls and weight of the current window per
+            window name and the total calls and weight
+        """
+        with self.__lock:
+            self.__refill(self.clock())
+            result = dict()
+            for window, usage in self.__usage.items():
+                result[window] = {
+                    "limit": self.limits.get(window),
+                    "available": self.__tokens.get(window),
+                    "calls": usage["calls"],
+                    "weight": usage["weight"],
+                }
+            result["calls_total"] = self.calls_total
+            result["weight_total"] = self.weight_total
+            return result
+
+    def __load(self, state_file: str) -> None:
+        """
+        Load the bucket levels and usage counters from the state file
+
+        :param state_file: The state file
+        """
+        try:
+            with open(state_file, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Failed to load the quota state from %s: %s", state_file, e)
+            return
+        for window, tokens in state.get("tokens", dict()).items():
+            if window in self.__tokens.keys():
+                self.__tokens[window] = min(float(self.limits[window]), float(tokens))
+        self.__updated = state.get("updated", self.__updated)
+        self.__blocked_until = state.get("blocked_until", 0.0)
+        for window, usage in state.get("usage", dict()).items():
+            if window in self.__usage.keys():
+                self.__usage[window] = usage
+        self.calls_total = state.get("calls_total", 0)
+        self.weight_total = state.get("weight_total", 0.0)
+        self.logger.debug("Loaded quota state from %s", state_file)
+
+    def save(self) -> None:
+        """
+        Persist the bucket levels and usage counters to the state file
+        """
+        if self.state_file is None:
+            return
+        with self.__lock:
+            data = json.dumps(
+                {
+                    "tokens": self.__tokens,
+                    "updated": self.__updated,
+                    "blocked_until": self.__blocked_until,
+                    "usage": self.__usage,
+                    "calls_total": self.calls_total,
+                    "weight_total": self.weight_total,
+                }
+            )
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(f.name, self.state_file)
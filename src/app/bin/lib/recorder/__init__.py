@@ -0,0 +1,177 @@
+"""
+###############################################################################
+# Library to record the raw Open-Meteo API responses with their request
+# parameters into an append-only file and to replay them
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["Recording", "ResponseRecorder", "ResponseReplayer"]
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+# file header and record header (length of the JSON metadata, length of the response body)
+MAGIC = b"W2MREC1\n"
+RECORD_HEADER = struct.Struct("<II")
+
+
+class Recording:
+    """
+    Class that holds a recorded API response
+
+    :param timestamp: Unix timestamp when the response was received
+    :param cycle: Id of the cycle the request belongs to
+    :param params: The request parameters
+    :param body: The raw FlatBuffers response body
+    """
+
+    def __init__(self, timestamp: float, cycle: float, params: dict, body: bytes):
+        self.timestamp = timestamp
+        self.cycle = cycle
+        self.params = params
+        self.body = body
+
+
+class ResponseRecorder:
+    """
+    Class to append raw API responses to a recording file
+
+    Every record is the length of the metadata and of the body, the metadata as JSON (timestamp, cycle, request
+    parameters) and the unchanged response body. Records are only appended, an interrupted write loses the last record.
+
+    :param path: The path of the recording file
+    :param clock: Function that returns the current unix timestamp (default: time.time)
+    """
+
+    def __init__(self, path: str, clock: Callable = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.clock = clock
+        self.cycle = clock()
+        self.__lock = threading.Lock()
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+            self.logger.debug("Created recording file %s", path)
+
+    def start_cycle(self) -> float:
+        """
+        Start a new cycle, the following responses are replayed together
+
+        :return: The id of the cycle
+        """
+        self.cycle = self.clock()
+        return self.cycle
+
+    def record(self, params: dict, body: bytes, timestamp: float = None) -> None:
+        """
+        Append a response to the recording file
+
+        :param params: The request parameters
+        :param body: The raw response body
+        :param timestamp: Unix timestamp when the response was received (default: now)
+        """
+        metadata = {
+            "timestamp": self.clock() if timestamp is None else timestamp,
+            "cycle": self.cycle,
+            "params": params,
+        }
+        header = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+        with self.__lock:
+            with open(self.path, "ab") as f:
+                f.write(RECORD_HEADER.pack(len(header), len(body)) + header + body)
+        self.logger.debug("Recorded response with %s bytes", len(body))
+
+
+class ResponseReplayer:
+    """
+    Class to read the responses of a recording file
+
+    :param path: The path of the recording file
+    :param speed: 0 to replay at full speed, 1 to replay with the original timing between the cycles, 2 twice as fast
+        (default: 0)
+    :param sleep: Function to wait the given seconds (default: time.sleep)
+    :raise ValueError: If the file is not a recording file
+    """
+
+    def __init__(self, path: str, speed: float = 0, sleep: Callable = time.sleep):
+        self.logger = logging.getLogger(__name__)
+        if not os.path.isfile(path):
+            raise ValueError(f"Recording file {path} not found.")
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a weather2mqtt recording file.")
+        if speed < 0:
+            raise ValueError(f"Invalid replay speed: {speed}. Must not be negative.")
+        self.path = path
+        self.speed = speed
+        self.sleep = sleep
+
+    def recordings(self) -> Iterator[Recording]:
+        """
+        Read the recorded responses in the recorded order
+
+        :return: Iterator of Recording
+        """
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC))
+            while True:
+                lengths = f.read(RECORD_HEADER.size)
+                if len(lengths) == 0:
+                    return
+                if len(lengths) == RECORD_HEADER.size:
+                    header_length, body_length = RECORD_HEADER.unpack(lengths)
+                    header = f.read(header_length)
+                    body = f.read(body_length)
+                    if len(header) == header_length and len(body) == body_length:
+                        metadata = json.loads(header)
+                        yield Recording(metadata["timestamp"], metadata["cycle"], metadata["params"], body)
+                        continue
+                self.logger.warning("Recording file %s ends with an incomplete record", self.path)
+                return
+
+    def cycles(self) -> Iterator[list]:
+        """
+        Read the recorded responses grouped by cycle, paced according to the speed
+
+        :return: Iterator of lists of Recording
+        """
+        cycle = list()
+        previous = None
+        for recording in self.recordings():
+            if len(cycle) > 0 and recording.cycle != cycle[0].cycle:
+                previous = self.__pace(previous, cycle[0].cycle)
+                yield cycle
+                cycle = list()
+            cycle.append(recording)
+        if len(cycle) > 0:
+            self.__pace(previous, cycle[0].cycle)
+            yield cycle
+
+    def __pace(self, previous: float | None, cycle: float) -> float:
+        """
+        Wait the original time between two cycles divided by the speed
+
+        :param previous: The id of the previous cycle
+        :param cycle: The id of the cycle
+        :return: The id of the cycle
+        """
+        if self.speed > 0 and previous is not None and cycle > previous:
+            self.sleep((cycle - previous) / self.speed)
+        return cycle
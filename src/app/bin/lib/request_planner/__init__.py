@@ -0,0 +1,272 @@
+"""
+###############################################################################
+# Library to plan the Open-Meteo API request: the variable lists are
+# deduplicated and variables that are cheap to derive locally (dew point,
+# apparent temperature, daily min/max/mean) are replaced by their inputs
+# seeAlso: https://open-meteo.com/en/docs
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["RequestPlan", "RequestPlanner", "apparent_temperature", "daily_aggregate", "dew_point"]
+
+import logging
+from collections.abc import Callable
+
+import numpy as np
+
+# the blocks with a list of variables
+BLOCKS = ["current", "minutely_15", "hourly", "daily"]
+# the time series blocks with a time axis
+TIMESERIES_BLOCKS = ["minutely_15", "hourly"]
+# instantaneous hourly variables, their daily minimum, maximum and mean are calculated from the hourly values
+AGGREGATABLE = [
+    "temperature_2m",
+    "apparent_temperature",
+    "dew_point_2m",
+    "relative_humidity_2m",
+    "surface_pressure",
+    "pressure_msl",
+    "cloud_cover",
+    "wind_speed_10m",
+    "wind_gusts_10m",
+]
+AGGREGATIONS = {"min": np.minimum, "max": np.maximum, "mean": np.add}
+# parameters that limit the hourly time axis, so it does not cover the daily time axis
+HOURLY_RANGE_PARAMETERS = ["forecast_hours", "past_hours", "start_hour", "end_hour"]
+# a day with fewer hourly values (e.g. the change to daylight saving time has 23) is not aggregated,
+# the API value is used
+MIN_HOURS_PER_DAY = 23
+
+
+def dew_point(temperature: np.ndarray, relative_humidity: np.ndarray) -> np.ndarray:
+    """
+    Calculate the dew point with the Magnus formula
+
+    :param temperature: The air temperature in °C
+    :param relative_humidity: The relative humidity in %
+    :return: The dew point in °C
+    """
+    temperature = np.asarray(temperature, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.log(np.asarray(relative_humidity, dtype=np.float64) / 100) + 17.625 * temperature / (
+            243.04 + temperature
+        )
+        return 243.04 * gamma / (17.625 - gamma)
+
+
+def apparent_temperature(temperature: np.ndarray, relative_humidity: np.ndarray, wind_speed: np.ndarray) -> np.ndarray:
+    """
+    Calculate the apparent temperature with the formula of the Australian Bureau of Meteorology without radiation
+
+    :param temperature: The air temperature in °C
+    :param relative_humidity: The relative humidity in %
+    :param wind_speed: The wind speed at 10 m in km/h
+    :return: The apparent temperature in °C
+    """
+    temperature = np.asarray(temperature, dtype=np.float64)
+    vapour_pressure = (
+        np.asarray(relative_humidity, dtype=np.float64)
+        / 100
+        * 6.105
+        * np.exp(17.27 * temperature / (237.7 + temperature))
+    )
+    return temperature + 0.33 * vapour_pressure - 0.7 * np.asarray(wind_speed, dtype=np.float64) / 3.6 - 4.0
+
+
+def daily_aggregate(
+    hourly_time: np.ndarray, values: np.ndarray, daily_time: np.ndarray, utc_offset_seconds: int, aggregation: str
+) -> np.ndarray:
+    """
+    Aggregate hourly values to the local days of a daily time axis
+
+    :param hourly_time: The unix timestamps of the hourly values
+    :param values: The hourly values
+    :param daily_time: The unix timestamps of the local midnight of each day
+    :param utc_offset_seconds: The UTC offset of the local time
+    :param aggregation: "min", "max" or "mean"
+    :return: The aggregated value per day, NaN for days without (enough) hourly values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    days = (np.asarray(hourly_time, dtype=np.int64) + utc_offset_seconds) // 86400
+    first_day = (np.asarray(daily_time, dtype=np.int64)[:1] + utc_offset_seconds) // 86400
+    index = days - (first_day[0] if len(first_day) > 0 else 0)
+    valid = (index >= 0) & (index < len(daily_time)) & ~np.isnan(values)
+    index = index[valid]
+    counts = np.bincount(index, minlength=len(daily_time))
+
+    if aggregation == "mean":
+        result = np.bincount(index, weights=values[valid], minlength=len(daily_time)) / np.maximum(counts, 1)
+    else:
+        result = np.full(len(daily_time), np.inf if aggregation == "min" else -np.inf)
+        AGGREGATIONS[aggregation].at(result, index, values[valid])
+    result[counts < MIN_HOURS_PER_DAY] = np.nan
+    return result
+
+
+# variables of the current, hourly and 15 minutely block that are calculated from other variables of the block
+DERIVED = {
+    "dew_point_2m": (("temperature_2m", "relative_humidity_2m"), dew_point),
+    "apparent_temperature": (("temperature_2m", "relative_humidity_2m", "wind_speed_10m"), apparent_temperature),
+}
+# the derived variables need the default units
+DEFAULT_UNITS = {"temperature_unit": "celsius", "wind_speed_unit": "kmh"}
+
+
+class RequestPlan:
+    """
+    Class that holds the planned API request and adds the derived variables to the parsed result
+
+    :param params: The parameters to send to the API
+    :param fields: dict with the deduplicated variables of the original request per block
+    :param derived: dict with the variables per block that are calculated from other variables of the block
+    :param aggregated: dict with the daily variable and the hourly variable and aggregation it is calculated from
+    """
+
+    def __init__(self, params: dict, fields: dict, derived: dict = None, aggregated: dict = None):
+        self.logger = logging.getLogger(__name__)
+        self.params = params
+        self.fields = fields
+        self.derived = derived if derived is not None else dict()
+        self.aggregated = aggregated if aggregated is not None else dict()
+
+    def apply(self, result: dict, fallback: Callable = None) -> dict:
+        """
+        Add the derived variables to the parsed result and remove the variables that are only requested as input
+
+        :param result: The parsed weather data, "current" as dict, the other blocks as WeatherBlock
+        :param fallback: Function that requests the API values of a list of daily variables for the days without
+            enough hourly values, returns dict with the values per variable (default: None, NaN for these days)
+        :return: The weather data with the variables of the original request
+        """
+        if len(self.derived) == 0 and len(self.aggregated) == 0:
+            return result
+
+        for block, fields in self.derived.items():
+            if block not in result.keys():
+                continue
+            columns = result[block] if block == "current" else result[block].columns
+            for field in fields:
+                inputs, function = DERIVED[field]
+                values = np.round(function(*[columns[name] for name in inputs]), 1)
+                columns[field] = float(values) if block == "current" else values
+
+        if "daily" in result.keys() and "hourly" in result.keys():
+            daily = result["daily"]
+            hourly = result["hourly"]
+            incomplete = list()
+            for field, (source, aggregation) in self.aggregated.items():
+                values = daily_aggregate(
+                    hourly.time, hourly.columns[source], daily.time, daily.utc_offset_seconds, aggregation
+                )
+                daily.columns[field] = np.round(values, 1) if aggregation == "mean" else values
+                if np.isnan(values).any():
+                    incomplete.append(field)
+            if len(incomplete) > 0 and fallback is not None:
+                self.logger.debug("Use the API values of %s for the days without enough hourly values", incomplete)
+                for field, values in fallback(incomplete).items():
+                    values = np.asarray(values, dtype=np.float64)
+                    if field not in incomplete or len(values) != len(daily.time):
+                        continue
+                    missing = np.isnan(daily.columns[field])
+                    daily.columns[field] = np.where(missing, values, daily.columns[field])
+
+        # restore the variables and their order of the original request
+        for block in BLOCKS:
+            if block not in result.keys():
+                continue
+            if block not in self.fields.keys():
+                # the block is only requested as input of another block
+                del result[block]
+            elif block == "current":
+                current = result["current"]
+                ordered = {"time": current["time"]} if "time" in current.keys() else dict()
+                ordered.update({field: current[field] for field in self.fields["current"] if field in current.keys()})
+                # e.g. the weather code texts
+                ordered.update({key: value for key, value in current.items() if key not in self.params["current"]})
+                result["current"] = ordered
+            else:
+                columns = result[block].columns
+                result[block].columns = {field: columns[field] for field in self.fields[block] if field in columns}
+        return result
+
+
+class RequestPlanner:
+    """
+    Class to plan the API request with as few variables as possible
+
+    The variable lists are deduplicated. With derive enabled, a variable is calculated locally instead of requested,
+    if that does not need more variables than it saves: the dew point and the apparent temperature if their inputs
+    are requested anyway, the daily minimum, maximum and mean from the hourly values if the hourly variable is
+    requested anyway or replaces at least two daily variables. A request with more than 10 variables counts as
+    multiple API calls. The derived values can differ slightly from the API values, so derive is opt-in.
+
+    :param derive: Calculate derived variables locally (default: False)
+    """
+
+    def __init__(self, derive: bool = False):
+        self.logger = logging.getLogger(__name__)
+        self.derive = derive
+
+    def plan(self, params: dict) -> RequestPlan:
+        """
+        Plan the API request of the parameters
+
+        :param params: The request parameters
+        :return: The RequestPlan with the parameters to send
+        """
+        fields = dict()
+        for block in BLOCKS:
+            if block in params.keys():
+                values = params[block].split(",") if isinstance(params[block], str) else params[block]
+                fields[block] = list(dict.fromkeys(values))
+        planned = dict(params, **fields)
+        if not self.derive:
+            return RequestPlan(params=planned, fields=fields)
+
+        requested = {block: list(fields.get(block, list())) for block in BLOCKS}
+        aggregated = dict()
+        derived = dict()
+
+        # the daily minimum, maximum and mean, if the hourly time axis covers the days
+        if len(requested["daily"]) > 0 and not any(key in params.keys() for key in HOURLY_RANGE_PARAMETERS):
+            candidates = dict()
+            for field in requested["daily"]:
+                source, _, aggregation = field.rpartition("_")
+                if source in AGGREGATABLE and aggregation in AGGREGATIONS.keys():
+                    candidates.setdefault(source, list()).append((field, aggregation))
+            for source, daily_fields in candidates.items():
+                # the daily block must keep a variable for its time axis
+                if len(daily_fields) >= len(requested["daily"]):
+                    continue
+                if source in requested["hourly"] or len(daily_fields) >= 2:
+                    for field, aggregation in daily_fields:
+                        aggregated[field] = (source, aggregation)
+                        requested["daily"].remove(field)
+                    if source not in requested["hourly"]:
+                        requested["hourly"].append(source)
+
+        # the dew point and the apparent temperature, if their inputs are requested anyway
+        if all(params.get(key, default) == default for key, default in DEFAULT_UNITS.items()):
+            for block in ["current"] + TIMESERIES_BLOCKS:
+                for field in list(requested[block]):
+                    if field in DERIVED.keys() and all(name in requested[block] for name in DERIVED[field][0]):
+                        derived.setdefault(block, list()).append(field)
+                        requested[block].remove(field)
+
+        for block in BLOCKS:
+            if len(requested[block]) > 0:
+                planned[block] = requested[block]
+        if len(derived) > 0 or len(aggregated) > 0:
+            self.logger.debug("Derive %s and aggregate %s locally", derived, list(aggregated.keys()))
+        return RequestPlan(params=planned, fields=fields, derived=derived, aggregated=aggregated)
@@ -0,0 +1,196 @@
+"""
+###############################################################################
+# Library to answer weather lookups that are requested via MQTT v5 with
+# response topic and correlation data, identical concurrent requests are
+# coalesced into one lookup
+# seeAlso: https://docs.oasis-open.org/mqtt/mqtt/v5.0/os/mqtt-v5.0-os.html#_Toc3901252
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["RequestCoalescer", "RequestServer"]
+
+import json
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+
+
+class RequestCoalescer:
+    """
+    Class to run a function only once for concurrent calls with the same key
+
+    The first caller of a key runs the function, callers of the same key that arrive while it is running wait for
+    its result (or its exception) instead of running the function again.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__running = dict()
+
+    def run(self, key: str, function: Callable, timeout: float = None) -> tuple:
+        """
+        Run the function or wait for the running call with the same key
+
+        :param key: The key of the call
+        :param function: Function without arguments
+        :param timeout: The maximum seconds to wait for a running call (default: None, no limit)
+        :return: tuple with the result of the function and True, if the result was shared with a running call
+        :raise TimeoutError: If the running call does not finish within the timeout
+        """
+        with self.__lock:
+            future = self.__running.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.__running[key] = future
+        if not owner:
+            return future.result(timeout=timeout), True
+
+        try:
+            result = function()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.__lock:
+                del self.__running[key]
+
+
+class RequestServer:
+    """
+    Class to answer requests from an MQTT topic on the response topic of the request
+
+    A request is a JSON object. It is answered on the MQTT v5 response topic of the request message with the
+    correlation data of the request, requests without response topic are ignored. The handler gets the request and
+    returns the response, an exception is answered with {"error": "<message>"}. The requests are handled in worker
+    threads, identical requests that arrive while one is handled share its encoded response.
+
+    :param publisher: The connected MqttPublisher
+    :param topic: The request topic, also as shared subscription ($share/<group>/<topic>)
+    :param handler: Function that gets the request as dict and returns the response as dict
+    :param encode: Function to encode the response to bytes (default: compact JSON)
+    :param workers: The maximum number of requests handled at the same time (default: 4)
+    :param qos: The MQTT quality of service of the subscription and the responses (default: 0)
+    :param timeout: The maximum seconds to wait for the response of an identical request (default: None, no limit)
+    """
+
+    def __init__(
+        self,
+        publisher: any,
+        topic: str,
+        handler: Callable,
+        encode: Callable = None,
+        workers: int = 4,
+        qos: int = 0,
+        timeout: float = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        if workers < 1:
+            raise ValueError(f"Invalid number of workers: {workers}. Must be greater than 0.")
+        self.publisher = publisher
+        self.topic = topic
+        self.handler = handler
+        self.encode = encode if encode is not None else self.__encode_json
+        self.qos = qos
+        self.timeout = timeout
+        self.coalescer = RequestCoalescer()
+        self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="request")
+        self.__lock = threading.Lock()
+        self.__statistics = {"requests": 0, "coalesced": 0, "errors": 0, "ignored": 0}
+
+    @staticmethod
+    def __encode_json(response: dict) -> bytes:
+        return json.dumps(response, separators=(",", ":"), default=str).encode("utf-8")
+
+    def start(self) -> None:
+        """
+        Subscribe to the request topic
+        """
+        self.publisher.subscribe(self.topic, self.__on_message, qos=self.qos)
+        self.logger.info("Answer requests on MQTT topic %s", self.topic)
+
+    def stop(self) -> None:
+        """
+        Wait for the running requests and stop the worker threads
+        """
+        self.__executor.shutdown(wait=True)
+
+    def __on_message(self, client: any, userdata: any, message: any) -> Future:
+        # the network loop must not block, the request is handled by a worker thread
+        return self.__executor.submit(self.handle, message)
+
+    def __count(self, name: str) -> None:
+        with self.__lock:
+            self.__statistics[name] += 1
+
+    def handle(self, message: any) -> None:
+        """
+        Handle a request message and publish the response
+
+        :param message: The paho MQTT message of the request
+        """
+        properties = getattr(message, "properties", None)
+        response_topic = getattr(properties, "ResponseTopic", None)
+        if not response_topic:
+            self.logger.warning("Ignore request on %s without response topic", message.topic)
+            self.__count("ignored")
+            return
+        correlation_data = getattr(properties, "CorrelationData", None)
+        self.__count("requests")
+
+        try:
+            request = json.loads(message.payload)
+            if not isinstance(request, dict):
+                raise ValueError("The request must be a JSON object.")
+            key = json.dumps(request, sort_keys=True)
+            response, coalesced = self.coalescer.run(
+                key, lambda: self.encode(self.handler(request)), timeout=self.timeout
+            )
+            if coalesced:
+                self.__count("coalesced")
+        except Exception as e:
+            self.logger.warning("Failed to answer request on %s: %s", message.topic, e)
+            self.__count("errors")
+            response = self.encode({"error": str(e)})
+
+        response_properties = Properties(PacketTypes.PUBLISH)
+        if correlation_data is not None:
+            response_properties.CorrelationData = correlation_data
+        try:
+            self.publisher.publish(
+                topic=response_topic, payload=response, qos=self.qos, retain=False, properties=response_properties
+            )
+        except Exception as e:
+            self.logger.error("Failed to publish the response to %s: %s", response_topic, e)
+            return
+        self.logger.debug("Answered request on %s to %s", message.topic, response_topic)
+
+    def statistics(self, reset: bool = True) -> dict:
+        """
+        Get the request statistics since the last reset
+
+        :param reset: Reset the statistics (default: True)
+        :return: dict with the number of answered, coalesced, failed and ignored requests
+        """
+        with self.__lock:
+            result = dict(self.__statistics)
+            if reset:
+                self.__statistics = {name: 0 for name in self.__statistics.keys()}
+        return result
@@ -0,0 +1,245 @@
+"""
+###############################################################################
+# Library to schedule recurring jobs by interval or cron-style expression
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["Scheduler"]
+
+import datetime
+import logging
+import random
+import re
+import threading
+import time
+from typing import Callable
+
+
+class Scheduler:
+    """
+    Class to run a job periodically, either in a fixed interval or based on a cron-style expression
+
+    Supported expressions:
+      - interval in seconds, optional with unit suffix: "600", "30s", "10m", "1h"
+      - cron-style expression with five fields: "minute hour day-of-month month day-of-week"
+        each field supports "*", lists "1,2", ranges "1-5" and steps "*/15" or "0-30/5"
+
+    With jitter, every scheduled run is delayed by a random number of seconds up to jitter, so that multiple
+    instances with the same schedule do not run at the same time.
+
+    Cron expressions are evaluated in the wall clock time of the timezone, so a daily run keeps its local time across
+    daylight saving time changes. Intervals are counted in absolute time.
+
+    :param expression: The schedule expression
+    :param jitter: The maximum random delay of a run in seconds (default: 0)
+    :param timezone: The timezone of the cron expression, e.g. zoneinfo.ZoneInfo("Europe/Berlin") (default: UTC)
+    """
+
+    __interval_pattern = re.compile(r"^(\d+)([smh]?)$")
+    __interval_units = {"": 1, "s": 1, "m": 60, "h": 3600}
+    __cron_ranges = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str, jitter: float = 0, timezone: datetime.tzinfo = None):
+        self.logger = logging.getLogger(__name__)
+        self.expression = expression.strip()
+        if jitter < 0:
+            raise ValueError(f"Invalid schedule jitter: {jitter}. Must not be negative.")
+        self.jitter = jitter
+        self.timezone = datetime.timezone.utc if timezone is None else timezone
+        self.interval = None
+        self.cron = None
+
+        match = self.__interval_pattern.match(self.expression)
+        if match:
+            self.interval = int(match.group(1)) * self.__interval_units[match.group(2)]
+            if self.interval <= 0:
+                raise ValueError(f"Invalid schedule interval: {expression}. Must be greater than 0.")
+            self.logger.debug("Schedule every %s seconds", self.interval)
+        else:
+            fields = self.expression.split()
+            if len(fields) != 5:
+                raise ValueError(
+                    f"Invalid schedule expression: {expression}. Use an interval in seconds or a cron expression."
+                )
+            self.cron = [self.__parse_cron_field(fields[i], *self.__cron_ranges[i]) for i in range(5)]
+            # day-of-month and day-of-week are combined with OR if both are restricted (like cron does)
+            self.__dom_restricted = fields[2] != "*"
+            self.__dow_restricted = fields[4] != "*"
+            self.logger.debug("Schedule by cron expression: %s", self.expression)
+
+    @staticmethod
+    def __parse_cron_field(field: str, minimum: int, maximum: int) -> set:
+        """
+        Parse a single cron field into the set of allowed values
+
+        :param field: The cron field
+        :param minimum: The lowest allowed value
+        :param maximum: The highest allowed value
+        :return: set of allowed values
+        :raise ValueError: If the field can not be parsed
+        """
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                if not step_text.isdigit() or int(step_text) == 0:
+                    raise ValueError(f"Invalid step in cron field: {field}")
+                step = int(step_text)
+            if part == "*":
+                start, end = minimum, maximum
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                if not start_text.isdigit() or not end_text.isdigit():
+                    raise ValueError(f"Invalid range in cron field: {field}")
+                start, end = int(start_text), int(end_text)
+            elif part.isdigit():
+                start = int(part)
+                end = maximum if step > 1 else start
+            else:
+                raise ValueError(f"Invalid cron field: {field}")
+            if start < minimum or end > maximum or start > end:
+                raise ValueError(f"Cron field {field} out of range {minimum}-{maximum}")
+            values.update(range(start, end + 1, step))
+        # cron allows 0 and 7 as sunday in the day-of-week field
+        if maximum == 7 and 7 in values:
+            values.discard(7)
+            values.add(0)
+        return values
+
+    def __day_matches(self, moment: datetime.datetime) -> bool:
+        """
+        Check if the day of the given moment matches the cron expression
+
+        :param moment: The point in time to check
+        :return: True if the day matches
+        """
+        dom_match = moment.day in self.cron[2]
+        dow_match = (moment.isoweekday() % 7) in self.cron[4]
+        if self.__dom_restricted and self.__dow_restricted:
+            return dom_match or dow_match
+        return dom_match and dow_match
+
+    def next_run(self, after: datetime.datetime) -> datetime.datetime:
+        """
+        Calculate the next point in time the job needs to run
+
+        :param after: The point in time after which the next run is searched, with timezone it is converted to the
+            timezone of the scheduler
+        :return: The next run time
+        :raise ValueError: If no run time could be found within the next years
+        """
+        if self.interval is not None:
+            if after.tzinfo is None:
+                return after + datetime.timedelta(seconds=self.interval)
+            # the arithmetic of aware datetimes is in wall clock time, the interval is counted in UTC
+            return (after.astimezone(datetime.timezone.utc) + datetime.timedelta(seconds=self.interval)).astimezone(
+                after.tzinfo
+            )
+
+        if after.tzinfo is not None:
+            # every step is in the wall clock time of the timezone, the UTC offset follows the date of the step
+            after = after.astimezone(self.timezone)
+        moment = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.cron[3]:
+                year = moment.year + (1 if moment.month == 12 else 0)
+                month = 1 if moment.month == 12 else moment.month + 1
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self.__day_matches(moment):
+                moment = (moment + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.cron[1]:
+                moment = (moment + datetime.timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute not in self.cron[0]:
+                moment = moment + datetime.timedelta(minutes=1)
+                continue
+            return moment
+        raise ValueError(f"No matching run time found for cron expression: {self.expression}")
+
+    def jitter_delay(self) -> float:
+        """
+        Get a random delay for the next run
+
+        :return: The delay in seconds between 0 and jitter
+        """
+        return random.uniform(0, self.jitter) if self.jitter > 0 else 0.0
+
+    def now(self) -> datetime.datetime:
+        """
+        Get the current time in the timezone of the scheduler
+
+        :return: The current time
+        """
+        return datetime.datetime.now(tz=self.timezone)
+
+    def run(self, job: Callable[[], None], stop_event: threading.Event, run_immediately: bool = True) -> None:
+        """
+        Run the job according to the schedule until the stop event is set
+
+        :param job: The function to call
+        :param stop_event: Event that stops the scheduler loop when set
+        :param run_immediately: Run the job once directly after start (default: True)
+        """
+        Scheduler.run_all(jobs=[(self, job)], stop_event=stop_event, run_immediately=run_immediately)
+
+    @staticmethod
+    def run_all(jobs: list, stop_event: threading.Event, run_immediately: bool = True) -> None:
+        """
+        Run multiple jobs, each according to its own schedule, one after another in the calling thread
+        until the stop event is set
+
+        :param jobs: list of tuples (Scheduler, job function)
+        :param stop_event: Event that stops the scheduler loop when set
+        :param run_immediately: Run every job once directly after start (default: True)
+        """
+        if run_immediately:
+            for scheduler, job in jobs:
+                if stop_event.is_set():
+                    break
+                scheduler.__run_job(job)
+
+        # next run time, jitter delay, scheduler and job
+        pending = [
+            [scheduler.next_run(scheduler.now()), scheduler.jitter_delay(), scheduler, job] for scheduler, job in jobs
+        ]
+        while not stop_event.is_set():
+            entry = min(pending, key=lambda entry: entry[0].timestamp() + entry[1])
+            next_run, delay, scheduler, job = entry
+            scheduler.logger.debug("Next run scheduled at %s (jitter %.1fs)", next_run.isoformat(), delay)
+            # wait returns True if the event was set during waiting
+            if stop_event.wait(timeout=max(0.0, next_run.timestamp() + delay - time.time())):
+                break
+            scheduler.__run_job(job)
+            # keep the cadence stable, but skip runs that were missed because the jobs took too long
+            now = scheduler.now()
+            next_run = scheduler.next_run(next_run)
+            if next_run.timestamp() < now.timestamp():
+                next_run = scheduler.next_run(now)
+            entry[0], entry[1] = next_run, scheduler.jitter_delay()
+        logging.getLogger(__name__).debug("Scheduler stopped")
+
+    def __run_job(self, job: Callable[[], None]) -> None:
+        """
+        Run the job and log errors instead of terminating the scheduler
+
+        :param job: The function to call
+        """
+        try:
+            job()
+        except Exception as e:
+            self.logger.exception("Scheduled job failed: %s", e)
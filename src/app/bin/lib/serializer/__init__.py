@@ -0,0 +1,145 @@
+"""
+###############################################################################
+# Library to serialize weather data payloads once into JSON, CBOR or
+# MessagePack with per-field decimal precision
+# seeAlso: https://github.com/ijl/orjson
+# seeAlso: https://cbor.io/
+# seeAlso: https://msgpack.org/
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["PayloadSerializer"]
+
+import json
+import logging
+import math
+
+# optional faster or binary encoders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class PayloadSerializer:
+    """
+    Class to encode payloads into bytes
+
+    With precision, floats are rounded to the decimal places of their field (or the default precision) and NaN or
+    infinite values are replaced by None before encoding. Without precision, the payload is encoded as it is.
+    JSON is encoded with orjson if it is installed, both JSON encoders write NaN and infinite values as null.
+
+    :param format: The payload format "json", "cbor" or "msgpack" (default: "json")
+    :param precision: dict with the number of decimal places per field name (default: None)
+    :param default_precision: The number of decimal places of fields without precision (default: None)
+    :raise ValueError: If the format is not valid or the encoder is not installed
+    """
+
+    __formats = ("json", "cbor", "msgpack")
+
+    def __init__(self, format: str = "json", precision: dict = None, default_precision: int = None):
+        self.logger = logging.getLogger(__name__)
+        if format not in self.__formats:
+            raise ValueError(f"Invalid payload format: {format}. Must be one of {list(self.__formats)}.")
+        if format == "cbor" and cbor2 is None:
+            raise ValueError("The payload format cbor requires the python package cbor2.")
+        if format == "msgpack" and msgpack is None:
+            raise ValueError("The payload format msgpack requires the python package msgpack.")
+        self.format = format
+        self.precision = dict(precision or dict())
+        self.default_precision = default_precision
+        if format == "json":
+            self.logger.debug("Encode JSON with %s", "orjson" if orjson is not None else "json")
+
+    @classmethod
+    def from_string(cls, precision: str, **kwargs) -> "PayloadSerializer":
+        """
+        Create the serializer from a comma separated list of decimal precisions
+
+        :param precision: The precisions, e.g. "2,temperature_2m=1,pressure_msl=0", a value without field name is
+            the default precision
+        :param kwargs: Further arguments of the PayloadSerializer
+        :return: The serializer
+        :raise ValueError: If a precision is not valid
+        """
+        fields = dict()
+        default_precision = None
+        for item in precision.split(","):
+            if item.strip() == "":
+                continue
+            if "=" in item:
+                field, digits = item.split("=", 1)
+                fields[field.strip()] = int(digits)
+            else:
+                default_precision = int(item)
+        return cls(precision=fields, default_precision=default_precision, **kwargs)
+
+    def __round(self, value: float, digits: int | None) -> float | int | None:
+        # NaN and infinity are not valid JSON numbers
+        if not math.isfinite(value):
+            return None
+        if digits is None:
+            return value
+        if digits == 0:
+            return int(round(value))
+        return round(value, digits)
+
+    def __normalize(self, value: any, digits: int | None) -> any:
+        if type(value) is float:
+            return self.__round(value, digits)
+        if isinstance(value, dict):
+            precision = self.precision
+            return {k: self.__normalize(v, precision.get(k, digits)) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.__normalize(v, digits) for v in value]
+        return value
+
+    def normalize(self, payload: dict) -> dict:
+        """
+        Round the floats of a payload to their precision and replace NaN and infinity by None
+
+        :param payload: The payload
+        :return: A normalized copy of the payload
+        """
+        return self.__normalize(payload, self.default_precision)
+
+    def encode(self, payload: dict) -> bytes:
+        """
+        Normalize and encode a payload
+
+        :param payload: The payload
+        :return: The encoded payload
+        """
+        if len(self.precision) > 0 or self.default_precision is not None:
+            payload = self.normalize(payload)
+        if self.format == "cbor":
+            return cbor2.dumps(payload)
+        if self.format == "msgpack":
+            return msgpack.packb(payload)
+        if orjson is not None:
+            return orjson.dumps(payload)
+        try:
+            return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        except ValueError:
+            # the json module writes NaN as a bare literal, so the values are replaced like orjson does
+            payload = self.__normalize(payload, None)
+            return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,458 @@
+"""
+###############################################################################
+# Library to keep MQTT messages in a bounded, append-only spool on disk while
+# the MQTT broker is not reachable and to forward them after reconnect
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["MessageSpool", "SpooledMessage", "SpoolingPublisher"]
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable
+
+# record header (timestamp, qos, retain, length of the topic, length of the payload)
+RECORD_HEADER = struct.Struct("<dBBHI")
+SEGMENT_SUFFIX = ".spool"
+HEAD_FILE = "head.json"
+
+
+class SpooledMessage:
+    """
+    Class that holds a spooled MQTT message
+
+    :param topic: The MQTT topic
+    :param payload: The encoded message payload
+    :param qos: The MQTT quality of service (default: 0)
+    :param retain: Publish as retained message (default: False)
+    :param timestamp: Unix timestamp when the message was spooled (default: now)
+    """
+
+    # a spooled message has no MQTT message ID
+    mid = None
+
+    def __init__(self, topic: str, payload: bytes, qos: int = 0, retain: bool = False, timestamp: float = None):
+        self.topic = topic
+        self.payload = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+        self.qos = qos
+        self.retain = retain
+        self.timestamp = time.time() if timestamp is None else timestamp
+        # the position of the record in the spool, (segment, offset) of its start and its end
+        self.start = None
+        self.end = None
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the message as spool record
+
+        :return: The record header, the topic and the payload
+        """
+        topic = self.topic.encode("utf-8")
+        header = RECORD_HEADER.pack(self.timestamp, self.qos, int(self.retain), len(topic), len(self.payload))
+        return header + topic + self.payload
+
+
+class MessageSpool:
+    """
+    Class to spool MQTT messages on disk, oldest first
+
+    The messages are appended to segment files that are named by their sequence number. The position of the oldest
+    message that is not forwarded yet is kept in a head file, forwarded segments are removed. If the spool exceeds
+    its maximum size, the oldest segment is evicted. An interrupted append loses only the last message.
+
+    :param directory: The directory of the spool
+    :param max_bytes: The maximum size of the spool in bytes (default: 50 MB)
+    :param segment_bytes: The size of a segment file in bytes, the unit of the eviction (default: 1 MB)
+    :param clock: Function that returns the current unix timestamp (default: time.time)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 50 * 1024 * 1024,
+        segment_bytes: int = 1024 * 1024,
+        clock: Callable = time.time,
+    ):
+        self.logger = logging.getLogger(__name__)
+        if max_bytes < 1:
+            raise ValueError(f"Invalid maximum spool size: {max_bytes}. Must be greater than 0.")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # at least two segments, so the eviction does not remove the whole spool
+        self.segment_bytes = max(1, min(segment_bytes, max_bytes // 2))
+        self.clock = clock
+        self.__lock = threading.Lock()
+        self.__statistics = {"spooled": 0, "drained": 0, "evicted": 0, "drain_rate": None}
+        os.makedirs(directory, exist_ok=True)
+
+        self.__segments = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)]) for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)
+        )
+        self.__head = self.__load_head()
+        if len(self.__segments) > 0:
+            # an interrupted append leaves an incomplete record
+            path = self.__path(self.__segments[-1])
+            valid = self.__scan(self.__segments[-1])[-1] if os.path.getsize(path) > 0 else 0
+            if valid < os.path.getsize(path):
+                os.truncate(path, valid)
+        self.__depth = sum(len(self.__scan(segment)) - 1 for segment in self.__segments)
+        self.__bytes = sum(os.path.getsize(self.__path(segment)) for segment in self.__segments) - self.__head[1]
+        if self.__depth > 0:
+            self.logger.info("%s spooled messages to forward", self.__depth)
+
+    def __path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment}{SEGMENT_SUFFIX}")
+
+    def __load_head(self) -> tuple:
+        path = os.path.join(self.directory, HEAD_FILE)
+        if len(self.__segments) == 0:
+            return (0, 0)
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                head = tuple(json.load(f))
+            if head[0] in self.__segments:
+                return head
+        return (self.__segments[0], 0)
+
+    def __save_head(self) -> None:
+        path = os.path.join(self.directory, HEAD_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(list(self.__head), f)
+        os.replace(path + ".tmp", path)
+
+    def __scan(self, segment: int) -> list:
+        """
+        Get the offsets of the records of a segment that are not forwarded yet
+
+        :param segment: The sequence number of the segment
+        :return: list of the record offsets, followed by the end of the last complete record
+        """
+        path = self.__path(segment)
+        size = os.path.getsize(path)
+        offset = self.__head[1] if segment == self.__head[0] else 0
+        offsets = list()
+        with open(path, "rb") as f:
+            while offset + RECORD_HEADER.size <= size:
+                f.seek(offset)
+                _, _, _, topic_length, payload_length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                end = offset + RECORD_HEADER.size + topic_length + payload_length
+                if end > size:
+                    break
+                offsets.append(offset)
+                offset = end
+        return offsets + [offset]
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of spooled messages
+        """
+        with self.__lock:
+            return self.__depth
+
+    def append(self, message: SpooledMessage) -> None:
+        """
+        Append a message to the spool, the oldest messages are evicted if the spool is full
+
+        :param message: The message
+        """
+        record = message.to_bytes()
+        if len(record) > self.max_bytes:
+            self.logger.warning("Message to %s is larger than the spool, it is dropped", message.topic)
+            return
+        with self.__lock:
+            while self.__bytes + len(record) > self.max_bytes and len(self.__segments) > 0:
+                self.__evict()
+            if len(self.__segments) == 0 or os.path.getsize(self.__path(self.__segments[-1])) >= self.segment_bytes:
+                self.__segments.append(self.__segments[-1] + 1 if len(self.__segments) > 0 else 0)
+                if len(self.__segments) == 1:
+                    self.__head = (self.__segments[0], 0)
+            with open(self.__path(self.__segments[-1]), "ab") as f:
+                f.write(record)
+            self.__depth += 1
+            self.__bytes += len(record)
+            self.__statistics["spooled"] += 1
+
+    def __evict(self) -> None:
+        segment = self.__segments.pop(0)
+        evicted = len(self.__scan(segment)) - 1
+        self.__bytes -= os.path.getsize(self.__path(segment)) - self.__head[1]
+        self.__depth -= evicted
+        self.__statistics["evicted"] += evicted
+        os.remove(self.__path(segment))
+        self.__head = (self.__segments[0], 0) if len(self.__segments) > 0 else (0, 0)
+        self.__save_head()
+        self.logger.warning("Spool is full, evicted the %s oldest messages", evicted)
+
+    def peek(self, limit: int) -> list:
+        """
+        Read the oldest spooled messages without removing them
+
+        :param limit: The maximum number of messages
+        :return: list of SpooledMessage
+        """
+        result = list()
+        with self.__lock:
+            for segment in self.__segments:
+                offsets = self.__scan(segment)
+                with open(self.__path(segment), "rb") as f:
+                    for start, end in zip(offsets[:-1], offsets[1:]):
+                        if len(result) >= limit:
+                            return result
+                        f.seek(start)
+                        timestamp, qos, retain, topic_length, payload_length = RECORD_HEADER.unpack(
+                            f.read(RECORD_HEADER.size)
+                        )
+                        topic = f.read(topic_length).decode("utf-8")
+                        message = SpooledMessage(topic, f.read(payload_length), qos, bool(retain), timestamp)
+                        message.start = (segment, start)
+                        message.end = (segment, end)
+                        result.append(message)
+        return result
+
+    def commit(self, messages: list) -> None:
+        """
+        Remove forwarded messages from the spool
+
+        :param messages: The forwarded messages from peek(), in the order of the spool
+        """
+        if len(messages) == 0:
+            return
+        with self.__lock:
+            # messages that were evicted in the meantime are not counted again
+            committed = [message for message in messages if message.start >= self.__head]
+            if len(committed) == 0:
+                return
+            self.__depth -= len(committed)
+            self.__bytes -= sum(len(message.to_bytes()) for message in committed)
+            self.__head = committed[-1].end
+            while len(self.__segments) > 1 and self.__segments[0] < self.__head[0]:
+                os.remove(self.__path(self.__segments.pop(0)))
+            segment = self.__segments[0]
+            if self.__head[1] >= os.path.getsize(self.__path(segment)) and len(self.__segments) > 1:
+                os.remove(self.__path(self.__segments.pop(0)))
+                self.__head = (self.__segments[0], 0)
+            self.__save_head()
+
+    def drain(
+        self, publish: Callable, flush: Callable = None, batch_size: int = 100, rate: float = None, sleep=time.sleep
+    ) -> int:
+        """
+        Forward the spooled messages in batches, oldest first
+
+        A batch is removed from the spool when all its messages are published and flushed. If publishing fails,
+        the draining stops and the batch is forwarded again the next time (at least once delivery).
+
+        :param publish: Function to publish a SpooledMessage
+        :param flush: Function to wait until the published messages are completed (default: None)
+        :param batch_size: The number of messages per batch (default: 100)
+        :param rate: The maximum number of messages per second (default: None, no limit)
+        :param sleep: Function to wait the given seconds (default: time.sleep)
+        :return: The number of forwarded messages
+        """
+        drained = 0
+        started_at = self.clock()
+        while True:
+            batch = self.peek(batch_size)
+            if len(batch) == 0:
+                break
+            batch_started_at = self.clock()
+            try:
+                for message in batch:
+                    publish(message)
+                if flush is not None:
+                    flush()
+            except Exception as e:
+                self.logger.warning("Failed to forward spooled messages, %s are left: %s", self.depth, e)
+                break
+            self.commit(batch)
+            drained += len(batch)
+            if rate is not None and rate > 0:
+                wait = len(batch) / rate - (self.clock() - batch_started_at)
+                if wait > 0:
+                    sleep(wait)
+
+        if drained > 0:
+            elapsed = self.clock() - started_at
+            with self.__lock:
+                self.__statistics["drained"] += drained
+                self.__statistics["drain_rate"] = drained / elapsed if elapsed > 0 else None
+            self.logger.info("Forwarded %s spooled messages, %s are left", drained, self.depth)
+        return drained
+
+    def statistics(self, reset: bool = True) -> dict:
+        """
+        Get the spool statistics, the counters since the last reset
+
+        :param reset: Reset the counters (default: True)
+        :return: dict with the depth and size of the spool, the spooled, drained and evicted messages and the drain
+            rate in messages per second of the last drain
+        """
+        with self.__lock:
+            result = dict(self.__statistics, depth=self.__depth, bytes=self.__bytes)
+            if reset:
+                self.__statistics = {"spooled": 0, "drained": 0, "evicted": 0, "drain_rate": None}
+        return result
+
+
+class SpoolingPublisher:
+    """
+    Class that publishes over an MQTT publisher and spools the messages while the MQTT broker is not reachable
+
+    The messages are spooled if the connection fails, the publisher is disconnected or a message is not completed
+    by flush(). A failed connection is tried again with the next connect(), the spooled messages are forwarded by
+    drain() before new messages are published.
+
+    :param connect: Function that returns a connected MqttPublisher
+    :param spool: The MessageSpool
+    :param batch_size: The number of messages per drain batch (default: 100)
+    :param rate: The maximum number of drained messages per second (default: None, no limit)
+    """
+
+    def __init__(self, connect: Callable, spool: MessageSpool, batch_size: int = 100, rate: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.spool = spool
+        self.batch_size = batch_size
+        self.rate = rate
+        self.publisher = None
+        self.__connect = connect
+        self.__lock = threading.Lock()
+        self.__sent = list()
+        self.__subscriptions = list()
+
+    @property
+    def connected(self) -> bool:
+        """
+        True if the MQTT publisher is connected
+        """
+        return self.publisher is not None and self.publisher.connected
+
+    def connect(self) -> bool:
+        """
+        Connect the MQTT publisher, if not connected yet
+
+        :return: True if the MQTT publisher is connected
+        """
+        if self.publisher is None:
+            try:
+                self.publisher = self.__connect()
+            except Exception as e:
+                self.logger.warning("MQTT server not reachable, messages are spooled: %s", e)
+                return False
+            for topic, callback, qos in self.__subscriptions:
+                self.publisher.subscribe(topic, callback, qos=qos)
+        return self.connected
+
+    def subscribe(self, topic: str, callback: Callable, qos: int = 0) -> None:
+        """
+        Subscribe to a topic, also after a later connect
+
+        :param topic: The MQTT topic filter
+        :param callback: Function called with client, userdata and message from the network loop
+        :param qos: The MQTT quality of service (default: 0)
+        """
+        self.__subscriptions.append((topic, callback, qos))
+        if self.publisher is not None:
+            self.publisher.subscribe(topic, callback, qos=qos)
+
+    def publish(self, topic: str, payload: bytes | str, qos: int = 0, retain: bool = False, properties: any = None):
+        """
+        Publish a message or spool it, if the MQTT broker is not reachable
+
+        :param topic: The MQTT topic
+        :param payload: The message payload
+        :param qos: The MQTT quality of service (default: 0)
+        :param retain: Publish as retained message (default: False)
+        :param properties: The MQTT v5 properties of the message, they are not spooled (default: None)
+        :return: The paho message info or the SpooledMessage
+        """
+        message = SpooledMessage(topic, payload, qos, retain, self.spool.clock())
+        if self.connected:
+            try:
+                info = self.publisher.publish(
+                    topic=topic, payload=payload, qos=qos, retain=retain, properties=properties
+                )
+                with self.__lock:
+                    self.__sent.append((info, message))
+                return info
+            except Exception as e:
+                self.logger.warning("Failed to publish to %s, the message is spooled: %s", topic, e)
+        self.spool.append(message)
+        return message
+
+    def flush(self, timeout: float | None = None) -> None:
+        """
+        Wait until the published messages are completed, the messages that are not completed are spooled
+
+        :param timeout: The maximum time to wait in seconds (default: publisher timeout)
+        """
+        if self.publisher is None:
+            return
+        with self.__lock:
+            sent = self.__sent
+            self.__sent = list()
+        try:
+            self.publisher.flush(timeout=timeout)
+        except Exception as e:
+            incomplete = [message for info, message in sent if not info.is_published()]
+            for message in incomplete:
+                self.spool.append(message)
+            self.logger.warning("Spooled %s messages that were not completed: %s", len(incomplete), e)
+
+    def drain(self) -> int:
+        """
+        Connect and forward the spooled messages
+
+        :return: The number of forwarded messages
+        """
+        if self.spool.depth == 0 or not self.connect():
+            return 0
+
+        def publish(message: SpooledMessage) -> None:
+            self.publisher.publish(topic=message.topic, payload=message.payload, qos=message.qos, retain=message.retain)
+
+        return self.spool.drain(publish=publish, flush=self.publisher.flush, batch_size=self.batch_size, rate=self.rate)
+
+    def statistics(self, reset: bool = True) -> dict:
+        """
+        Get the publish statistics of the MQTT publisher since the last reset
+
+        :param reset: Reset the statistics (default: True)
+        :return: dict like MqttPublisher.statistics(), without MQTT publisher nothing is published
+        """
+        if self.publisher is not None:
+            return self.publisher.statistics(reset=reset)
+        return {
+            "published": 0,
+            "failed": 0,
+            "inflight": 0,
+            "inflight_max": 0,
+            "latency_min": None,
+            "latency_avg": None,
+            "latency_max": None,
+        }
+
+    def disconnect(self) -> None:
+        """
+        Wait for pending messages, spool the messages that are not completed and disconnect the MQTT publisher
+        """
+        if self.publisher is None:
+            return
+        self.flush()
+        self.publisher.disconnect()
+        self.publisher = None
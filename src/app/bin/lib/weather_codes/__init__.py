@@ -6,45 +6,99 @@
 # Author: Michael Oberdorf
 # Date: 2025-04-11
 # Last modified by: Michael Oberdorf
-# Last modified at: 2026-01-11
+# Last modified at: 2026-10-18
 ###############################################################################\n
 """
 
 __author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
 __status__ = "production"
-__date__ = "2026-01-11"
-__version_info__ = ("1", "0", "2")
+__date__ = "2026-10-18"
+__version_info__ = ("1", "1", "0")
 __version__ = ".".join(__version_info__)
 
 __all__ = ["WeatherCodes"]
 
 import json
 import logging
-import math
 import os
+import threading
+from types import MappingProxyType
+
+UNKNOWN_WEATHER_CODE = "Unknown weather code"
 
 
 class WeatherCodes:
     """
     Class to translate weather codes to human readable description
+
+    The translation files are loaded only once per language into a dense table that is indexed by the
+    weather code and shared between all instances.
     """
 
     __translations_path = os.path.join(__path__[0], "translations")
+    __tables = dict()
+    __mappings = dict()
+    __arrays = dict()
+    __tables_lock = threading.Lock()
 
     def __init__(self, language: str = "en"):
         self.logger = logging.getLogger(__name__)
+        self.language = language
+        self.table = self.get_table(language)
+
+    @property
+    def weather_codes(self) -> MappingProxyType:
+        """
+        The weather code translations as loaded from the translation file, read-only
+
+        :return: mapping with the weather code as string and the description
+        """
+        return self.__mappings[self.language]
+
+    @classmethod
+    def languages(cls) -> list:
+        """
+        Get the languages that have a translation file
+
+        :return: list of language codes
+        """
+        return sorted(os.path.splitext(f)[0] for f in os.listdir(cls.__translations_path) if f.endswith(".json"))
 
-        # identify the weather code translation file
-        weather_code_translation_file = os.path.join(self.__translations_path, f"{language}.json")
-        if not os.path.isfile(weather_code_translation_file):
-            self.logger.warning(
-                f"Weather code translation file for language '{language}' not found. Falling back to default language 'en'."
-            )
-            weather_code_translation_file = os.path.join(self.__translations_path, "en.json")
+    @classmethod
+    def get_table(cls, language: str = "en") -> tuple:
+        """
+        Get the translation table of a language, the translation file is only read on first use.
+        Unsupported languages fall back to the default language 'en'.
+
+        :param language: The language code
+        :return: tuple with the description at the index of the weather code
+        """
+        table = cls.__tables.get(language)
+        if table is not None:
+            return table
+
+        with cls.__tables_lock:
+            if language in cls.__tables.keys():
+                return cls.__tables[language]
+
+            # identify the weather code translation file
+            weather_code_translation_file = os.path.join(cls.__translations_path, f"{language}.json")
+            if not os.path.isfile(weather_code_translation_file):
+                logging.getLogger(__name__).warning(
+                    f"Weather code translation file for language '{language}' not found. Falling back to default language 'en'."
+                )
+                weather_code_translation_file = os.path.join(cls.__translations_path, "en.json")
 
-        # load the weather code translations
-        with open(weather_code_translation_file, encoding="utf-8") as f:
-            self.weather_codes = json.load(f)
+            # load the weather code translations into a dense table
+            with open(weather_code_translation_file, encoding="utf-8") as f:
+                mapping = json.load(f)
+            weather_codes = {int(code): text for code, text in mapping.items()}
+            table = [UNKNOWN_WEATHER_CODE] * (max(weather_codes.keys()) + 1)
+            for code, text in weather_codes.items():
+                table[code] = text
+            cls.__mappings[language] = MappingProxyType(mapping)
+            cls.__tables[language] = tuple(table)
+            return cls.__tables[language]
 
     def translate(self, code: int) -> str:
         """
@@ -53,23 +107,34 @@ class WeatherCodes:
         :param code: Weather code
         :return: Human readable description
         """
-        if code is None:
-            self.logger.debug("Weather code is None, returning 'Unknown weather code'")
-            return "Unknown weather code"
-        if isinstance(code, str):
-            self.logger.debug(
-                f"Weather code {code} is a string but must be an integer, returning 'Unknown weather code'"
-            )
-            return "Unknown weather code"
-        # Avoid "cannot convert float NaN to integer"
-        if math.isnan(code):
-            self.logger.debug(f"Weather code {code} is NaN, returning 'Unknown weather code'")
-            return "Unknown weather code"
-        if isinstance(code, float):
-            self.logger.debug(f"Weather code {code} is float, converting to int")
-            code = int(code)
-        code = str(code)
-        self.logger.debug(f"Translating weather code {code}")
-        translation = self.weather_codes.get(code, "Unknown weather code")
-        self.logger.debug(f"Weather code {code} translated to '{translation}'")
-        return translation
+        # fast path for valid integer codes
+        if type(code) is int:
+            return self.table[code] if 0 <= code < len(self.table) else UNKNOWN_WEATHER_CODE
+        if code is None or isinstance(code, str):
+            self.logger.debug("Weather code %s is not a number, returning '%s'", code, UNKNOWN_WEATHER_CODE)
+            return UNKNOWN_WEATHER_CODE
+        # Avoid "cannot convert float NaN to integer", NaN is the only value that is not equal to itself
+        if code != code:
+            return UNKNOWN_WEATHER_CODE
+        code = int(code)
+        return self.table[code] if 0 <= code < len(self.table) else UNKNOWN_WEATHER_CODE
+
+    def translate_many(self, codes) -> list:
+        """
+        Translate multiple weather codes to human readable descriptions by one index into the table
+
+        :param codes: Iterable of weather codes (e.g. list or numpy array), NaN values are allowed
+        :return: list of human readable descriptions
+        """
+        # numpy is only needed for the arrays of the time series, it is imported on first use
+        import numpy as np
+
+        array = self.__arrays.get(self.language)
+        if array is None:
+            array = np.array(self.table, dtype=object)
+            self.__arrays[self.language] = array
+        codes = np.asarray(codes, dtype=np.float64)
+        valid = ~np.isnan(codes) & (codes >= 0) & (codes < len(array))
+        result = np.full(codes.shape, UNKNOWN_WEATHER_CODE, dtype=object)
+        result[valid] = array[codes[valid].astype(np.int64)]
+        return result.tolist()
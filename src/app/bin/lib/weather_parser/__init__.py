@@ -0,0 +1,244 @@
+"""
+###############################################################################
+# Library to parse Open-Meteo FlatBuffers response blocks column wise into
+# numpy arrays instead of reading the values one by one
+# seeAlso: https://github.com/open-meteo/sdk/tree/main/python
+#------------------------------------------------------------------------------
+# Author: Michael Oberdorf
+# Date: 2026-10-18
+# Last modified by: Michael Oberdorf
+# Last modified at: 2026-10-18
+###############################################################################\n
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["WeatherBlock"]
+
+import logging
+import time
+
+import numpy as np
+from openmeteo_sdk.Aggregation import Aggregation
+from openmeteo_sdk.Variable import Variable
+
+# names of the openmeteo_sdk enums by value, e.g. 0 -> "undefined"
+VARIABLE_NAMES = {value: name for name, value in vars(Variable).items() if not name.startswith("_")}
+AGGREGATION_SUFFIXES = {
+    value: {"minimum": "min", "maximum": "max"}.get(name, name)
+    for name, value in vars(Aggregation).items()
+    if not name.startswith("_") and name != "none"
+}
+
+
+class WeatherBlock:
+    """
+    Class that reads an Open-Meteo VariablesWithTime block (daily, hourly, minutely_15) into numpy columns
+
+    Float variables are read with ValuesAsNumpy(), int64 variables (e.g. sunrise, sunset) with ValuesInt64AsNumpy().
+    The time axis is built once as array of unix timestamps.
+    Float values are rounded to the precision of float32, so 4.32 is not returned as 4.320000171661377.
+    """
+
+    def __init__(self, data: any, fields: list, utc_offset_seconds: int = 0):
+        if not data:
+            raise ValueError("No weather data block found in the response.")
+        self.utc_offset_seconds = int(utc_offset_seconds)
+        self.time = np.arange(data.Time(), data.TimeEnd(), data.Interval(), dtype=np.int64)
+        self.interval = data.Interval()
+        self.columns = dict()
+        self.timestamp_columns = set()
+
+        for field, index in zip(fields, self.field_indexes(data, fields)):
+            variable = data.Variables(index) if index >= 0 else None
+            if variable is not None and variable.ValuesInt64Length() > 0:
+                self.columns[field] = variable.ValuesInt64AsNumpy()
+                self.timestamp_columns.add(field)
+            elif variable is not None and variable.ValuesLength() > 0:
+                self.columns[field] = self.round_float32(variable.ValuesAsNumpy())
+            else:
+                self.columns[field] = np.full(len(self.time), np.nan, dtype=np.float32)
+
+    @staticmethod
+    def variable_name(variable: any) -> str:
+        """
+        Build the Open-Meteo API name of a response variable from its identity,
+        e.g. temperature at 2 m with aggregation maximum is "temperature_2m_max"
+
+        :param variable: The openmeteo_sdk.VariableWithValues
+        :return: The API name of the variable
+        """
+        name = VARIABLE_NAMES.get(variable.Variable(), "undefined")
+        if variable.PressureLevel() > 0:
+            name += f"_{variable.PressureLevel()}hPa"
+        elif variable.Altitude() > 0:
+            name += f"_{variable.Altitude()}m"
+        elif variable.DepthTo() > 0:
+            name += f"_{variable.Depth()}_to_{variable.DepthTo()}cm"
+        elif variable.Depth() > 0:
+            name += f"_{variable.Depth()}cm"
+        if variable.Aggregation() in AGGREGATION_SUFFIXES.keys():
+            name += f"_{AGGREGATION_SUFFIXES[variable.Aggregation()]}"
+        return name
+
+    @classmethod
+    def field_indexes(cls, data: any, fields: list) -> list:
+        """
+        Find the response variable of each requested field by its identity.
+        Fields without a variable of the same name are not mapped by position, their values are NaN.
+
+        :param data: The openmeteo_sdk block (VariablesWithTime)
+        :param fields: The requested fields
+        :return: list with the index of the variable per field, -1 if the response has no variable for the field
+        """
+        names = [cls.variable_name(data.Variables(i)) for i in range(data.VariablesLength())]
+        indexes = [names.index(field) if field in names else -1 for field in fields]
+        missing = [field for field, index in zip(fields, indexes) if index < 0]
+        if len(missing) > 0:
+            logging.getLogger(__name__).warning(
+                "The response has no variable for %s, the response variables are %s",
+                ", ".join(missing),
+                ", ".join(names),
+            )
+        return indexes
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @property
+    def utc_offset(self) -> str:
+        """
+        The UTC offset in ISO 8601 format, e.g. +01:00
+        """
+        sign = "-" if self.utc_offset_seconds < 0 else "+"
+        hours, minutes = divmod(abs(self.utc_offset_seconds) // 60, 60)
+        return f"{sign}{hours:02d}:{minutes:02d}"
+
+    def local_datetime64(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Convert unix timestamps into numpy datetime64 values in local time
+
+        :param timestamps: array of unix timestamps
+        :return: array of datetime64[s] in local time
+        """
+        return (np.asarray(timestamps, dtype=np.int64) + self.utc_offset_seconds).astype("datetime64[s]")
+
+    def dates(self, rows: slice = None) -> list:
+        """
+        The time axis as local dates
+
+        :param rows: The rows to include (default: all rows)
+        :return: list of dates in the format YYYY-MM-DD
+        """
+        timestamps = self.time if rows is None else self.time[rows]
+        return np.datetime_as_string(self.local_datetime64(timestamps), unit="D").tolist()
+
+    def day_index(self, offset: int = 0, now: float = None) -> int:
+        """
+        Get the row of a day relative to the local today on the time axis, e.g. offset 1 for tomorrow
+
+        :param offset: The number of days from today (default: 0)
+        :param now: The current unix timestamp (default: time.time())
+        :return: The index of the first row of the day or -1, if the day is not on the time axis
+        """
+        if len(self.time) == 0:
+            return -1
+        now = time.time() if now is None else now
+        day = self.local_datetime64([int(now)]).astype("datetime64[D]")[0] + np.timedelta64(offset, "D")
+        days = self.local_datetime64(self.time).astype("datetime64[D]")
+        index = int(np.searchsorted(days, day, side="left"))
+        return index if index < len(days) and days[index] == day else -1
+
+    def isoformat(self, timestamps: np.ndarray = None) -> list:
+        """
+        Format unix timestamps as local ISO 8601 date and time with UTC offset
+
+        :param timestamps: array of unix timestamps (default: the time axis)
+        :return: list of ISO 8601 strings, e.g. 2026-01-07T08:15:00+01:00
+        """
+        if timestamps is None:
+            timestamps = self.time
+        local = np.datetime_as_string(self.local_datetime64(timestamps), unit="s")
+        return np.char.add(local, self.utc_offset).tolist()
+
+    def values(self, field: str, rows: slice = None) -> list:
+        """
+        Get the values of a field as python objects.
+        Timestamps are formatted as ISO 8601 strings, weather codes are converted to int (NaN stays NaN).
+
+        :param field: The field name
+        :param rows: The rows to include, only these values are converted (default: all rows)
+        :return: list of values along the time axis
+        """
+        column = self.columns[field] if rows is None else self.columns[field][rows]
+        if field in self.timestamp_columns:
+            return self.isoformat(column)
+        if field == "weather_code":
+            return self.weather_codes(column)
+        return column.tolist()
+
+    def to_columns(self, fields: list = None, extra_columns: dict = None) -> dict:
+        """
+        Get the block as compact column oriented dictionary with one list per field
+
+        :param fields: The fields to include (default: all fields)
+        :param extra_columns: Additional precalculated columns, e.g. weather code texts (default: None)
+        :return: dict with the time axis as "time" and a list of values per field
+        """
+        result = {"time": self.isoformat()}
+        for field in self.columns.keys() if fields is None else fields:
+            result[field] = self.values(field)
+        if extra_columns is not None:
+            result.update(extra_columns)
+        return result
+
+    def timesteps(self, fields: list = None, extra_columns: dict = None):
+        """
+        Generator that yields the block row by row, one dictionary per timestep.
+        Only the rows are created lazily, the nested dictionary of the whole block is never built.
+
+        :param fields: The fields to include (default: all fields)
+        :param extra_columns: Additional precalculated columns, e.g. weather code texts (default: None)
+        :return: generator of dictionaries with "time" and the value of each field
+        """
+        columns = [(field, self.values(field)) for field in (self.columns.keys() if fields is None else fields)]
+        if extra_columns is not None:
+            columns.extend(extra_columns.items())
+        times = self.isoformat()
+        for i in range(len(times)):
+            row = {"time": times[i]}
+            for field, values in columns:
+                row[field] = values[i]
+            yield row
+
+    @staticmethod
+    def round_float32(column: np.ndarray, significant_digits: int = 7) -> np.ndarray:
+        """
+        Round float32 values to significant digits as float64, to get the shortest decimal representation
+
+        :param column: array of float values
+        :param significant_digits: The number of significant digits, float32 has about 7 (default: 7)
+        :return: array of float64 values, NaN values are kept
+        """
+        values = np.asarray(column, dtype=np.float64)
+        magnitude = np.zeros_like(values)
+        np.log10(np.abs(values), out=magnitude, where=np.isfinite(values) & (values != 0))
+        scale = 10.0 ** (significant_digits - 1 - np.floor(magnitude))
+        return np.round(values * scale) / scale
+
+    @staticmethod
+    def weather_codes(column: np.ndarray) -> list:
+        """
+        Convert a weather code column into int values, NaN values are kept as NaN
+
+        :param column: array of weather codes as float
+        :return: list of weather codes
+        """
+        valid = ~np.isnan(column)
+        result = column.astype(object)
+        result[valid] = column[valid].astype(np.int64)
+        return result.tolist()
@@ -13,20 +13,44 @@ Last modified by: Michael Oberdorf
 Last modified at: 2026-07-05
 """
 
+from __future__ import annotations
+
 import datetime
 import json
 import logging
 import math
 import os
-import ssl
+import signal
 import sys
-
-import openmeteo_requests
-import paho.mqtt.client as mqtt
-import pytz
-import requests_cache  # seeAlso: https://pypi.org/project/requests-cache/
+import threading
+import time
+import zoneinfo
+from typing import TYPE_CHECKING
+
+from lib.change_detector import ChangeDetector
+from lib.field_topics import FieldTopics
+from lib.forecast_cache import CacheEntry, ForecastCache
+from lib.grid_index import GridIndex
+from lib.locations import Location, Locations
+from lib.metrics import Metrics
+from lib.quota import ApiQuota
+from lib.recorder import ResponseRecorder, ResponseReplayer
+from lib.scheduler import Scheduler
+from lib.serializer import PayloadSerializer
 from lib.weather_codes import WeatherCodes
-from retry_requests import retry  # seeAlso: https://pypi.org/project/retry-requests/
+
+# the HTTP, MQTT and numpy stacks are imported on first use to keep the start up fast
+if TYPE_CHECKING:
+    import paho.mqtt.client as mqtt
+    from lib.ensemble import EnsembleAggregator
+    from lib.history_store import HistoryStore
+    from lib.mqtt_publisher import MqttPublisher
+    from lib.multi_publisher import MultiPublisher
+    from lib.request_planner import RequestPlan, RequestPlanner
+    from lib.request_server import RequestServer
+    from lib.spool import MessageSpool, SpoolingPublisher
+    from lib.weather_parser import WeatherBlock
+    from requests_cache import CachedSession
 
 __status__ = "production"
 __date__ = "2026-07-05"
@@ -34,8 +58,31 @@ __version_info__ = ("1", "6", "0")
 __version__ = ".".join(__version_info__)
 __script_path__ = os.path.dirname(__file__)
 __config_path__ = os.path.join(os.path.dirname(__script_path__), "etc")
-__local_tz__ = pytz.timezone("UTC")
+__local_tz__ = zoneinfo.ZoneInfo("UTC")
 __open_meteo_api_url__ = "https://api.open-meteo.com/v1/forecast"
+__run_modes__ = ["oneshot", "daemon", "replay"]
+__timeseries_blocks__ = {"hourly": "Hourly", "minutely_15": "Minutely15"}
+__forecast_publish_modes__ = ["array", "stream"]
+__openmeteo_session = None
+__openmeteo_session_lock = threading.Lock()
+__forecast_cache = None
+__request_cache = None
+__api_quota = None
+__api_quota_lock = threading.Lock()
+__request_planner = None
+__grid_index = None
+__ensemble_aggregator = None
+__response_recorder = None
+__history_store = None
+__message_spools = dict()
+__mqtt_targets = None
+__change_detector = None
+__change_detection_modes__ = ["off", "skip", "delta"]
+__publish_layouts__ = ["json", "fields", "both"]
+__discovery_published = set()
+__discovery_lock = threading.Lock()
+__payload_serializer = None
+__metrics = Metrics(prefix="weather2mqtt")
 
 """
 ###############################################################################
@@ -53,20 +100,20 @@ def __makeAbsolutePath(path: str) -> str:
     :return: absolute filesystem path
     :rtype: str
     """
-    log.debug(f"def makeAbsolutePath(path: str = {path}) -> str:")
+    log.debug("def makeAbsolutePath(path: str = %s) -> str:", path)
 
     if not os.path.isabs(path):
-        log.debug(f"Releative path found: {path}")
+        log.debug("Releative path found: %s", path)
         path = os.path.join(os.path.dirname(__file__), path)
-        log.debug(f"Absolute path is: {path}")
+        log.debug("Absolute path is: %s", path)
     else:
-        log.debug(f"Path is not relative: {path} - skip conversion.")
+        log.debug("Path is not relative: %s - skip conversion.", path)
 
     # validate if path exists
     if not os.path.exists(path):
-        log.debug(f"Path not found exception for: {path}")
+        log.debug("Path not found exception for: %s", path)
     else:
-        log.debug(f"Path exists: {path}")
+        log.debug("Path exists: %s", path)
 
     return path
 
@@ -97,25 +144,115 @@ def initialize_logger(severity: int = logging.INFO) -> logging.Logger:
     return log
 
 
-def load_config_file() -> dict:
+def get_modes() -> list:
+    """
+    Get the list of modes from the comma separated MODE environment variable.
+
+    :return list: The list of modes.
+    """
+    return [mode.strip() for mode in os.environ.get("MODE", "").split(",") if mode.strip() != ""]
+
+
+def __merge_request_data(data: dict, mode_data: dict) -> dict:
+    """
+    Merge the API request data of a mode into the request data of other modes.
+    Variable lists are joined, for the forecast range the larger value is used.
+
+    :param data dict: The already merged API request data.
+    :param mode_data dict: The API request data of the mode.
+    :return dict: The merged API request data.
+    """
+    merged = dict(data)
+    for key, value in mode_data.items():
+        if key == "day_offset":
+            # applied per cycle by get_request_payload()
+            continue
+        if key not in merged.keys():
+            merged[key] = value
+        elif isinstance(value, list) and isinstance(merged[key], list):
+            merged[key] = list(dict.fromkeys(merged[key] + value))
+        elif key in ["forecast_days", "past_days"]:
+            merged[key] = max(merged[key], value)
+        elif merged[key] != value:
+            log.warning("Conflicting value for %s in modes: %s != %s, using %s", key, merged[key], value, merged[key])
+    return merged
+
+
+def parse_day_offset(value: any) -> tuple:
+    """
+    Parse the days a mode publishes relative to today.
+
+    :param value any: A day offset (1 for tomorrow), a list with the first and last day offset ([0, 2])
+        or a string ("1" or "0..2").
+    :return tuple: The first and the last day offset.
+    :raise ValueError: If the day offset is not valid.
+    """
+    if isinstance(value, str):
+        value = [int(part) for part in value.split("..")] if ".." in value else int(value)
+    if isinstance(value, (list, tuple)):
+        if len(value) != 2:
+            raise ValueError(f"Invalid day offset: {value}. Use the first and the last day.")
+        first, last = int(value[0]), int(value[1])
+    else:
+        first = last = int(value)
+    if first > last:
+        raise ValueError(f"Invalid day offset: {value}. The first day must not be after the last day.")
+    return first, last
+
+
+def __load_mode_data(mode: str) -> dict:
+    """
+    Load the API request data of a mode from its configuration file.
+    The day offset of the mode is kept as "day_offset", it is not sent to the API.
+
+    :param mode str: The mode, e.g. "current".
+    :return dict: The API request data of the mode.
+    :raise ValueError: If the configuration file of the mode is not found.
+    """
+    config_file = os.path.join(__config_path__, mode + ".json")
+    if not os.path.isfile(config_file):
+        raise ValueError(f"Configuration file {config_file} not found.")
+    log.debug("Load configuration from file: %s", config_file)
+    with open(config_file) as f:
+        mode_config = json.load(f)
+    mode_data = mode_config.get("data", dict())
+    if "day_offset" in mode_config.keys():
+        mode_data["day_offset"] = parse_day_offset(mode_config["day_offset"])
+    return mode_data
+
+
+def get_available_modes() -> list:
+    """
+    Get the list of modes with a configuration file.
+
+    :return list: The sorted list of modes.
+    """
+    return sorted(name[: -len(".json")] for name in os.listdir(__config_path__) if name.endswith(".json"))
+
+
+def load_config_file(modes: list = None) -> dict:
     """
     Load the configuration file and return the configuration as a dictionary.
 
+    :param modes list: The modes to load. (default: None, the modes of MODE)
     :return dict: The loaded configuration.
     :raise ValueError: If the configuration file is not valid.
     :raise TypeError: If the configuration file is not a string.
     :raise Exception: If the configuration file cannot be loaded.
     """
-    if os.environ.get("MODE") is not None:
-        config_file = os.path.join(__config_path__, os.environ.get("MODE") + ".json")
-        if os.path.isfile(config_file):
-            log.debug("Load configuration from file: {}".format(config_file))
-            with open(config_file) as f:
-                config = json.load(f)
-        else:
-            raise ValueError(f"Configuration file {config_file} not found.")
-    else:
+    if modes is None:
+        modes = get_modes()
+    if len(modes) == 0:
         raise ValueError("No configuration file specified. Please set the MODE environment variable.")
+
+    # multiple modes can be combined into one API request, e.g. MODE=current,tomorrow
+    config = dict()
+    config["modes"] = dict()
+    for mode in modes:
+        config["modes"][mode] = __load_mode_data(mode)
+        if os.environ.get("DAY_OFFSET") is not None and "day_offset" in config["modes"][mode].keys():
+            config["modes"][mode]["day_offset"] = parse_day_offset(os.environ.get("DAY_OFFSET"))
+        config["data"] = __merge_request_data(config.get("data", dict()), config["modes"][mode])
     log.debug("Configuration loaded")
 
     # Enrich data with environment variables
@@ -137,25 +274,162 @@ def load_config_file() -> dict:
     if os.environ.get("TZ") is not None:
         config["data"]["timezone"] = os.environ.get("TZ")
 
+    # Load a list of locations to request in batches
+    if os.environ.get("LOCATIONS_FILE") is not None:
+        config["locations"] = Locations.from_file(os.environ.get("LOCATIONS_FILE"))
+    elif os.environ.get("LOCATIONS") is not None:
+        config["locations"] = Locations.from_string(os.environ.get("LOCATIONS"))
+    if "locations" in config.keys():
+        log.debug("Loaded %s locations", len(config["locations"]))
+
     return config
 
 
-def __initialize_mqtt_client() -> mqtt.Client:
+def get_request_payload(config: dict) -> dict:
+    """
+    Get the API request data of a cycle.
+    If all daily data is for modes with day offset, only their days are requested with start_date and end_date.
+    With hourly or 15 minutely data, or with timezone "auto", forecast_days and past_days are extended to cover
+    the days instead, because the date of today in the timezone of the API is not known before the request.
+
+    :param config dict: The loaded configuration.
+    :return dict: The API request data.
+    """
+    payload = dict(config["data"])
+    modes_data = config["modes"].values()
+    offsets = [mode_data["day_offset"] for mode_data in modes_data if "day_offset" in mode_data.keys()]
+    if len(offsets) == 0:
+        return payload
+    first = min(offset[0] for offset in offsets)
+    last = max(offset[1] for offset in offsets)
+
+    timezone = None
+    if payload.get("timezone", "GMT") != "auto":
+        try:
+            timezone = zoneinfo.ZoneInfo(payload.get("timezone", "GMT"))
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            log.warning("Unknown timezone %s, request the days with forecast_days", payload.get("timezone"))
+    daily_without_offset = any(
+        "daily" in mode_data.keys() and "day_offset" not in mode_data.keys() for mode_data in modes_data
+    )
+    timeseries = any(block in payload.keys() for block in __timeseries_blocks__.keys())
+    if timezone is None or daily_without_offset or timeseries:
+        payload["forecast_days"] = max(int(payload.get("forecast_days", 7)), last + 1)
+        if first < 0:
+            payload["past_days"] = max(int(payload.get("past_days", 0)), -first)
+        return payload
+
+    today = datetime.datetime.now(tz=timezone).date()
+    payload.pop("forecast_days", None)
+    payload.pop("past_days", None)
+    payload["start_date"] = (today + datetime.timedelta(days=first)).isoformat()
+    payload["end_date"] = (today + datetime.timedelta(days=last)).isoformat()
+    return payload
+
+
+def parse_mqtt_targets(value: str = None) -> list:
+    """
+    Parse the MQTT brokers to publish to.
+    Every broker is an object with the keys name, server, port, tls, tls_insecure, ca_bundle, client_id,
+    protocol_version, username, password, password_file, qos, retain, max_inflight and timeout. The keys that are
+    not given are taken from the MQTT_* variables of the environment.
+
+    :param value str: JSON list of the brokers, without the MQTT_* variables define the only broker. (default: None)
+    :return list: list of dict with the settings per broker.
+    :raise ValueError: If the MQTT targets are not valid.
+    """
+    default = {
+        "name": "default",
+        "server": os.environ.get("MQTT_SERVER"),
+        "port": int(os.environ.get("MQTT_PORT", "1883")),
+        "tls": os.environ.get("MQTT_TLS", "false").lower() == "true",
+        "tls_insecure": os.environ.get("MQTT_TLS_INSECURE", "false").lower() == "true",
+        "ca_bundle": os.environ.get("REQUESTS_CA_BUNDLE"),
+        "client_id": os.environ.get("MQTT_CLIENT_ID"),
+        "protocol_version": os.environ.get("MQTT_PROTOCOL_VERSION", "3"),
+        "username": os.environ.get("MQTT_USERNAME"),
+        "password": os.environ.get("MQTT_PASSWORD"),
+        "password_file": os.environ.get("MQTT_PASSWORD_FILE"),
+        "qos": int(os.environ.get("MQTT_QOS", "0")),
+        "retain": os.environ.get("MQTT_RETAIN", "false").lower() == "true",
+        "max_inflight": int(os.environ.get("MQTT_MAX_INFLIGHT", "20")),
+        "timeout": float(os.environ.get("MQTT_PUBLISH_TIMEOUT_SEC", "10")),
+    }
+    if default["qos"] not in [0, 1, 2]:
+        log.warning("Invalid MQTT QoS level: {}. Using QoS 0.".format(default["qos"]))
+        default["qos"] = 0
+    if value is None or value.strip() == "":
+        return [default]
+
+    targets = json.loads(value)
+    if not isinstance(targets, list) or len(targets) == 0:
+        raise ValueError("The MQTT targets must be a non-empty JSON list of objects.")
+    result = list()
+    for i, target in enumerate(targets):
+        if not isinstance(target, dict):
+            raise ValueError(f"Invalid MQTT target: {target}. Must be a JSON object.")
+        unknown = set(target.keys()) - set(default.keys())
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown settings of MQTT target {i}: {', '.join(sorted(unknown))}.")
+        settings = dict(default, **target)
+        # without name the broker is named by its hostname
+        settings["name"] = str(target.get("name", settings["server"]))
+        if "password" in target.keys() and "password_file" not in target.keys():
+            # the password of the target has precedence over the MQTT_PASSWORD_FILE of the environment
+            settings["password_file"] = None
+        if settings["qos"] not in [0, 1, 2]:
+            raise ValueError(
+                f"Invalid MQTT QoS level of target {settings['name']}: {settings['qos']}. Must be 0, 1 or 2."
+            )
+        result.append(settings)
+    names = [target["name"] for target in result]
+    if len(set(names)) < len(names):
+        raise ValueError(f"The names of the MQTT targets are not unique: {', '.join(names)}.")
+    return result
+
+
+def __get_mqtt_targets() -> list:
+    """
+    Get the MQTT brokers to publish to from MQTT_TARGETS or the file MQTT_TARGETS_FILE.
+
+    :return list: list of dict with the settings per broker.
+    :raise ValueError: If the MQTT targets are not valid.
+    """
+    global __mqtt_targets
+    if __mqtt_targets is None:
+        value = os.environ.get("MQTT_TARGETS")
+        if os.environ.get("MQTT_TARGETS_FILE") is not None:
+            with open(__makeAbsolutePath(os.environ.get("MQTT_TARGETS_FILE"))) as f:
+                value = f.read()
+        __mqtt_targets = parse_mqtt_targets(value)
+        log.debug("Use MQTT targets: %s", ", ".join(target["name"] for target in __mqtt_targets))
+    return __mqtt_targets
+
+
+def __initialize_mqtt_client(target: dict = None) -> mqtt.Client:
     """
     Initialize the MQTT client with the given configuration from environment.
 
+    :param target dict: The settings of the MQTT broker. (default: None, the first of the MQTT targets)
     :return mqtt.Client: The initialized MQTT client.
     :raise ValueError: If the MQTT client configuration is not valid.
     :raise Exception: If the MQTT client cannot be initialized.
     """
-    if os.environ.get("MQTT_CLIENT_ID") is not None:
-        log.debug("Use MQTT client ID: {}".format(os.environ.get("MQTT_CLIENT_ID")))
+    import ssl
 
-    if os.environ.get("MQTT_PROTOCOL_VERSION") == "5":
+    import paho.mqtt.client as mqtt
+
+    if target is None:
+        target = __get_mqtt_targets()[0]
+
+    if target["client_id"] is not None:
+        log.debug("Use MQTT client ID: %s", target["client_id"])
+
+    if str(target["protocol_version"]) == "5":
         log.debug("MQTT protocol version 5")
         client = mqtt.Client(
             callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-            client_id=os.environ.get("MQTT_CLIENT_ID"),
+            client_id=target["client_id"],
             userdata=None,
             transport="tcp",
             protocol=mqtt.MQTTv5,
@@ -164,7 +438,7 @@ def __initialize_mqtt_client() -> mqtt.Client:
         log.debug("MQTT protocol version 3.1.1")
         client = mqtt.Client(
             callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-            client_id=os.environ.get("MQTT_CLIENT_ID"),
+            client_id=target["client_id"],
             clean_session=True,
             userdata=None,
             transport="tcp",
@@ -172,13 +446,13 @@ def __initialize_mqtt_client() -> mqtt.Client:
         )
 
     # configure TLS
-    if os.environ.get("MQTT_TLS", "false").lower() == "true":
+    if target["tls"]:
         log.debug("Configure MQTT connection to use TLS encryption.")
 
-        if os.environ.get("MQTT_TLS_INSECURE", "false").lower() == "true":
+        if target["tls_insecure"]:
             log.debug("Configure MQTT connection to use TLS with insecure mode.")
             client.tls_set(
-                ca_certs=os.environ.get("REQUESTS_CA_BUNDLE"),
+                ca_certs=target["ca_bundle"],
                 cert_reqs=ssl.CERT_NONE,
                 tls_version=ssl.PROTOCOL_TLSv1_2,
                 ciphers=None,
@@ -187,7 +461,7 @@ def __initialize_mqtt_client() -> mqtt.Client:
         else:
             log.debug("Configure MQTT connection to use TLS with secure mode.")
             client.tls_set(
-                ca_certs=os.environ.get("REQUESTS_CA_BUNDLE"),
+                ca_certs=target["ca_bundle"],
                 cert_reqs=ssl.CERT_REQUIRED,
                 tls_version=ssl.PROTOCOL_TLSv1_2,
                 ciphers=None,
@@ -195,45 +469,332 @@ def __initialize_mqtt_client() -> mqtt.Client:
             client.tls_insecure_set(False)
 
     # configure authentication
-    mqtt_pass = None
-    if os.environ.get("MQTT_PASSWORD") is not None:
-        mqtt_pass = os.environ.get("MQTT_PASSWORD")
-    if os.environ.get("MQTT_PASSWORD_FILE") is not None:
-        if not os.path.isfile(os.environ.get("MQTT_PASSWORD_FILE")):
-            raise ValueError("MQTT password file {} not found.".format(os.environ.get("MQTT_PASSWORD_FILE")))
-        with open(os.environ.get("MQTT_PASSWORD_FILE")) as f:
+    mqtt_pass = target["password"]
+    if target["password_file"] is not None:
+        if not os.path.isfile(target["password_file"]):
+            raise ValueError("MQTT password file {} not found.".format(target["password_file"]))
+        with open(target["password_file"]) as f:
             mqtt_pass = f.read().strip()
-    if os.environ.get("MQTT_USERNAME") is not None and mqtt_pass is not None:
-        log.debug("Set username ({}) and password for MQTT connection".format(os.environ.get("MQTT_USERNAME")))
-        client.username_pw_set(os.environ.get("MQTT_USERNAME"), mqtt_pass)
+    if target["username"] is not None and mqtt_pass is not None:
+        log.debug("Set username (%s) and password for MQTT connection", target["username"])
+        client.username_pw_set(target["username"], mqtt_pass)
 
     return client
 
 
-def request_weather_data(payload: dict) -> dict:
+def __count_response(response: any, *args, **kwargs) -> any:
     """
-    Request weather data from the Open-Meteo API with the given configuration.
+    Response hook of the HTTP session that counts cache hits, cache misses and retries.
+    The hook is called for responses from the cache too.
+
+    :param response requests.Response: The HTTP response.
+    :return requests.Response: The unchanged HTTP response.
+    """
+    if getattr(response, "from_cache", False):
+        __metrics.increment("cache_hits_total", help="Open-Meteo API responses served from the cache")
+    else:
+        __metrics.increment("cache_misses_total", help="Open-Meteo API responses requested from the API")
+    retries = getattr(getattr(response.raw, "retries", None), "history", None)
+    if retries:
+        __metrics.increment("http_retries_total", len(retries), help="Retries of Open-Meteo API requests")
+    if response.status_code == 429 and __get_api_quota() is not None:
+        retry_after = response.headers.get("Retry-After", "60")
+        __get_api_quota().block(float(retry_after) if retry_after.isdigit() else 60.0)
+    return response
+
+
+def __get_openmeteo_session() -> CachedSession:
+    """
+    Get the HTTP session of the Open-Meteo API with cache and retry on error.
+    The session is created once and reused, so the HTTP connections and the cache backend
+    stay open across multiple requests (e.g. in daemon mode).
+    The HTTP stack is imported with the first request, a fresh forecast cache entry does not need it.
+
+    :return requests_cache.CachedSession: The cached HTTP session.
+    """
+    global __openmeteo_session
+    with __openmeteo_session_lock:
+        if __openmeteo_session is not None:
+            return __openmeteo_session
+
+        import requests_cache  # seeAlso: https://pypi.org/project/requests-cache/
+
+        # seeAlso: https://pypi.org/project/retry-requests/
+        from retry_requests import retry
+
+        # initialize cache directory
+        cache_dir = __makeAbsolutePath(os.environ.get("CACHE_DIR", "/app/cache"))
+        if not os.path.exists(cache_dir):
+            log.debug("Cache directory not found, create: %s", cache_dir)
+            os.makedirs(cache_dir)
+        log.debug("Using cache directory: %s", cache_dir)
+        # Setup the Open-Meteo API session with cache and retry on error
+        cache_session = requests_cache.CachedSession(
+            f"{cache_dir}/.cache", expire_after=int(os.environ.get("CACHE_EXPIRY_AFTER_SEC", "600"))
+        )
+        cache_session.hooks["response"].append(__count_response)
+        __openmeteo_session = retry(cache_session, retries=5, backoff_factor=0.2)
+        return __openmeteo_session
+
+
+def __get_forecast_cache() -> ForecastCache | None:
+    """
+    Get the forecast cache that returns the last good response while the API is slow or down.
+    In daemon mode expired responses are refreshed in background, in oneshot mode before they are used.
+
+    :return ForecastCache: The forecast cache or None, if disabled by FORECAST_CACHE.
+    """
+    global __forecast_cache
+    if os.environ.get("FORECAST_CACHE", "false").lower() != "true":
+        return None
+    if __forecast_cache is None:
+        cache_dir = __makeAbsolutePath(os.environ.get("CACHE_DIR", "/app/cache"))
+        __forecast_cache = ForecastCache(
+            directory=os.path.join(cache_dir, "forecast"),
+            background=os.environ.get("RUN_MODE", "oneshot").lower() == "daemon",
+            max_stale=float(os.environ.get("FORECAST_CACHE_MAX_STALE_SEC", "86400")),
+        )
+    return __forecast_cache
+
+
+def __get_request_cache() -> ForecastCache | None:
+    """
+    Get the forecast cache of the on-demand lookups, kept apart from the scheduled requests.
+    The lookups can use any coordinates, so the number of entries is limited by REQUEST_CACHE_MAX_ENTRIES.
+
+    :return ForecastCache: The forecast cache of the lookups or None, if disabled by FORECAST_CACHE.
+    """
+    global __request_cache
+    if os.environ.get("FORECAST_CACHE", "false").lower() != "true":
+        return None
+    if __request_cache is None:
+        cache_dir = __makeAbsolutePath(os.environ.get("CACHE_DIR", "/app/cache"))
+        __request_cache = ForecastCache(
+            directory=os.path.join(cache_dir, "requests"),
+            background=os.environ.get("RUN_MODE", "oneshot").lower() == "daemon",
+            max_stale=float(os.environ.get("FORECAST_CACHE_MAX_STALE_SEC", "86400")),
+            max_entries=int(os.environ.get("REQUEST_CACHE_MAX_ENTRIES", "1000")),
+        )
+    return __request_cache
+
+
+def __get_api_quota() -> ApiQuota | None:
+    """
+    Get the quota that throttles the weighted Open-Meteo API calls from environment.
+    The bucket levels and usage counters are persisted in QUOTA_STATE_FILE, so one-shot runs share the quota.
+
+    :return ApiQuota: The API quota or None, if disabled by QUOTA.
+    :raise ValueError: If the quota configuration is not valid.
+    """
+    global __api_quota
+    if os.environ.get("QUOTA", "false").lower() != "true":
+        return None
+    with __api_quota_lock:
+        if __api_quota is not None:
+            return __api_quota
+
+        state_file = os.environ.get("QUOTA_STATE_FILE")
+        if state_file is None:
+            cache_dir = __makeAbsolutePath(os.environ.get("CACHE_DIR", "/app/cache"))
+            os.makedirs(cache_dir, exist_ok=True)
+            state_file = os.path.join(cache_dir, "quota.json")
+        __api_quota = ApiQuota.from_string(
+            os.environ.get("QUOTA_LIMITS", ""),
+            state_file=state_file,
+            max_wait=float(os.environ.get("QUOTA_MAX_WAIT_SEC", "60")),
+        )
+        return __api_quota
+
+
+def __get_request_planner() -> RequestPlanner:
+    """
+    Get the planner that deduplicates the requested variables and derives variables locally.
+    The derived variables are enabled by DERIVE_VARIABLES=true.
+
+    :return RequestPlanner: The request planner.
+    """
+    global __request_planner
+    if __request_planner is None:
+        from lib.request_planner import RequestPlanner
+
+        __request_planner = RequestPlanner(derive=os.environ.get("DERIVE_VARIABLES", "false").lower() == "true")
+    return __request_planner
+
+
+def plan_weather_request(payload: dict) -> RequestPlan:
+    """
+    Plan the Open-Meteo API request of a payload.
+    The planning is deterministic, so the response of the planned request is parsed with the plan of the same payload.
 
     :param payload dict: The configuration for the Open-Meteo API request.
-    :return dict: The weather data from the Open-Meteo API.
+    :return RequestPlan: The plan with the parameters to send.
+    """
+    return __get_request_planner().plan(payload)
+
+
+def __fetch_weather_data(payload: dict, force_refresh: bool = False) -> bytes:
+    """
+    Request the Open-Meteo API and return the raw FlatBuffers response body.
+
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :param force_refresh bool: Bypass the HTTP cache, the response is still stored. (default: False)
+    :return bytes: The response body with one length prefixed response per location and model.
+    :raise QuotaExceededError: If the API quota does not allow the request within QUOTA_MAX_WAIT_SEC.
     :raise Exception: If the weather data cannot be requested.
     """
-    log.debug(f"Request Open-Meteo API {__open_meteo_api_url__} with parameters: {payload}")
-    # initialize cache directory
-    cache_dir = __makeAbsolutePath(os.environ.get("CACHE_DIR", "/app/cache"))
-    if not os.path.exists(cache_dir):
-        log.debug(f"Cache directory not found, create: {cache_dir}")
-        os.makedirs(cache_dir)
-    log.debug(f"Using cache directory: {cache_dir}")
-    # Setup the Open-Meteo API client with cache and retry on error
-    cache_session = requests_cache.CachedSession(
-        f"{cache_dir}/.cache", expire_after=int(os.environ.get("CACHE_EXPIRY_AFTER_SEC", "600"))
-    )
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-    responses = openmeteo.weather_api(__open_meteo_api_url__, params=payload)
-    response = responses[0]
+    payload = plan_weather_request(payload).params
+    quota = __get_api_quota()
+    if quota is not None:
+        weight = ApiQuota.weight(payload)
+        waited = quota.acquire(weight)
+        quota.save()
+        __metrics.increment("api_calls_total", help="Requests to the Open-Meteo API")
+        __metrics.increment("api_call_weight_total", weight, help="Weighted Open-Meteo API calls")
+        if waited > 0:
+            __metrics.increment("quota_wait_seconds_total", waited, help="Seconds waited for the API quota")
+        log.debug("Open-Meteo API request with weight %.1f", weight)
+    session = __get_openmeteo_session()
+    with __metrics.timer("fetch"):
+        response = session.get(
+            __open_meteo_api_url__,
+            params={**payload, "format": "flatbuffers"},
+            force_refresh=force_refresh,
+            timeout=float(os.environ.get("REQUEST_TIMEOUT_SEC", "30")),
+        )
+    if response.status_code in [400, 429]:
+        # the API explains the rejected request in a JSON body
+        raise Exception(f"Open-Meteo API request failed ({response.status_code}): {response.json().get('reason')}")
+    response.raise_for_status()
+    # the raw body is decoded by __decode_weather_responses and stored as is by the forecast cache
+    return response.content
+
+
+def __decode_weather_responses(body: bytes) -> list:
+    """
+    Decode a raw FlatBuffers response body into the responses per location and model.
+
+    :param body bytes: The response body.
+    :return list: list of openmeteo_sdk.WeatherApiResponse.
+    """
+    from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+    responses = list()
+    position = 0
+    while position < len(body):
+        length = int.from_bytes(body[position : position + 4], byteorder="little")
+        responses.append(WeatherApiResponse.GetRootAs(body, position + 4))
+        position += length + 4
+    return responses
+
+
+def __get_response_recorder() -> ResponseRecorder | None:
+    """
+    Get the recorder that appends the raw API responses to RECORD_FILE.
+
+    :return ResponseRecorder: The response recorder or None, if RECORD_FILE is not set.
+    """
+    global __response_recorder
+    if os.environ.get("RECORD_FILE") is None:
+        return None
+    if __response_recorder is None:
+        __response_recorder = ResponseRecorder(path=__makeAbsolutePath(os.environ.get("RECORD_FILE")))
+    return __response_recorder
+
+
+def __request_weather_responses(payload: dict, lookup: bool = False) -> tuple:
+    """
+    Request the Open-Meteo API through the forecast cache.
+    The response body is recorded, if RECORD_FILE is set.
+
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :param lookup bool: The request is an on-demand lookup, cached in the request cache. (default: False)
+    :return tuple: list of openmeteo_sdk.WeatherApiResponse and the CacheEntry (None without forecast cache).
+    :raise Exception: If the weather data cannot be requested and no cached data is available.
+    """
+    forecast_cache = __get_request_cache() if lookup else __get_forecast_cache()
+    if forecast_cache is None:
+        body = __fetch_weather_data(payload)
+        entry = None
+    else:
+        # the forecast cache decides when to refresh, so the HTTP cache must not return an older response
+        entry = forecast_cache.get(payload, fetch=lambda params: __fetch_weather_data(params, force_refresh=True))
+        if entry.stale:
+            __metrics.increment("forecast_cache_stale_total", help="Cycles that used stale data after an API error")
+        body = entry.body
+
+    recorder = __get_response_recorder()
+    if recorder is not None:
+        recorder.record(params=payload, body=body, timestamp=None if entry is None else entry.fetched_at)
+    return __decode_weather_responses(body), entry
 
+
+def __mark_stale(result: dict, entry: CacheEntry) -> None:
+    """
+    Mark the weather data as stale, if it is from an expired cache entry after a failed API request.
+
+    :param result dict: The parsed weather data.
+    :param entry CacheEntry: The cache entry of the weather data.
+    """
+    if entry is not None and entry.stale:
+        result["stale"] = True
+        result["fetched_at"] = datetime.datetime.fromtimestamp(entry.fetched_at, tz=__local_tz__).isoformat()
+
+
+def __request_daily_values(payload: dict, response: any, fields: list) -> dict:
+    """
+    Request the API values of daily variables for the location and weather model of a response.
+    Used for the days the hourly values do not cover, if the daily variables are derived from the hourly values.
+
+    :param payload dict: The configuration for the Open-Meteo API request of the response.
+    :param response openmeteo_sdk.WeatherApiResponse: The Open-Meteo API response.
+    :param fields list: The daily variables to request.
+    :return dict: The values per daily variable, empty if the values cannot be requested.
+    """
+    if os.environ.get("RUN_MODE", "oneshot").lower() == "replay":
+        # a replay does not request the API
+        return dict()
+    params = {
+        key: value for key, value in payload.items() if key not in ["current", "daily"] + list(__timeseries_blocks__)
+    }
+    # the coordinates of a batch request are indexed by the location id of the response
+    for key in ["latitude", "longitude", "elevation"]:
+        if key in params.keys():
+            values = str(params[key]).split(",")
+            params[key] = values[response.LocationId()] if len(values) > 1 else values[0]
+    models = params.get("models")
+    if isinstance(models, str):
+        models = models.split(",")
+    if isinstance(models, (list, tuple)) and len(models) > 1:
+        params["models"] = __model_name(response)
+    params["daily"] = list(fields)
+
+    try:
+        forecast_cache = __get_forecast_cache()
+        if forecast_cache is None:
+            body = __fetch_weather_data(params)
+        else:
+            body = forecast_cache.get(params, fetch=lambda p: __fetch_weather_data(p, force_refresh=True)).body
+        daily_response = __decode_weather_responses(body)[0]
+    except Exception as e:
+        log.warning("Failed to request the daily values %s: %s", ", ".join(fields), e)
+        return dict()
+    return parse_timeseries_weather(
+        data=daily_response.Daily(), fields=params["daily"], utc_offset_seconds=daily_response.UtcOffsetSeconds()
+    ).columns
+
+
+def parse_weather_response(response: any, payload: dict) -> dict:
+    """
+    Parse a single location response from the Open-Meteo API.
+
+    :param response openmeteo_sdk.WeatherApiResponse: The Open-Meteo API response for one location.
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :return dict: The parsed weather data.
+    :raise Exception: If the weather data cannot be parsed.
+    """
+    plan = plan_weather_request(payload)
+    original = payload
+    payload = plan.params
     result = dict()
 
     # Adding the location specific information
@@ -251,9 +812,267 @@ def request_weather_data(payload: dict) -> dict:
     if "current" in payload.keys():
         result["current"] = parse_current_weather(data=response.Current(), fields=payload["current"])
     if "daily" in payload.keys():
-        result["daily"] = parse_daily_weather(data=response.Daily(), fields=payload["daily"])
+        # the payload of the days is created later, only for the days a mode publishes
+        result["daily"] = parse_timeseries_weather(
+            data=response.Daily(), fields=payload["daily"], utc_offset_seconds=response.UtcOffsetSeconds()
+        )
+    for block, accessor in __timeseries_blocks__.items():
+        if block in payload.keys():
+            result[block] = parse_timeseries_weather(
+                data=getattr(response, accessor)(),
+                fields=payload[block],
+                utc_offset_seconds=response.UtcOffsetSeconds(),
+            )
+
+    return plan.apply(result, fallback=lambda fields: __request_daily_values(original, response, fields))
+
+
+def __get_ensemble_aggregator() -> EnsembleAggregator:
+    """
+    Get the aggregator that combines the weather data of multiple weather models from environment.
+
+    :return EnsembleAggregator: The ensemble aggregator.
+    :raise ValueError: If ENSEMBLE_STATISTICS contains an unknown statistic.
+    """
+    global __ensemble_aggregator
+    if __ensemble_aggregator is None:
+        from lib.ensemble import EnsembleAggregator
+
+        statistics = os.environ.get("ENSEMBLE_STATISTICS", "min,max,spread").replace(" ", "")
+        __ensemble_aggregator = EnsembleAggregator(
+            statistics=[statistic for statistic in statistics.split(",") if statistic != ""],
+            include_models=os.environ.get("ENSEMBLE_MODEL_PAYLOADS", "false").lower() == "true",
+        )
+    return __ensemble_aggregator
+
 
-    log.debug(f"Received weather data from Open-Meteo API: {json.dumps(result)}")
+def __model_name(response: any) -> str:
+    """
+    Get the name of the weather model of a response.
+
+    :param response openmeteo_sdk.WeatherApiResponse: The Open-Meteo API response.
+    :return str: The model name, e.g. icon_seamless.
+    """
+    from openmeteo_sdk.Model import Model
+
+    names = {value: name for name, value in vars(Model).items() if not name.startswith("_")}
+    return names.get(response.Model(), str(response.Model()))
+
+
+def parse_location_responses(responses: list, payload: dict) -> dict:
+    """
+    Parse the responses of the weather models of one location.
+    The weather data of multiple models is combined into the ensemble mean with statistics per variable.
+
+    :param responses list: The openmeteo_sdk.WeatherApiResponse of each weather model.
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :return dict: The parsed weather data.
+    :raise Exception: If the weather data cannot be parsed.
+    """
+    if len(responses) == 1:
+        return parse_weather_response(response=responses[0], payload=payload)
+
+    results = [parse_weather_response(response=response, payload=payload) for response in responses]
+    result = __get_ensemble_aggregator().combine(results, models=[__model_name(response) for response in responses])
+    # the weather code of the ensemble is the most frequent code of the models
+    current = result.get("current", dict())
+    if "weather_code" in current.keys() and not math.isnan(current["weather_code"]):
+        current.update({key: texts[0] for key, texts in translate_weather_codes([current["weather_code"]]).items()})
+    return result
+
+
+def request_weather_data(payload: dict, lookup: bool = False) -> dict:
+    """
+    Request weather data from the Open-Meteo API with the given configuration.
+
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :param lookup bool: The request is an on-demand lookup, cached in the request cache. (default: False)
+    :return dict: The weather data from the Open-Meteo API.
+    :raise Exception: If the weather data cannot be requested.
+    """
+    log.debug("Request Open-Meteo API %s with parameters: %s", __open_meteo_api_url__, payload)
+    responses, entry = __request_weather_responses(payload, lookup=lookup)
+    with __metrics.timer("parse"):
+        result = parse_location_responses(responses=responses, payload=payload)
+    __mark_stale(result, entry)
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Received weather data from Open-Meteo API: %s", json.dumps(result, default=repr))
+    return result
+
+
+def __get_grid_index() -> GridIndex | None:
+    """
+    Get the index of the learned grid cells of the locations from environment.
+
+    :return GridIndex: The grid index or None, if not enabled by GRID_DEDUP.
+    """
+    global __grid_index
+    if os.environ.get("GRID_DEDUP", "false").lower() != "true":
+        return None
+    if __grid_index is None:
+        state_file = os.environ.get("GRID_INDEX_FILE")
+        if state_file is None:
+            cache_dir = __makeAbsolutePath(os.environ.get("CACHE_DIR", "/app/cache"))
+            os.makedirs(cache_dir, exist_ok=True)
+            state_file = os.path.join(cache_dir, "grid_index.json")
+        __grid_index = GridIndex(state_file=state_file)
+    return __grid_index
+
+
+def __plan_grid_cells(payload: dict, locations: Locations) -> tuple:
+    """
+    Reduce the locations to one location per known grid cell.
+
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :param locations Locations: The configured locations.
+    :return tuple: The Locations to request and a dict with the other locations of the same grid cell by location id.
+    """
+    grid_index = __get_grid_index()
+    if grid_index is None:
+        return locations, dict()
+    groups = grid_index.plan(GridIndex.namespace(payload), list(locations))
+    if len(groups) < len(locations):
+        log.debug("Request %s grid cells for %s locations", len(groups), len(locations))
+        __metrics.increment(
+            "grid_cell_reuses_total", len(locations) - len(groups), help="Locations served from a shared grid cell"
+        )
+    return Locations(list(groups.keys())), {location.id: shared for location, shared in groups.items()}
+
+
+def __parse_batch_responses(
+    batch: Locations, payload: dict, responses: list, entry: CacheEntry, shared: dict = None
+) -> list:
+    """
+    Parse the responses of a request for multiple locations.
+    The grid cell of every location is learned and the result is reused for the other locations in the same grid cell.
+
+    :param batch Locations: The locations of the request.
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :param responses list: list of openmeteo_sdk.WeatherApiResponse.
+    :param entry CacheEntry: The cache entry of the responses or None.
+    :param shared dict: The other locations of the same grid cell by location id. (default: None)
+    :return list: list of tuples (Location, weather data).
+    """
+    grid_index = __get_grid_index()
+    learned = False
+    results = list()
+    # the location id of a response is the index of the coordinates in the request
+    by_location = dict()
+    for response in responses:
+        by_location.setdefault(response.LocationId(), list()).append(response)
+    with __metrics.timer("parse"):
+        for index, location_responses in by_location.items():
+            response = location_responses[0]
+            result = parse_location_responses(responses=location_responses, payload=payload)
+            result["location"]["id"] = batch[index].id
+            __mark_stale(result, entry)
+            results.append((batch[index], result))
+            if grid_index is not None:
+                learned |= grid_index.learn(
+                    GridIndex.namespace(payload),
+                    batch[index],
+                    latitude=response.Latitude(),
+                    longitude=response.Longitude(),
+                    elevation=response.Elevation(),
+                )
+            # the locations of the same grid cell get the same weather data with their own location id
+            for location in (shared or dict()).get(batch[index].id, list()):
+                results.append((location, dict(result, location=dict(result["location"], id=location.id))))
+    if learned:
+        grid_index.save()
+    return results
+
+
+def request_weather_data_batch(payload: dict, locations: Locations) -> list:
+    """
+    Request weather data for multiple locations from the Open-Meteo API.
+    The locations are requested with comma separated coordinates in as few API calls as possible.
+
+    :param payload dict: The configuration for the Open-Meteo API request.
+    :param locations Locations: The locations to request the weather data for.
+    :return list: list of tuples (Location, weather data).
+    :raise Exception: If the weather data cannot be requested.
+    """
+    max_url_length = int(os.environ.get("MAX_URL_LENGTH", "4000"))
+    requested, shared = __plan_grid_cells(payload, locations)
+
+    results = list()
+    for batch, batch_payload in requested.batches(payload, url=__open_meteo_api_url__, max_url_length=max_url_length):
+        log.debug("Request Open-Meteo API %s for %s locations", __open_meteo_api_url__, len(batch))
+        responses, entry = __request_weather_responses(batch_payload)
+        results.extend(
+            __parse_batch_responses(batch=batch, payload=batch_payload, responses=responses, entry=entry, shared=shared)
+        )
+
+    log.debug("Received weather data for %s locations from Open-Meteo API", len(results))
+    return results
+
+
+def replay_weather_data(recordings: list, config: dict) -> list:
+    """
+    Parse the recorded responses of one cycle like the responses of the Open-Meteo API.
+    The locations of a recorded request are found by their coordinates, locations without own recorded response
+    get the weather data of a location in the same grid cell.
+
+    :param recordings list: The Recording objects of the cycle.
+    :param config dict: The loaded configuration.
+    :return list: list of tuples (Location, weather data).
+    :raise ValueError: If a recorded location is not configured.
+    """
+    if "locations" not in config.keys():
+        return [(None, parse_location_responses(__decode_weather_responses(r.body), r.params)) for r in recordings]
+
+    by_coordinates = {(str(location.latitude), str(location.longitude)): location for location in config["locations"]}
+    _, shared = __plan_grid_cells(config["data"], config["locations"])
+    results = list()
+    for recording in recordings:
+        coordinates = zip(str(recording.params["latitude"]).split(","), str(recording.params["longitude"]).split(","))
+        batch = [by_coordinates.get(coordinate) for coordinate in coordinates]
+        if None in batch:
+            raise ValueError("The recording contains a location that is not configured.")
+        responses = __decode_weather_responses(recording.body)
+        results.extend(
+            __parse_batch_responses(
+                batch=batch, payload=recording.params, responses=responses, entry=None, shared=shared
+            )
+        )
+
+    # a location is published once, even if it is recorded and in the grid cell of another recorded location
+    unique = dict()
+    for location, result in results:
+        unique.setdefault(location.id, (location, result))
+    missing = len(config["locations"]) - len(unique)
+    if missing > 0:
+        log.warning("No recorded weather data for %s locations", missing)
+    return list(unique.values())
+
+
+def get_weather_code_languages() -> list:
+    """
+    Get the languages for the weather code translation from the comma separated WEATHER_CODE_LANGUAGE.
+
+    :return list: The list of two letter language codes.
+    """
+    languages = [language.strip()[0:2].lower() for language in os.environ.get("WEATHER_CODE_LANGUAGE", "en").split(",")]
+    return [language for language in languages if language != ""] or ["en"]
+
+
+def translate_weather_codes(codes: list) -> dict:
+    """
+    Translate weather codes into all configured languages.
+    The first language is provided as weather_code_text, with multiple languages
+    every language is additionally provided as weather_code_text_<language>.
+
+    :param codes list: The weather codes, NaN values are translated to "Unknown weather code".
+    :return dict: The translated texts by payload key.
+    """
+    languages = get_weather_code_languages()
+    result = dict()
+    result["weather_code_text"] = WeatherCodes(language=languages[0]).translate_many(codes)
+    if len(languages) > 1:
+        for language in languages:
+            result[f"weather_code_text_{language}"] = WeatherCodes(language=language).translate_many(codes)
     return result
 
 
@@ -268,132 +1087,1106 @@ def parse_current_weather(data: any, fields: list = []) -> dict:
     """
     if not data:
         raise Exception("No current weather data found in the response.")
+    from lib.weather_parser import WeatherBlock
 
     log.debug("Parsing current weather data from Open-Meteo API response.")
     parsed_data = dict()
 
     parsed_data["time"] = datetime.datetime.fromtimestamp(data.Time(), tz=__local_tz__).isoformat()
-    log.debug(f"Current weather time: {parsed_data['time']}")
-
-    for i in range(0, len(fields)):
-        parsed_data[fields[i]] = data.Variables(i).Value()
-        log.debug(f"{fields[i]}: {parsed_data[fields[i]]}")
+    # the values are mapped by the identity of the response variables, not by their position
+    indexes = WeatherBlock.field_indexes(data, fields)
+    values = [data.Variables(index).Value() if index >= 0 else math.nan for index in indexes]
+    for field, value in zip(fields, WeatherBlock.round_float32(values).tolist()):
+        parsed_data[field] = value
 
     # Translate weather code
     if "weather_code" in parsed_data.keys() and not math.isnan(parsed_data["weather_code"]):
         parsed_data["weather_code"] = int(parsed_data["weather_code"])  # be sure it's an int
-        weather_code_language = os.environ.get("WEATHER_CODE_LANGUAGE", "en")[0:2].lower()
-        parsed_data["weather_code_text"] = WeatherCodes(language=weather_code_language).translate(
-            code=parsed_data["weather_code"]
-        )
-        log.debug(f"Translated weather code: {parsed_data['weather_code_text']}")
+        for key, texts in translate_weather_codes(codes=[parsed_data["weather_code"]]).items():
+            parsed_data[key] = texts[0]
 
-    log.debug(f"Parsed current weather: {parsed_data}")
+    log.debug("Parsed current weather: %s", parsed_data)
     return parsed_data
 
 
-def parse_daily_weather(data: any, fields: list = []) -> dict:
+def parse_daily_weather(data: any, fields: list = [], utc_offset_seconds: int = None) -> dict:
     """
     Parse the daily weather data from the Open-Meteo API response.
+    The variables are read column wise as numpy arrays.
 
-    :param data openmeteo_requests.VariablesWithTime: The Open-Meteo API response from current weather.
-    :param fields list: The list of fields to parse from the current weather data. (default: [])
-    :return dict: The parsed current weather data.
-    :raise Exception: If the current weather data cannot be parsed.
+    :param data openmeteo_requests.VariablesWithTime: The Open-Meteo API response from daily weather.
+    :param fields list: The list of fields to parse from the daily weather data. (default: [])
+    :param utc_offset_seconds int: The UTC offset of the time axis, default is the offset of the local timezone.
+    :return dict: The parsed daily weather data, each field with the values by date.
+    :raise Exception: If the daily weather data cannot be parsed.
     """
     if not data:
-        raise Exception("No current weather data found in the response.")
-
-    log.debug("Parsing current weather data from Open-Meteo API response.")
-    parsed_data = dict()
+        raise Exception("No daily weather data found in the response.")
+    from lib.weather_parser import WeatherBlock
+
+    log.debug("Parsing daily weather data from Open-Meteo API response.")
+    if utc_offset_seconds is None:
+        utc_offset_seconds = datetime.datetime.fromtimestamp(data.Time(), tz=__local_tz__).utcoffset().total_seconds()
+    block = WeatherBlock(data=data, fields=fields, utc_offset_seconds=utc_offset_seconds)
+    parsed_data = __daily_weather_by_date(block=block, fields=fields)
+    log.debug("Parsed daily weather: %s", parsed_data)
+    return parsed_data
 
-    forecast_starts_at = datetime.datetime.fromtimestamp(data.Time(), tz=__local_tz__)
-    forecast_ends_at = datetime.datetime.fromtimestamp(data.TimeEnd(), tz=__local_tz__)
-    delta = forecast_ends_at - forecast_starts_at
-    interval = datetime.timedelta(seconds=data.Interval())
-    log.debug(
-        f"Range from {forecast_starts_at.strftime('%Y-%m-%d')} to {forecast_ends_at.strftime('%Y-%m-%d')} with interval {interval.days} days"
-    )
 
-    interval_range = list()
-    for i in range(delta.days):
-        forecast_interval = (forecast_starts_at + i * interval).strftime("%Y-%m-%d")
-        interval_range.append(forecast_interval)
-    log.debug(f"Interval range: {interval_range}")
+def __daily_weather_by_date(block: WeatherBlock, fields: list, rows: slice = None) -> dict:
+    """
+    Create the daily weather data with the values of each field by date.
 
-    variables_with_time = [data.Variables(i) for i in range(0, data.VariablesLength())]
+    :param block WeatherBlock: The parsed daily weather data.
+    :param fields list: The fields to include.
+    :param rows slice: The days to include, only these values are converted. (default: all days)
+    :return dict: The daily weather data, each field with the values by date.
+    """
+    dates = block.dates(rows)
+    log.debug("Range from %s to %s with %s days", dates[0] if dates else None, dates[-1] if dates else None, len(dates))
 
-    for i in range(0, len(fields)):
-        field = parsed_data[fields[i]] = dict()
-        for j in range(len(interval_range)):
-            field[interval_range[j]] = variables_with_time[i].Values(j)
-            log.debug(f"{fields[i]}[{interval_range[j]}]: {field[interval_range[j]]}")
+    parsed_data = dict()
+    for field in fields:
+        parsed_data[field] = dict(zip(dates, block.values(field, rows)))
 
     # Translate weather code
     if "weather_code" in parsed_data.keys():
-        weather_code_language = os.environ.get("WEATHER_CODE_LANGUAGE", "en")[0:2].lower()
-        parsed_data["weather_code_text"] = dict()
-        for k, v in parsed_data["weather_code"].items():
-            if math.isnan(v):
-                parsed_data["weather_code_text"][k] = "Unknown weather code"
-                continue
-            parsed_data["weather_code"][k] = int(v)  # be sure it's an int
-            parsed_data["weather_code_text"][k] = WeatherCodes(language=weather_code_language).translate(code=int(v))
-
-    log.debug(f"Parsed current weather: {parsed_data}")
+        codes = block.columns["weather_code"] if rows is None else block.columns["weather_code"][rows]
+        for key, texts in translate_weather_codes(codes=codes).items():
+            parsed_data[key] = dict(zip(dates, texts))
     return parsed_data
 
 
-def publish_weather_data(topic: str, payload: dict) -> None:
+def parse_timeseries_weather(data: any, fields: list = [], utc_offset_seconds: int = 0) -> WeatherBlock:
     """
-    Publish the weather data to the MQTT broker.
+    Parse the daily, hourly or 15 minutely weather data from the Open-Meteo API response.
+    The values are kept as numpy columns, the payload is created later as compact arrays or timestep by timestep.
+
+    :param data openmeteo_requests.VariablesWithTime: The Open-Meteo API response from daily, hourly or 15 minutely
+        weather.
+    :param fields list: The list of fields to parse from the weather data. (default: [])
+    :param utc_offset_seconds int: The UTC offset of the time axis. (default: 0)
+    :return WeatherBlock: The parsed weather data.
+    :raise Exception: If the weather data cannot be parsed.
+    """
+    if not data:
+        raise Exception("No daily, hourly or 15 minutely weather data found in the response.")
+    from lib.weather_parser import WeatherBlock
 
-    :param topic str: The MQTT topic to publish the weather data to.
-    :param payload dict: The weather data to publish.
-    :raise ssl.SSLCertVerificationError: If there is an SSL certificate verification error.
-    :raise Exception: If the weather data cannot be published.
+    block = WeatherBlock(data=data, fields=fields, utc_offset_seconds=utc_offset_seconds)
+    log.debug("Parsed %s timesteps with %s variables", len(block), len(fields))
+    return block
+
+
+def __timeseries_weather_code_texts(block: WeatherBlock, fields: list) -> dict:
+    """
+    Translate the weather code column of a time series block.
+
+    :param block WeatherBlock: The parsed weather data.
+    :param fields list: The fields of the payload.
+    :return dict: The translated weather code columns by payload key, empty without weather code.
+    """
+    if "weather_code" not in fields or "weather_code" not in block.columns.keys():
+        return dict()
+    return translate_weather_codes(codes=block.columns["weather_code"])
+
+
+def __initialize_mqtt_publisher(target: dict = None) -> MqttPublisher:
     """
-    log.debug(f"Publish weather data to MQTT topic {topic} with payload: {json.dumps(payload)}")
+    Initialize the MQTT publisher and connect it to the MQTT server from environment.
+    The publisher keeps one MQTT session open and runs the network loop in the background.
+
+    :param target dict: The settings of the MQTT broker. (default: None, the first of the MQTT targets)
+    :return MqttPublisher: The connected MQTT publisher.
+    :raise Exception: If the MQTT publisher cannot connect.
+    """
+    import ssl
+
+    from lib.mqtt_publisher import MqttPublisher
 
-    # Initialize MQTT client
-    client = __initialize_mqtt_client()
+    if target is None:
+        target = __get_mqtt_targets()[0]
+    client = __initialize_mqtt_client(target=target)
     log.debug("MQTT client initialized")
+    publisher = MqttPublisher(
+        client=client,
+        host=target["server"],
+        port=int(target["port"]),
+        keepalive=60,
+        max_inflight=int(target["max_inflight"]),
+        timeout=float(target["timeout"]),
+    )
 
-    log.debug("Connecting to MQTT server {}:{}".format(os.environ.get("MQTT_SERVER"), os.environ.get("MQTT_PORT")))
+    log.debug("Connecting to MQTT server %s:%s", target["server"], target["port"])
     try:
-        client.connect(os.environ.get("MQTT_SERVER"), int(os.environ.get("MQTT_PORT")), 60)
+        with __metrics.timer("connect"):
+            publisher.connect()
     except ssl.SSLCertVerificationError as e:
         log.error("SSL certificate verification error: {}".format(e))
+        if __is_spool_enabled() or len(__get_mqtt_targets()) > 1:
+            # the messages are spooled until the certificate is fixed, the other MQTT targets are not affected
+            raise
         sys.exit(1)
     log.debug("Connected to MQTT server")
+    return publisher
+
+
+def __is_spool_enabled() -> bool:
+    """
+    Check if the messages are spooled while the MQTT server is not reachable.
+    Without spool, a cycle fails if the MQTT server is not reachable.
+
+    :return bool: True, if enabled by SPOOL=true.
+    """
+    return os.environ.get("SPOOL", "false").lower() == "true"
+
+
+def __get_message_spool(target: str = None) -> MessageSpool | None:
+    """
+    Get the spool that keeps the messages on disk while the MQTT server is not reachable from environment.
+
+    :param target str: The name of the MQTT target with its own spool in a sub directory. (default: None)
+    :return MessageSpool: The message spool or None, if disabled by SPOOL.
+    """
+    if not __is_spool_enabled():
+        return None
+    if target not in __message_spools.keys():
+        from lib.spool import MessageSpool
+
+        spool_dir = os.environ.get("SPOOL_DIR")
+        if spool_dir is None:
+            spool_dir = os.path.join(os.environ.get("CACHE_DIR", "/app/cache"), "spool")
+        if target is not None:
+            spool_dir = os.path.join(spool_dir, target)
+        __message_spools[target] = MessageSpool(
+            directory=__makeAbsolutePath(spool_dir),
+            max_bytes=int(float(os.environ.get("SPOOL_MAX_MB", "50")) * 1024 * 1024),
+        )
+    return __message_spools[target]
+
+
+def __initialize_target_publisher(target: dict, spool: MessageSpool | None) -> MqttPublisher | SpoolingPublisher:
+    """
+    Initialize the publisher of one MQTT broker.
+    With SPOOL, the messages are spooled while the MQTT server is not reachable and forwarded after reconnect.
+
+    :param target dict: The settings of the MQTT broker.
+    :param spool MessageSpool: The message spool of the MQTT broker or None, if disabled by SPOOL.
+    :return MqttPublisher | SpoolingPublisher: The connected MQTT publisher or the spooling publisher.
+    :raise Exception: If the MQTT publisher cannot connect without SPOOL.
+    """
+    if spool is None:
+        return __initialize_mqtt_publisher(target=target)
+    from lib.spool import SpoolingPublisher
+
+    publisher = SpoolingPublisher(
+        connect=lambda: __initialize_mqtt_publisher(target=target),
+        spool=spool,
+        batch_size=int(os.environ.get("SPOOL_DRAIN_BATCH", "100")),
+        rate=float(os.environ.get("SPOOL_DRAIN_RATE", "50")),
+    )
+    publisher.connect()
+    return publisher
+
+
+def __initialize_publisher() -> MqttPublisher | SpoolingPublisher | MultiPublisher:
+    """
+    Initialize the publisher of the weather data.
+    With multiple MQTT targets, every message is published to all brokers in parallel. The brokers are connected in
+    parallel too, a broker that is not reachable without SPOOL or does not connect within its timeout is left out.
+
+    :return MqttPublisher | SpoolingPublisher | MultiPublisher: The connected publisher.
+    :raise Exception: If no MQTT publisher can connect.
+    """
+    targets = __get_mqtt_targets()
+    if len(targets) == 1:
+        return __initialize_target_publisher(target=targets[0], spool=__get_message_spool())
+    from concurrent.futures import ThreadPoolExecutor
+
+    from lib.multi_publisher import MultiPublisher, PublishTarget
+
+    def disconnect_late(future: any) -> None:
+        # the publisher of a broker that connected after its deadline is not used
+        if future.exception() is None:
+            future.result().disconnect()
+
+    started_at = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="mqtt-connect")
+    futures = [
+        (
+            target,
+            executor.submit(__initialize_target_publisher, target=target, spool=__get_message_spool(target["name"])),
+        )
+        for target in targets
+    ]
+    # the connecting workers of the brokers that miss their deadline are not waited for
+    executor.shutdown(wait=False)
+    publish_targets = list()
+    for target, future in futures:
+        # the socket connect and the MQTT connect may each take the timeout of the broker
+        deadline = started_at + 2 * float(target["timeout"])
+        try:
+            publisher = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            log.error("Connection to MQTT target %s timed out", target["name"])
+            future.add_done_callback(disconnect_late)
+            continue
+        except Exception as e:
+            log.error("Failed to connect to MQTT target %s: %s", target["name"], e)
+            continue
+        publish_targets.append(
+            PublishTarget(
+                name=target["name"],
+                publisher=publisher,
+                qos=target["qos"],
+                retain=target["retain"],
+                # the publish and the flush of a cycle may each take the timeout of the broker
+                timeout=2 * float(target["timeout"]),
+            )
+        )
+    if len(publish_targets) == 0:
+        raise ConnectionError("None of the MQTT targets is reachable.")
+    return MultiPublisher(targets=publish_targets)
+
+
+def __get_change_detector() -> ChangeDetector | None:
+    """
+    Get the change detector that filters payloads without significant change from environment.
+
+    :return ChangeDetector: The change detector or None, if CHANGE_DETECTION is off.
+    :raise ValueError: If the change detection configuration is not valid.
+    """
+    global __change_detector
+    mode = os.environ.get("CHANGE_DETECTION", "off").lower()
+    if mode not in __change_detection_modes__:
+        raise ValueError(f"Invalid change detection mode: {mode}. Must be one of {__change_detection_modes__}.")
+    if mode == "off":
+        return None
+    if __change_detector is None:
+        refresh_interval = float(os.environ.get("CHANGE_DETECTION_REFRESH_SEC", "3600"))
+        __change_detector = ChangeDetector.from_string(
+            os.environ.get("DEADBANDS", ""),
+            mode=mode,
+            refresh_interval=refresh_interval if refresh_interval > 0 else None,
+            state_file=os.environ.get("CHANGE_DETECTION_STATE_FILE"),
+        )
+    return __change_detector
+
+
+def __get_payload_serializer() -> PayloadSerializer:
+    """
+    Get the payload serializer from PAYLOAD_FORMAT and PAYLOAD_PRECISION.
+
+    :return PayloadSerializer: The payload serializer.
+    :raise ValueError: If the payload format or precision is not valid.
+    """
+    global __payload_serializer
+    if __payload_serializer is None:
+        __payload_serializer = PayloadSerializer.from_string(
+            os.environ.get("PAYLOAD_PRECISION", ""), format=os.environ.get("PAYLOAD_FORMAT", "json").lower()
+        )
+    return __payload_serializer
+
+
+def __get_mqtt_publish_options(retain: bool = None) -> tuple:
+    """
+    Get the MQTT quality of service and retain flag from environment.
+    With multiple MQTT targets, None is returned for the options that are applied per broker by the publisher.
 
-    mqtt_retain = False
-    if os.environ.get("MQTT_RETAIN", "false").lower() == "true":
-        mqtt_retain = True
-    mqtt_qos = int(os.environ.get("MQTT_QOS", "0"))
-    if mqtt_qos not in [0, 1, 2]:
-        log.warning("Invalid MQTT QoS level: {}. Using QoS 0.".format(mqtt_qos))
-        mqtt_qos = 0
+    :param retain bool: Publish as retained message, default is defined by MQTT_RETAIN. (default: None)
+    :return tuple: The quality of service and the retain flag.
+    """
+    targets = __get_mqtt_targets()
+    if len(targets) > 1:
+        return None, retain
+    return targets[0]["qos"], targets[0]["retain"] if retain is None else retain
+
+
+def publish_weather_data(topic: str, payload: dict, publisher: MqttPublisher = None, retain: bool = None) -> None:
+    """
+    Publish the weather data to the MQTT broker.
+
+    :param topic str: The MQTT topic to publish the weather data to.
+    :param payload dict: The weather data to publish.
+    :param retain bool: Publish as retained message, default is defined by MQTT_RETAIN. (default: None)
+    :param publisher MqttPublisher: An already connected MQTT publisher to reuse, the message is only queued
+        and completed by publisher.flush(). (default: None)
+    :raise ssl.SSLCertVerificationError: If there is an SSL certificate verification error.
+    :raise Exception: If the weather data cannot be published.
+    """
+    # skip or shrink the message if nothing changed significantly since the last publish to the topic
+    change_detector = __get_change_detector()
+    if change_detector is not None:
+        filtered = change_detector.filter(topic, payload)
+        if filtered is None:
+            log.debug("No significant change for MQTT topic %s, skip publish", topic)
+            __metrics.increment("messages_unchanged_total", help="MQTT messages skipped without significant change")
+            return
+        if filtered is not payload:
+            # a delta must not replace the retained full payload
+            retain = False
+        payload = filtered
+
+    persistent_publisher = publisher is not None
+    if not persistent_publisher:
+        publisher = __initialize_publisher()
+
+    mqtt_qos, mqtt_retain = __get_mqtt_publish_options(retain=retain)
+    log.debug("Publishing weather data to MQTT topic: %s, using retain: %s, qos: %s", topic, mqtt_retain, mqtt_qos)
+
+    with __metrics.timer("serialize"):
+        message = __get_payload_serializer().encode(payload)
     log.debug(
-        "Publishing weather data to MQTT topic: {}, using retain: {}, qos: {}".format(
-            os.environ.get("MQTT_TOPIC"), mqtt_retain, mqtt_qos
+        "Publish weather data to MQTT topic %s with %s payload of %d bytes",
+        topic,
+        __get_payload_serializer().format,
+        len(message),
+    )
+    __metrics.increment("payload_bytes_total", len(message), help="Bytes of the published weather data payloads")
+
+    with __metrics.timer("publish"):
+        publisher.publish(topic=topic, payload=message, qos=mqtt_qos, retain=mqtt_retain)
+    log.debug("Queued weather data to MQTT topic %s", topic)
+
+    if not persistent_publisher:
+        # waits until the message is completed
+        publisher.disconnect()
+        log.debug("Disconnected from MQTT server")
+        if change_detector is not None:
+            change_detector.commit(topic)
+
+
+def get_publish_layout() -> str:
+    """
+    Get the topic layout from PUBLISH_LAYOUT.
+
+    :return str: "json" for one JSON message per mode, "fields" for one message per field or "both".
+    :raise ValueError: If the topic layout is not valid.
+    """
+    publish_layout = os.environ.get("PUBLISH_LAYOUT", "json").lower()
+    if publish_layout not in __publish_layouts__:
+        raise ValueError(f"Invalid publish layout: {publish_layout}. Must be one of {__publish_layouts__}.")
+    return publish_layout
+
+
+def publish_weather_fields(topic: str, payload: dict, publisher: MqttPublisher, node_id: str) -> None:
+    """
+    Publish the weather data as one message per field to <topic>/<block>/<field>.
+    All messages are queued on the same MQTT session and completed together by publisher.flush().
+    With HA_DISCOVERY, the Home Assistant discovery messages are published once per process.
+
+    :param topic str: The MQTT base topic.
+    :param payload dict: The weather data to publish.
+    :param publisher MqttPublisher: The connected MQTT publisher.
+    :param node_id str: The unique id of the weather data for Home Assistant, e.g. the location id and mode.
+    :raise Exception: If the weather data cannot be published.
+    """
+    field_topics = FieldTopics(
+        discovery_prefix=os.environ.get("HA_DISCOVERY_PREFIX", "homeassistant"),
+        device_name=os.environ.get("HA_DEVICE_NAME", "Weather"),
+    )
+    if os.environ.get("HA_DISCOVERY", "false").lower() == "true":
+        for discovery_topic, config in field_topics.discovery_messages(topic, payload, node_id=node_id):
+            # the locations are published concurrently with CONCURRENCY, every discovery message is published once
+            with __discovery_lock:
+                if discovery_topic in __discovery_published:
+                    continue
+                __discovery_published.add(discovery_topic)
+            publisher.publish(topic=discovery_topic, payload=config, qos=1, retain=True)
+
+    # the change detection runs on the whole payload, in delta mode only the changed fields are published
+    change_detector = __get_change_detector()
+    if change_detector is not None:
+        payload = change_detector.filter(f"{topic.rstrip('/')}/+", payload)
+        if payload is None:
+            log.debug("No significant change for MQTT topic %s/+, skip publish", topic)
+            __metrics.increment("messages_unchanged_total", help="MQTT messages skipped without significant change")
+            return
+
+    mqtt_qos, mqtt_retain = __get_mqtt_publish_options()
+    with __metrics.timer("serialize"):
+        messages = field_topics.messages(topic, __get_payload_serializer().normalize(payload))
+    for field_topic, message in messages:
+        message = message.encode("utf-8")
+        __metrics.increment("payload_bytes_total", len(message), help="Bytes of the published weather data payloads")
+        with __metrics.timer("publish"):
+            publisher.publish(topic=field_topic, payload=message, qos=mqtt_qos, retain=mqtt_retain)
+    log.debug("Queued %s field messages to MQTT topic %s/+", len(messages), topic)
+
+
+def get_topic(location: Location = None, mode: str = None) -> str:
+    """
+    Get the MQTT topic for the given location and mode.
+    The placeholders {location_id} and {mode} in MQTT_TOPIC are replaced by the location id and the mode.
+    Without placeholder, the location id and, if multiple modes are configured, the mode are appended as sub topic.
+
+    :param location Location: The location of the weather data. (default: None)
+    :param mode str: The mode of the weather data. (default: None)
+    :return str: The MQTT topic.
+    """
+    topic = os.environ.get("MQTT_TOPIC")
+    if location is not None:
+        if "{location_id}" in topic:
+            topic = topic.replace("{location_id}", location.id)
+        else:
+            topic = f"{topic.rstrip('/')}/{location.id}"
+    if mode is not None:
+        if "{mode}" in topic:
+            topic = topic.replace("{mode}", mode)
+        elif len(get_modes()) > 1:
+            topic = f"{topic.rstrip('/')}/{mode}"
+    return topic
+
+
+def __with_ensemble_fields(fields: list, available: any) -> list:
+    """
+    Add the ensemble statistics of the fields, e.g. temperature_2m_ensemble_spread, that are in the weather data.
+
+    :param fields list: The fields of the mode.
+    :param available any: The fields of the weather data.
+    :return list: The fields that are in the weather data, each followed by its ensemble statistics.
+    """
+    result = list()
+    for field in fields:
+        if field in available:
+            result.append(field)
+        result.extend(key for key in available if key.startswith(f"{field}_ensemble_"))
+    return result
+
+
+def prepare_weather_payload(weather_result: dict, mode: str, mode_data: dict) -> dict:
+    """
+    Prepare the weather data of a mode to be published.
+    Only the blocks and variables that are configured for the mode are taken from the weather data.
+    A mode with one day offset (e.g. tomorrow) publishes the values of that day as object named like the mode,
+    a mode with multiple days only the daily values of these days.
+    The ensemble statistics of the variables are added, the payload of every weather model in "models" if parsed.
+
+    :param weather_result dict: The weather data from the Open-Meteo API.
+    :param mode str: The mode to prepare the payload for.
+    :param mode_data dict: The API request data of the mode.
+    :return dict: The payload to publish.
+    """
+    payload = dict()
+    for key in ["location", "timezone", "stale", "fetched_at", "ensemble"]:
+        if key in weather_result.keys():
+            payload[key] = weather_result[key]
+    if "current" in mode_data.keys() and "current" in weather_result.keys():
+        fields = set(__with_ensemble_fields(mode_data["current"], weather_result["current"].keys())) | {"time"}
+        payload["current"] = {
+            key: value
+            for key, value in weather_result["current"].items()
+            if key in fields or key.startswith("weather_code_text")
+        }
+
+    if "daily" in mode_data.keys() and "daily" in weather_result.keys():
+        block = weather_result["daily"]
+        fields = __with_ensemble_fields(mode_data["daily"], block.columns.keys())
+        day_offset = mode_data.get("day_offset", (1, 1) if mode == "tomorrow" else None)
+        if day_offset is None:
+            payload["daily"] = __daily_weather_by_date(block=block, fields=fields)
+        else:
+            # the days are selected by their index on the time axis, only their values are converted
+            first = block.day_index(offset=day_offset[0])
+            if first < 0:
+                log.warning("Day %s from today not found in the daily weather data of mode %s", day_offset[0], mode)
+            elif day_offset[0] == day_offset[1]:
+                rows = slice(first, first + 1)
+                day_data = {"date": block.dates(rows)[0]}
+                for field in fields:
+                    day_data[field] = block.values(field, rows)[0]
+                if "weather_code" in fields:
+                    for key, texts in translate_weather_codes(codes=block.columns["weather_code"][rows]).items():
+                        day_data[key] = texts[0]
+                payload[mode] = day_data
+            else:
+                rows = slice(first, first + day_offset[1] - day_offset[0] + 1)
+                payload["daily"] = __daily_weather_by_date(block=block, fields=fields, rows=rows)
+
+    for block in __timeseries_blocks__.keys():
+        if block in mode_data.keys() and block in weather_result.keys():
+            fields = __with_ensemble_fields(mode_data[block], weather_result[block].columns.keys())
+            payload[block] = weather_result[block].to_columns(
+                fields=fields, extra_columns=__timeseries_weather_code_texts(weather_result[block], fields)
+            )
+
+    # the payload of every weather model of an ensemble, without the common location and timezone
+    if "models" in weather_result.keys():
+        payload["models"] = dict()
+        for model, model_result in weather_result["models"].items():
+            model_payload = prepare_weather_payload(model_result, mode=mode, mode_data=mode_data)
+            payload["models"][model] = {
+                key: value
+                for key, value in model_payload.items()
+                if key not in ["location", "timezone", "message_timestamp"]
+            }
+
+    # Add the local time as message_timestamp to payload
+    payload["message_timestamp"] = datetime.datetime.now(tz=__local_tz__).isoformat()
+
+    log.debug("Prepared payload for mode %s with %s", mode, list(payload.keys()))
+    return payload
+
+
+def get_forecast_publish_mode() -> str:
+    """
+    Get the publish mode for hourly and 15 minutely forecasts from FORECAST_PUBLISH_MODE.
+
+    :return str: "array" for one message with a list per variable, "stream" for one retained message per timestep.
+    :raise ValueError: If the publish mode is not valid.
+    """
+    forecast_publish_mode = os.environ.get("FORECAST_PUBLISH_MODE", "array").lower()
+    if forecast_publish_mode not in __forecast_publish_modes__:
+        raise ValueError(
+            f"Invalid forecast publish mode: {forecast_publish_mode}. Must be one of {__forecast_publish_modes__}."
         )
+    return forecast_publish_mode
+
+
+def publish_weather_timesteps(topic: str, block: WeatherBlock, fields: list, publisher: MqttPublisher) -> None:
+    """
+    Publish a time series forecast as one retained message per timestep to <topic>/<step>.
+    The timesteps are created one by one while publishing.
+
+    :param topic str: The MQTT base topic of the forecast.
+    :param block WeatherBlock: The parsed weather data.
+    :param fields list: The fields to publish.
+    :param publisher MqttPublisher: The connected MQTT publisher.
+    :raise Exception: If the weather data cannot be published.
+    """
+    fields = [field for field in fields if field in block.columns.keys()]
+    message_timestamp = datetime.datetime.now(tz=__local_tz__).isoformat()
+    extra_columns = __timeseries_weather_code_texts(block, fields)
+    for step, row in enumerate(block.timesteps(fields=fields, extra_columns=extra_columns)):
+        row["message_timestamp"] = message_timestamp
+        publish_weather_data(topic=f"{topic.rstrip('/')}/{step}", payload=row, publisher=publisher, retain=True)
+    log.debug("Published %s timesteps to MQTT topic %s/+", len(block), topic)
+
+
+def export_metrics(statistics: dict, publisher: MqttPublisher = None) -> None:
+    """
+    Record the MQTT statistics of a cycle and export the metrics.
+    The metrics are written to METRICS_TEXTFILE (Prometheus textfile) and published as JSON to METRICS_TOPIC,
+    if configured. Errors while exporting are logged and do not fail the cycle.
+
+    :param statistics dict: The statistics of the MQTT publisher.
+    :param publisher MqttPublisher: The connected MQTT publisher to publish the metrics. (default: None)
+    """
+    __metrics.increment("messages_published_total", statistics["published"], help="Published MQTT messages")
+    __metrics.increment("messages_failed_total", statistics["failed"], help="Failed MQTT messages")
+    __metrics.set("mqtt_inflight_max", statistics["inflight_max"], help="Maximum in-flight MQTT messages of the cycle")
+    if statistics["latency_avg"] is not None:
+        __metrics.set("mqtt_latency_avg_seconds", statistics["latency_avg"], help="Average MQTT publish latency")
+        __metrics.set("mqtt_latency_max_seconds", statistics["latency_max"], help="Maximum MQTT publish latency")
+    __metrics.set("last_cycle_timestamp_seconds", time.time(), help="Unix timestamp of the last cycle")
+    if __get_api_quota() is not None:
+        for window, usage in __get_api_quota().statistics().items():
+            if isinstance(usage, dict) and usage["limit"] is not None:
+                __metrics.set(
+                    f"quota_{window}_weight", usage["weight"], help=f"Weighted API calls of the current {window}"
+                )
+                __metrics.set(f"quota_{window}_available", usage["available"], help=f"Available API calls per {window}")
+    if len(__message_spools) > 0:
+        # the spools of all MQTT targets are counted together
+        spool_statistics = [spool.statistics() for spool in __message_spools.values()]
+        drain_rates = [
+            statistics["drain_rate"] for statistics in spool_statistics if statistics["drain_rate"] is not None
+        ]
+        __metrics.set("spool_depth", sum(s["depth"] for s in spool_statistics), help="Spooled MQTT messages to forward")
+        __metrics.set(
+            "spool_bytes", sum(s["bytes"] for s in spool_statistics), help="Size of the spooled MQTT messages"
+        )
+        __metrics.increment(
+            "spool_messages_total", sum(s["spooled"] for s in spool_statistics), help="Spooled MQTT messages"
+        )
+        __metrics.increment(
+            "spool_drained_total", sum(s["drained"] for s in spool_statistics), help="Forwarded spooled MQTT messages"
+        )
+        __metrics.increment(
+            "spool_evicted_total", sum(s["evicted"] for s in spool_statistics), help="Evicted spooled MQTT messages"
+        )
+        if len(drain_rates) > 0:
+            __metrics.set("spool_drain_rate", sum(drain_rates), help="Forwarded spooled messages per second")
+    for name, target_statistics in statistics.get("targets", dict()).items():
+        # the metric names only allow letters, digits and underscores
+        metric = "".join(c if c.isascii() and (c.isalnum() or c == "_") else "_" for c in name)
+        __metrics.increment(
+            f"messages_published_{metric}_total",
+            target_statistics["published"],
+            help=f"Published MQTT messages to {name}",
+        )
+        __metrics.increment(
+            f"messages_failed_{metric}_total", target_statistics["failed"], help=f"Failed MQTT messages to {name}"
+        )
+
+    if os.environ.get("METRICS_TEXTFILE") is not None:
+        try:
+            __metrics.write_textfile(os.environ.get("METRICS_TEXTFILE"))
+        except OSError as e:
+            log.warning("Failed to write metrics to %s: %s", os.environ.get("METRICS_TEXTFILE"), e)
+
+    if os.environ.get("METRICS_TOPIC") is not None and publisher is not None:
+        from lib.mqtt_publisher import MqttPublishError
+
+        try:
+            publisher.publish(
+                topic=os.environ.get("METRICS_TOPIC"), payload=json.dumps(__metrics.to_dict()), qos=0, retain=False
+            )
+        except MqttPublishError as e:
+            log.warning("Failed to publish metrics: %s", e)
+
+
+def __get_history_store() -> HistoryStore | None:
+    """
+    Get the local history store of the current and daily values from environment.
+
+    :return HistoryStore: The history store or None, if HISTORY_DIR is not set.
+    """
+    global __history_store
+    if os.environ.get("HISTORY_DIR") is None:
+        return None
+    if __history_store is None:
+        from lib.history_store import HistoryStore
+
+        retention_days = float(os.environ.get("HISTORY_RETENTION_DAYS", "365"))
+        __history_store = HistoryStore(
+            directory=__makeAbsolutePath(os.environ.get("HISTORY_DIR")),
+            retention=retention_days * 86400 if retention_days > 0 else None,
+        )
+    return __history_store
+
+
+def store_weather_history(location: Location, weather_result: dict) -> None:
+    """
+    Append the numeric current and daily values of a location to the history store.
+    Every variable is a series <location id>/<block>/<variable>, the location id of a single location is "default".
+
+    :param location Location: The location of the weather data or None for a single location.
+    :param weather_result dict: The weather data from the Open-Meteo API.
+    """
+    history_store = __get_history_store()
+    if history_store is None:
+        return
+
+    location_id = "default" if location is None else location.id
+    with __metrics.timer("history"):
+        if "current" in weather_result.keys():
+            timestamp = datetime.datetime.fromisoformat(weather_result["current"]["time"]).timestamp()
+            for field, value in weather_result["current"].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    history_store.append(history_store.series_name(location_id, "current", field), [timestamp], [value])
+        if "daily" in weather_result.keys():
+            block = weather_result["daily"]
+            # the days are stored by the midnight UTC of their local date
+            timestamps = block.local_datetime64(block.time).astype("datetime64[D]").astype("datetime64[s]").astype(int)
+            for field, column in block.columns.items():
+                if field not in block.timestamp_columns and len(column) > 0:
+                    history_store.append(history_store.series_name(location_id, "daily", field), timestamps, column)
+
+
+def publish_weather_result(location: Location, weather_result: dict, config: dict, publisher: MqttPublisher) -> None:
+    """
+    Publish the weather data of a location for all modes.
+
+    :param location Location: The location of the weather data or None for a single location.
+    :param weather_result dict: The weather data from the Open-Meteo API.
+    :param config dict: The loaded configuration.
+    :param publisher MqttPublisher: The connected MQTT publisher.
+    :raise Exception: If the weather data cannot be published.
+    """
+    store_weather_history(location=location, weather_result=weather_result)
+    for mode, mode_data in config["modes"].items():
+        timeseries = [block for block in __timeseries_blocks__.keys() if block in mode_data.keys()]
+        if len(timeseries) > 0 and get_forecast_publish_mode() == "stream":
+            for block in timeseries:
+                publish_weather_timesteps(
+                    topic=get_topic(location=location, mode=mode),
+                    block=weather_result[block],
+                    fields=mode_data[block],
+                    publisher=publisher,
+                )
+            continue
+        # Publish weather data
+        with __metrics.timer("prepare"):
+            payload = prepare_weather_payload(weather_result=weather_result, mode=mode, mode_data=mode_data)
+        topic = get_topic(location=location, mode=mode)
+        if get_publish_layout() in ["json", "both"]:
+            publish_weather_data(topic=topic, payload=payload, publisher=publisher)
+        if get_publish_layout() in ["fields", "both"]:
+            node_id = mode if location is None else f"{location.id}_{mode}"
+            publish_weather_fields(topic=topic, payload=payload, publisher=publisher, node_id=node_id)
+
+
+async def process_weather_data_async(config: dict, publisher: MqttPublisher, concurrency: int) -> None:
+    """
+    Request, parse and publish the weather data of all locations concurrently.
+    The blocking fetches, the parsing and the publishing run in worker threads, at most concurrency at a time,
+    so the results of one request are published while other requests are still running.
+
+    :param config dict: The loaded configuration.
+    :param publisher MqttPublisher: The connected MQTT publisher.
+    :param concurrency int: The maximum number of concurrent jobs.
+    :raise Exception: If the weather data of a location cannot be requested or published.
+    """
+    from lib.async_engine import AsyncEngine
+
+    # every HTTP request is limited by REQUEST_TIMEOUT_SEC itself, the jobs also wait for the API quota and the retries
+    engine = AsyncEngine(concurrency=concurrency)
+    # create the shared helpers before the worker threads use them
+    __get_forecast_cache()
+    __get_api_quota()
+    __get_change_detector()
+    __get_payload_serializer()
+    __get_history_store()
+
+    async def process_batch(batch: Locations, payload: dict) -> None:
+        if batch is None:
+            results = [(None, await engine.run(request_weather_data, payload))]
+        else:
+            responses, entry = await engine.run(__request_weather_responses, payload)
+            results = await engine.run(__parse_batch_responses, batch, payload, responses, entry, shared)
+        jobs = [engine.run(publish_weather_result, location, result, config, publisher) for location, result in results]
+        await engine.gather(jobs, raise_first=True)
+
+    shared = dict()
+    request_payload = get_request_payload(config)
+    if "locations" in config.keys():
+        max_url_length = int(os.environ.get("MAX_URL_LENGTH", "4000"))
+        requested, shared = __plan_grid_cells(request_payload, config["locations"])
+        batches = requested.batches(request_payload, url=__open_meteo_api_url__, max_url_length=max_url_length)
+    else:
+        batches = [(None, request_payload)]
+    log.debug("Process %s API requests with concurrency %s", len(batches), concurrency)
+    await engine.gather([process_batch(batch, payload) for batch, payload in batches], raise_first=True)
+
+
+def process_weather_data(config: dict, publisher: MqttPublisher = None, results: list = None) -> None:
+    """
+    Run one cycle: request the weather data, prepare the payload and publish it.
+
+    :param config dict: The loaded configuration.
+    :param publisher MqttPublisher: An already connected MQTT publisher to reuse. (default: None)
+    :param results list: Already parsed weather data as tuples (Location, weather data), e.g. from a replay.
+        (default: None, request the weather data)
+    :raise Exception: If the weather data cannot be requested or published.
+    """
+    started_at = time.perf_counter()
+    __metrics.increment("cycles_total", help="Processed cycles")
+    if __get_response_recorder() is not None:
+        __get_response_recorder().start_cycle()
+
+    concurrency = 1 if results is not None else int(os.environ.get("CONCURRENCY", "1"))
+
+    # request weather data from Open-Meteo API, with concurrency the requests run while publishing
+    if concurrency <= 1 and results is None:
+        if "locations" in config.keys():
+            results = request_weather_data_batch(payload=get_request_payload(config), locations=config["locations"])
+        else:
+            results = [(None, request_weather_data(payload=get_request_payload(config)))]
+
+    # use one MQTT session for all messages of this cycle
+    persistent_publisher = publisher is not None
+    if not persistent_publisher:
+        publisher = __initialize_publisher()
+
+    try:
+        if __is_spool_enabled():
+            # the spooled messages are older, they are forwarded first
+            with __metrics.timer("drain"):
+                publisher.drain()
+        if concurrency > 1:
+            import asyncio
+
+            asyncio.run(process_weather_data_async(config=config, publisher=publisher, concurrency=concurrency))
+        else:
+            for location, weather_result in results:
+                publish_weather_result(
+                    location=location, weather_result=weather_result, config=config, publisher=publisher
+                )
+        # wait until all messages are completed (QoS 1/2 acknowledged)
+        with __metrics.timer("flush"):
+            publisher.flush()
+        if __get_change_detector() is not None:
+            # the published values are compared from now on
+            __get_change_detector().commit()
+            __get_change_detector().save()
+        if __get_history_store() is not None:
+            __get_history_store().compact()
+    except Exception:
+        if __get_change_detector() is not None:
+            # the messages may not have reached the broker, compare with the last completed ones
+            __get_change_detector().discard()
+        raise
+    finally:
+        statistics = publisher.statistics()
+        __metrics.observe("cycle", time.perf_counter() - started_at)
+        export_metrics(statistics=statistics, publisher=publisher)
+        if not persistent_publisher:
+            publisher.disconnect()
+            log.debug("Disconnected from MQTT server")
+
+    if statistics["published"] > 0:
+        log.info(
+            "Published {} messages ({} failed), max. {} in-flight, latency avg {:.1f} ms, max {:.1f} ms".format(
+                statistics["published"],
+                statistics["failed"],
+                statistics["inflight_max"],
+                statistics["latency_avg"] * 1000,
+                statistics["latency_max"] * 1000,
+            )
+        )
+
+
+def run_replay(config: dict) -> None:
+    """
+    Replay the recorded API responses of REPLAY_FILE through the parse and publish pipeline.
+    Every recorded cycle is published as one cycle, with REPLAY_SPEED 0 at full speed and with 1 at the original timing.
+
+    :param config dict: The loaded configuration.
+    :raise ValueError: If the replay file is not set or not valid.
+    """
+    if os.environ.get("REPLAY_FILE") is None:
+        raise ValueError("The run mode replay needs the recording file in REPLAY_FILE.")
+    replayer = ResponseReplayer(
+        path=__makeAbsolutePath(os.environ.get("REPLAY_FILE")), speed=float(os.environ.get("REPLAY_SPEED", "0"))
+    )
+    # the same publisher as the scheduled cycles, with spool and all MQTT targets
+    publisher = __initialize_publisher()
+    cycles = 0
+    try:
+        for recordings in replayer.cycles():
+            with __metrics.timer("parse"):
+                results = replay_weather_data(recordings=recordings, config=config)
+            process_weather_data(config=config, publisher=publisher, results=results)
+            cycles += 1
+    finally:
+        publisher.disconnect()
+        log.debug("Disconnected from MQTT server")
+    log.info("Replayed %s cycles from %s", cycles, os.environ.get("REPLAY_FILE"))
+
+
+def __parse_request_time(value: any) -> float | None:
+    """
+    Parse a time of a request, as unix timestamp or ISO 8601 string.
+
+    :param value any: The time or None.
+    :return float: The unix timestamp or None.
+    :raise ValueError: If the time is not valid.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    timestamp = datetime.datetime.fromisoformat(str(value))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=__local_tz__)
+    return timestamp.timestamp()
+
+
+def __handle_history_request(request: dict) -> dict:
+    """
+    Answer a lookup of a series from the history store.
+
+    :param request dict: The request, e.g. {"history": "default/current/temperature_2m", "start": "2026-10-01"}.
+    :return dict: The series with the list of timestamps and values.
+    :raise ValueError: If the history store is disabled or the series is unknown.
+    """
+    history_store = __get_history_store()
+    if history_store is None:
+        raise ValueError("The history store is disabled, set HISTORY_DIR.")
+    series = request["history"]
+    if series not in history_store.series():
+        raise ValueError(f"Unknown history series: {series}")
+    times, values = history_store.query(
+        series, start=__parse_request_time(request.get("start")), end=__parse_request_time(request.get("end"))
     )
+    return {
+        "series": series,
+        "time": [datetime.datetime.fromtimestamp(int(t), tz=__local_tz__).isoformat() for t in times],
+        "value": [None if math.isnan(v) else float(v) for v in values],
+    }
+
+
+def handle_weather_request(request: dict, config: dict) -> dict:
+    """
+    Answer an on-demand lookup from the request topic.
+    A weather lookup, e.g. {"latitude": 48.7, "longitude": 9.1, "mode": "current,tomorrow"}, is requested through the
+    forecast cache and the API quota like the scheduled requests. Without mode the configured modes are used,
+    elevation, models and day_offset (e.g. 2 or "0..2" for modes with daily data) are optional.
+    A lookup with "history" is answered from the history store.
+
+    :param request dict: The request.
+    :param config dict: The loaded configuration, the timezone and weather models are used as default.
+    :return dict: The payload per mode, e.g. {"current": {...}, "tomorrow": {...}}.
+    :raise ValueError: If the request is not valid.
+    :raise Exception: If the weather data cannot be requested.
+    """
+    if "history" in request.keys():
+        return __handle_history_request(request)
+
+    try:
+        latitude = float(request["latitude"])
+        longitude = float(request["longitude"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("The request needs a numeric latitude and longitude.")
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError(f"Invalid coordinates: {latitude}, {longitude}")
+    # nearby coordinates share the grid cell of the weather model, so they share the cache entry
+    decimals = int(os.environ.get("REQUEST_COORDINATE_DECIMALS", "2"))
+    latitude = round(latitude, decimals)
+    longitude = round(longitude, decimals)
+
+    modes = request.get("mode", list(config["modes"].keys()))
+    if isinstance(modes, str):
+        modes = [mode.strip() for mode in modes.split(",") if mode.strip() != ""]
+    modes_data = dict()
+    for mode in modes:
+        if mode not in get_available_modes():
+            raise ValueError(f"Invalid mode: {mode}. Must be one of {get_available_modes()}.")
+        modes_data[mode] = dict(config["modes"][mode] if mode in config["modes"].keys() else __load_mode_data(mode))
+        if request.get("day_offset") is not None and "daily" in modes_data[mode].keys():
+            modes_data[mode]["day_offset"] = parse_day_offset(request["day_offset"])
+    if len(modes_data) == 0:
+        raise ValueError("The request needs at least one mode.")
+
+    data = dict()
+    for mode_data in modes_data.values():
+        data = __merge_request_data(data, mode_data)
+    for key in ["models", "timezone"]:
+        if key in config["data"].keys():
+            data[key] = config["data"][key]
+    data["latitude"] = latitude
+    data["longitude"] = longitude
+    if request.get("elevation") is not None:
+        data["elevation"] = float(round(float(request["elevation"])))
+    if request.get("models") is not None:
+        data["models"] = request["models"]
+    payload = get_request_payload({"data": data, "modes": modes_data})
+
+    __metrics.increment("requests_total", help="On-demand lookups requested from the API or the cache")
+    with __metrics.timer("request"):
+        weather_result = request_weather_data(payload=payload, lookup=True)
+        return {
+            mode: prepare_weather_payload(weather_result=weather_result, mode=mode, mode_data=mode_data)
+            for mode, mode_data in modes_data.items()
+        }
+
+
+def __start_request_server(config: dict, publisher: MqttPublisher) -> RequestServer | None:
+    """
+    Start to answer on-demand lookups from REQUEST_TOPIC with the MQTT v5 response topic and correlation data.
+
+    :param config dict: The loaded configuration.
+    :param publisher MqttPublisher: The connected MQTT publisher of the first MQTT target.
+    :return RequestServer: The started request server or None, if REQUEST_TOPIC is not set.
+    :raise ValueError: If the MQTT protocol version is not 5.
+    """
+    if os.environ.get("REQUEST_TOPIC") is None:
+        return None
+    # the lookups are answered on the first MQTT target
+    target = __get_mqtt_targets()[0]
+    if str(target["protocol_version"]) != "5":
+        raise ValueError("REQUEST_TOPIC needs MQTT_PROTOCOL_VERSION=5 for the response topic and correlation data.")
+    from lib.request_server import RequestServer
+
+    request_server = RequestServer(
+        publisher=publisher,
+        topic=os.environ.get("REQUEST_TOPIC"),
+        handler=lambda request: handle_weather_request(request=request, config=config),
+        encode=__get_payload_serializer().encode,
+        workers=int(os.environ.get("REQUEST_WORKERS", "4")),
+        qos=target["qos"],
+        timeout=float(os.environ.get("REQUEST_TIMEOUT_SEC", "30")),
+    )
+    request_server.start()
+    return request_server
+
+
+def __count_request_statistics(request_server: RequestServer) -> None:
+    """
+    Add the statistics of the request server since the last cycle to the metrics.
 
-    result, mid = client.publish(
-        topic=topic,
-        payload=json.dumps(payload, ensure_ascii=False),
-        qos=mqtt_qos,
-        retain=mqtt_retain,
+    :param request_server RequestServer: The request server.
+    """
+    statistics = request_server.statistics()
+    __metrics.increment("requests_received_total", statistics["requests"], help="Received on-demand lookups")
+    __metrics.increment(
+        "requests_coalesced_total", statistics["coalesced"], help="On-demand lookups answered by an identical lookup"
     )
+    __metrics.increment("requests_failed_total", statistics["errors"], help="On-demand lookups answered with an error")
+
+
+def get_schedules() -> list:
+    """
+    Get the schedules of the modes for the daemon mode from environment.
+    A mode specific schedule (e.g. SCHEDULE_TOMORROW) has precedence over the schedule of the combined modes
+    (e.g. SCHEDULE_CURRENT_TOMORROW) and the general SCHEDULE. Modes with the same schedule share one API request.
+
+    :return list: list of tuples with the modes and their scheduler.
+    :raise ValueError: If a schedule expression is not valid.
+    """
+    modes = get_modes()
+    default = os.environ.get(f"SCHEDULE_{'_'.join(modes).upper()}", os.environ.get("SCHEDULE", "600"))
+    expressions = dict()
+    for mode in modes:
+        expressions.setdefault(os.environ.get(f"SCHEDULE_{mode.upper()}", default), list()).append(mode)
+
+    schedules = list()
+    for expression, schedule_modes in expressions.items():
+        log.debug("Use schedule %s for modes %s", expression, ", ".join(schedule_modes))
+        scheduler = Scheduler(
+            expression, jitter=float(os.environ.get("SCHEDULE_JITTER_SEC", "0")), timezone=__local_tz__
+        )
+        schedules.append((schedule_modes, scheduler))
+    return schedules
+
 
-    if result != mqtt.MQTT_ERR_SUCCESS:
-        raise Exception(f"Failed to publish weather data to MQTT topic {topic}. Error code: {result}")
+def run_daemon(config: dict) -> None:
+    """
+    Run as long-running daemon that processes the weather data of every mode according to its schedule.
+    The configuration, the Open-Meteo API client and the MQTT session are kept across cycles.
+    With REQUEST_TOPIC, on-demand lookups are answered between the cycles.
+    With SPOOL=true, the daemon also starts while the MQTT server is not reachable and connects with the next cycle.
+    The daemon stops gracefully on SIGTERM and SIGINT.
+
+    :param config dict: The loaded configuration.
+    :raise Exception: If the daemon cannot be started.
+    """
+    schedules = get_schedules()
+    stop_event = threading.Event()
 
-    log.debug(f"Published weather data to MQTT topic {topic} with message ID {mid}")
+    def __stop(signum: int, frame: any) -> None:
+        log.info("Received signal %s, stopping daemon", signal.Signals(signum).name)
+        stop_event.set()
 
-    client.disconnect()
-    log.debug("Disconnected from MQTT server")
+    signal.signal(signal.SIGTERM, __stop)
+    signal.signal(signal.SIGINT, __stop)
+
+    # the publisher runs the network loop that handles keepalive and reconnects in the background
+    publisher = __initialize_publisher()
+    request_server = None
+
+    def job(job_config: dict) -> None:
+        if request_server is not None:
+            __count_request_statistics(request_server)
+        process_weather_data(config=job_config, publisher=publisher)
+
+    jobs = list()
+    for modes, scheduler in schedules:
+        # every schedule requests only its modes
+        job_config = config if len(schedules) == 1 else load_config_file(modes=modes)
+        jobs.append((scheduler, lambda job_config=job_config: job(job_config)))
+
+    try:
+        request_server = __start_request_server(
+            config=config, publisher=publisher.primary if len(__get_mqtt_targets()) > 1 else publisher
+        )
+        Scheduler.run_all(jobs=jobs, stop_event=stop_event)
+    finally:
+        if request_server is not None:
+            request_server.stop()
+        publisher.disconnect()
+        log.debug("Disconnected from MQTT server")
 
 
 """
@@ -401,49 +2194,38 @@ def publish_weather_data(topic: str, payload: dict) -> None:
 # M A I N
 ###############################################################################
 """
-# initialize logger
-if os.getenv("DEBUG", "false").lower() == "true":
-    log = initialize_logger(logging.DEBUG)
-else:
-    log = initialize_logger(logging.INFO)
+# the logger is configured at start, imported as module the logging setup of the caller is used
+log = logging.getLogger()
 
 if __name__ == "__main__":
-    log.info(f"Starting weather2mqtt version {__version__}")
+    if os.getenv("DEBUG", "false").lower() == "true":
+        log = initialize_logger(logging.DEBUG)
+    else:
+        log = initialize_logger(logging.INFO)
+    log.info("Starting weather2mqtt version %s", __version__)
     if os.environ.get("TZ") is not None:
-        __local_tz__ = pytz.timezone(os.environ.get("TZ"))
-    log.debug(f"Local timezone set to {__local_tz__}")
+        __local_tz__ = zoneinfo.ZoneInfo(os.environ.get("TZ"))
+    log.debug("Local timezone set to %s", __local_tz__)
 
-    # load configuration from file
-    config = load_config_file()
+    run_mode = os.environ.get("RUN_MODE", "oneshot").lower()
+    if run_mode not in __run_modes__:
+        raise ValueError(f"Invalid run mode: {run_mode}. Must be one of {__run_modes__}.")
+    log.debug("Run mode: %s", run_mode)
 
-    # request weather data from Open-Meteo API
-    weather_result = request_weather_data(payload=config["data"])
+    # serve the metrics on http://<host>:<METRICS_PORT>/metrics
+    if os.environ.get("METRICS_PORT") is not None:
+        __metrics.start_http_server(port=int(os.environ.get("METRICS_PORT")))
 
-    # Special operations if mode is "tomorrow"
-    if os.environ.get("MODE") == "tomorrow":
-        log.debug("Mode is 'tomorrow', extract tomorrow's weather data only.")
-        if "daily" in weather_result.keys():
-            tomorrow_date = (datetime.datetime.now(tz=__local_tz__) + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-            log.debug(f"Extract weather data for date: {tomorrow_date}")
-            tomorrow_data = dict()
-            tomorrow_data["date"] = tomorrow_date
-            for key, value in weather_result["daily"].items():
-                tomorrow_data[key] = weather_result["daily"][key][tomorrow_date]
-            weather_result["tomorrow"] = tomorrow_data
-            del weather_result["daily"]
-        else:
-            log.warning("No daily weather data found to extract tomorrow's weather.")
-
-    # Add the local time as message_timestamp to payload
-    weather_result["message_timestamp"] = __local_tz__.localize(datetime.datetime.now()).isoformat()
-
-    log.debug("Payload: {}".format(json.dumps(weather_result, ensure_ascii=False)))
+    # load configuration from file
+    with __metrics.timer("config"):
+        config = load_config_file()
 
-    # Publish weather data
-    publish_weather_data(
-        topic=os.environ.get("MQTT_TOPIC"),
-        payload=weather_result,
-    )
+    if run_mode == "daemon":
+        run_daemon(config=config)
+    elif run_mode == "replay":
+        run_replay(config=config)
+    else:
+        process_weather_data(config=config)
 
-    log.info(f"Stop weather2mqtt version {__version__}")
+    log.info("Stop weather2mqtt version %s", __version__)
     sys.exit(0)
@@ -0,0 +1,278 @@
+"""
+***************************************************************************
+benchmark.py is an offline micro-benchmark suite for the parse, translate
+   and serialize hot paths of weather2mqtt.py
+   The Open-Meteo responses are built from FlatBuffers fixtures, no network
+   access is required.
+
+   Usage: python -m test.benchmark [--output results.json]
+              [--baseline baseline.json] [--threshold 0.25]
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["BENCHMARKS", "compare", "main", "measure", "run_benchmarks"]
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import timeit
+from test.openmeteo_fixtures import (
+    build_block,
+    build_response,
+    build_variable,
+    parse_responses,
+)
+
+from src.app.bin.lib.serializer import PayloadSerializer, cbor2, msgpack
+from src.app.bin.lib.weather_codes import WeatherCodes
+from src.app.bin.lib.weather_parser import WeatherBlock
+from src.app.bin.weather2mqtt import (
+    parse_current_weather,
+    parse_daily_weather,
+    parse_timeseries_weather,
+    prepare_weather_payload,
+)
+
+# 2026-01-06T00:00:00+00:00
+START = 1767657600
+DAY = 86400
+
+# variables of the default configuration files, cycled for larger variable counts
+CURRENT_VARIABLES = [
+    ("temperature_2m", "temperature", 2),
+    ("relative_humidity_2m", "relative_humidity", 2),
+    ("apparent_temperature", "apparent_temperature", 0),
+    ("precipitation", "precipitation", 0),
+    ("weather_code", "weather_code", 0),
+    ("cloud_cover", "cloud_cover", 0),
+    ("pressure_msl", "pressure_msl", 0),
+    ("wind_speed_10m", "wind_speed", 10),
+    ("wind_direction_10m", "wind_direction", 10),
+    ("wind_gusts_10m", "wind_gusts", 10),
+]
+# the aggregation of the daily variables as openmeteo_sdk.Aggregation, e.g. 2 is the maximum
+DAILY_VARIABLES = [
+    ("weather_code", "weather_code", 0, 0),
+    ("temperature_2m_max", "temperature", 2, 2),
+    ("temperature_2m_min", "temperature", 2, 1),
+    ("sunrise", "sunrise", 0, 0),
+    ("sunset", "sunset", 0, 0),
+    ("precipitation_sum", "precipitation", 0, 10),
+    ("precipitation_probability_max", "precipitation_probability", 0, 2),
+    ("wind_speed_10m_max", "wind_speed", 10, 2),
+    ("uv_index_max", "uv_index", 0, 2),
+    ("daylight_duration", "daylight_duration", 0, 0),
+]
+# the cycled variables get another altitude, so every field has its own response variable
+CYCLE_ALTITUDE = 1000
+
+
+def current_fixture(variables: int) -> tuple:
+    """
+    Build a current weather response with the given number of variables
+
+    :param variables: The number of variables
+    :return: tuple (openmeteo_sdk.VariablesWithTime, list of field names)
+    """
+    block_variables = list()
+    for i in range(variables):
+        _, name, altitude = CURRENT_VARIABLES[i % len(CURRENT_VARIABLES)]
+        altitude += i // len(CURRENT_VARIABLES) * CYCLE_ALTITUDE
+        value = 3.0 if name == "weather_code" else 10.0 + i
+        block_variables.append(build_variable(name, value=value, altitude=altitude))
+    response = build_response(current=build_block(START, START + 900, 900, block_variables))
+    data = parse_responses(response)[0].Current()
+    return data, [WeatherBlock.variable_name(data.Variables(i)) for i in range(data.VariablesLength())]
+
+
+def daily_fixture(days: int, variables: int) -> tuple:
+    """
+    Build a daily weather response with the given number of days and variables
+
+    :param days: The number of forecast days
+    :param variables: The number of variables
+    :return: tuple (openmeteo_sdk.VariablesWithTime, list of field names)
+    """
+    block_variables = list()
+    for i in range(variables):
+        _, name, altitude, aggregation = DAILY_VARIABLES[i % len(DAILY_VARIABLES)]
+        altitude += i // len(DAILY_VARIABLES) * CYCLE_ALTITUDE
+        if name in ["sunrise", "sunset"]:
+            offset = 7 * 3600 if name == "sunrise" else 17 * 3600
+            values = {"values_int64": [START + d * DAY + offset for d in range(days)]}
+        elif name == "weather_code":
+            values = {"values": [float(d % 100) for d in range(days)]}
+        else:
+            values = {"values": [i + d * 0.5 for d in range(days)]}
+        block_variables.append(build_variable(name, altitude=altitude, aggregation=aggregation, **values))
+    response = build_response(daily=build_block(START, START + days * DAY, DAY, block_variables))
+    data = parse_responses(response)[0].Daily()
+    return data, [WeatherBlock.variable_name(data.Variables(i)) for i in range(data.VariablesLength())]
+
+
+def measure(function, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Measure a function with timeit, the number of loops is calibrated to run at least min_time seconds
+
+    :param function: The function without arguments to measure
+    :param min_time: The minimum duration of one measurement in seconds (default: 0.2)
+    :param repeat: The number of measurements, the fastest is used (default: 5)
+    :return: dict with seconds per operation, operations per second, loops and repeat
+    """
+    timer = timeit.Timer(function)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time:
+            break
+        loops *= 2
+    seconds = min(timer.repeat(repeat=repeat, number=loops)) / loops
+    return {"seconds_per_op": seconds, "ops_per_sec": 1 / seconds if seconds > 0 else None, "loops": loops}
+
+
+def __benchmark_parse_current(variables: int):
+    data, fields = current_fixture(variables)
+    return lambda: parse_current_weather(data=data, fields=fields)
+
+
+def __benchmark_parse_daily(days: int, variables: int):
+    data, fields = daily_fixture(days, variables)
+    return lambda: parse_daily_weather(data=data, fields=fields, utc_offset_seconds=3600)
+
+
+def __benchmark_translate():
+    weather_codes = WeatherCodes(language="en")
+    codes = list(range(100))
+
+    def translate():
+        for code in codes:
+            weather_codes.translate(code)
+
+    return translate
+
+
+def __benchmark_translate_many():
+    weather_codes = WeatherCodes(language="en")
+    codes = [float(code % 100) for code in range(1000)]
+    return lambda: weather_codes.translate_many(codes)
+
+
+def __benchmark_serialize(days: int, format: str = "json"):
+    data, fields = daily_fixture(days, len(DAILY_VARIABLES))
+    weather_result = {
+        "location": {"latitude": 48.78, "longitude": 8.94, "elevation": 409.0},
+        "timezone": {"name": "Europe/Berlin", "abbreviation": "CET", "utc_offset_seconds": 3600},
+        "daily": parse_timeseries_weather(data=data, fields=fields, utc_offset_seconds=3600),
+    }
+    payload = prepare_weather_payload(weather_result=weather_result, mode="forecast", mode_data={"daily": fields})
+    serializer = PayloadSerializer(format=format)
+    return lambda: serializer.encode(payload)
+
+
+# name: factory that prepares the fixture and returns the function to measure
+BENCHMARKS = {
+    "parse_current_weather[variables=5]": lambda: __benchmark_parse_current(5),
+    "parse_current_weather[variables=10]": lambda: __benchmark_parse_current(10),
+    "parse_current_weather[variables=30]": lambda: __benchmark_parse_current(30),
+    "parse_daily_weather[days=1,variables=5]": lambda: __benchmark_parse_daily(1, 5),
+    "parse_daily_weather[days=7,variables=10]": lambda: __benchmark_parse_daily(7, 10),
+    "parse_daily_weather[days=16,variables=10]": lambda: __benchmark_parse_daily(16, 10),
+    "parse_daily_weather[days=16,variables=30]": lambda: __benchmark_parse_daily(16, 30),
+    "WeatherCodes.translate[codes=100]": __benchmark_translate,
+    "WeatherCodes.translate_many[codes=1000]": __benchmark_translate_many,
+    "serialize_payload[days=7]": lambda: __benchmark_serialize(7),
+    "serialize_payload[days=16]": lambda: __benchmark_serialize(16),
+}
+if cbor2 is not None:
+    BENCHMARKS["serialize_payload[days=16,format=cbor]"] = lambda: __benchmark_serialize(16, "cbor")
+if msgpack is not None:
+    BENCHMARKS["serialize_payload[days=16,format=msgpack]"] = lambda: __benchmark_serialize(16, "msgpack")
+
+
+def run_benchmarks(names: list = None, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Run the benchmarks
+
+    :param names: The names of the benchmarks to run (default: all benchmarks)
+    :param min_time: The minimum duration of one measurement in seconds (default: 0.2)
+    :param repeat: The number of measurements per benchmark (default: 5)
+    :return: dict with the environment and the result per benchmark
+    """
+    results = dict()
+    for name in BENCHMARKS.keys() if names is None else names:
+        results[name] = measure(BENCHMARKS[name](), min_time=min_time, repeat=repeat)
+    return {
+        "timestamp": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.25) -> dict:
+    """
+    Compare benchmark results against a baseline
+
+    :param results: The results of run_benchmarks()
+    :param baseline: The results of a previous run
+    :param threshold: The allowed slowdown as fraction, e.g. 0.25 for 25% (default: 0.25)
+    :return: dict with the relative change per benchmark that is slower than the threshold
+    """
+    regressions = dict()
+    for name, result in results["results"].items():
+        if name not in baseline["results"].keys():
+            continue
+        change = result["seconds_per_op"] / baseline["results"][name]["seconds_per_op"] - 1
+        if change > threshold:
+            regressions[name] = change
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    """
+    Run the benchmarks, write the results and check for regressions against a baseline
+
+    :param argv: The command line arguments (default: sys.argv)
+    :return: The exit code, 1 if a benchmark is slower than the baseline by more than the threshold
+    """
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks of the weather2mqtt hot paths")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as fraction (default: 0.25)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per measurement (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per benchmark (default: 5)")
+    parser.add_argument("--filter", help="run only benchmarks that contain this text")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS.keys() if args.filter is None or args.filter in name]
+    results = run_benchmarks(names=names, min_time=args.min_time, repeat=args.repeat)
+    for name, result in results["results"].items():
+        print(f"{name:<45} {result['seconds_per_op'] * 1e6:>12.2f} us/op")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), threshold=args.threshold)
+        for name, change in regressions.items():
+            print(f"REGRESSION {name}: {change:+.1%} slower than baseline", file=sys.stderr)
+        if len(regressions) > 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
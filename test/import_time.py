@@ -0,0 +1,134 @@
+"""
+***************************************************************************
+import_time.py measures the cold start import cost of weather2mqtt.py
+   per module with "python -X importtime" in a fresh interpreter and
+   checks it against an import time budget.
+
+   Usage: python -m test.import_time [--budget 0.15] [--top 15]
+              [--output results.json]
+      or: python test/import_time.py [...]
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["LAZY_MODULES", "main", "measure_imports", "parse_importtime"]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# not imported from the test package, run as script "test" is the package of the standard library
+__tool_path__ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "app", "bin")
+
+# heavy dependencies that must not be imported at start up, they are imported on first use
+LAZY_MODULES = [
+    "asyncio",
+    "http.server",
+    "numpy",
+    "openmeteo_requests",
+    "openmeteo_sdk",
+    "paho.mqtt.client",
+    "requests_cache",
+    "retry_requests",
+]
+
+
+def parse_importtime(output: str) -> list:
+    """
+    Parse the output of "python -X importtime"
+
+    :param output: The stderr of the interpreter
+    :return: list of dicts with module, self and cumulative import time in seconds and the nesting level
+    """
+    result = list()
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # header line
+            continue
+        name = fields[2].rstrip()
+        result.append(
+            {
+                "module": name.strip(),
+                "self": int(fields[0]) / 1e6,
+                "cumulative": int(fields[1]) / 1e6,
+                "level": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    return result
+
+
+def measure_imports(module: str = "weather2mqtt") -> dict:
+    """
+    Import a module in a fresh interpreter and measure the import time per module
+
+    :param module: The module to import (default: "weather2mqtt")
+    :return: dict with the total import time in seconds, the imports and the loaded lazy modules
+    :raise RuntimeError: If the module cannot be imported
+    """
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    env = dict(os.environ, PYTHONPATH=__tool_path__)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=__tool_path__, env=env, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}: {process.stderr.strip().splitlines()[-1]}")
+    imports = parse_importtime(process.stderr)
+    loaded = set(process.stdout.split())
+    # the interpreter start up (e.g. site) is not part of the budget
+    total = sum(i["cumulative"] for i in imports if i["level"] == 0 and i["module"] == module)
+    return {
+        "module": module,
+        "total": total,
+        "imports": imports,
+        "lazy_modules_loaded": [m for m in LAZY_MODULES if m in loaded],
+    }
+
+
+def main(argv: list = None) -> int:
+    """
+    Measure the import time, print the most expensive modules and check the budget
+
+    :param argv: The command line arguments (default: sys.argv)
+    :return: The exit code, 1 if the budget is exceeded or a lazy module is imported at start up
+    """
+    parser = argparse.ArgumentParser(description="Import time of the weather2mqtt start up")
+    parser.add_argument("--budget", type=float, default=0.15, help="maximum import time in seconds (default: 0.15)")
+    parser.add_argument("--top", type=int, default=15, help="number of modules to print (default: 15)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = measure_imports()
+    for i in sorted(results["imports"], key=lambda i: i["cumulative"], reverse=True)[: args.top]:
+        print(f"{i['module']:<45} {i['cumulative'] * 1e3:>9.2f} ms {i['self'] * 1e3:>9.2f} ms self")
+    print(f"{'total':<45} {results['total'] * 1e3:>9.2f} ms (budget {args.budget * 1e3:.0f} ms)")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    exit_code = 0
+    if results["total"] > args.budget:
+        print(f"BUDGET EXCEEDED: {results['total'] * 1e3:.2f} ms", file=sys.stderr)
+        exit_code = 1
+    for module in results["lazy_modules_loaded"]:
+        print(f"EAGER IMPORT: {module} is imported at start up", file=sys.stderr)
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
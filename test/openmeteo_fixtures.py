@@ -0,0 +1,158 @@
+"""
+***************************************************************************
+openmeteo_fixtures.py builds Open-Meteo FlatBuffers API responses
+   to test the parsing without network access
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["build_response", "build_variable", "build_block", "parse_responses"]
+
+import flatbuffers
+import numpy as np
+from openmeteo_requests.Client import _process_response
+from openmeteo_sdk.Variable import Variable
+
+
+def build_variable(
+    name: str,
+    value: float = None,
+    values: list = None,
+    values_int64: list = None,
+    altitude: int = 0,
+    aggregation: int = 0,
+) -> dict:
+    """
+    Describe a variable of a response block
+
+    :param name: The Open-Meteo variable name, e.g. "temperature" for temperature_2m
+    :param value: The scalar value (current block)
+    :param values: The float values (time series)
+    :param values_int64: The int64 values (time series, e.g. sunrise)
+    :param altitude: The altitude of the variable, e.g. 2 for temperature_2m
+    :param aggregation: The openmeteo_sdk.Aggregation of the variable
+    :return: The variable description
+    """
+    return {
+        "variable": getattr(Variable, name),
+        "value": value,
+        "values": values,
+        "values_int64": values_int64,
+        "altitude": altitude,
+        "aggregation": aggregation,
+    }
+
+
+def build_block(time: int, time_end: int, interval: int, variables: list) -> dict:
+    """
+    Describe a response block (current, daily, hourly, minutely_15)
+
+    :param time: Start of the time axis as unix timestamp
+    :param time_end: End of the time axis as unix timestamp
+    :param interval: Interval of the time axis in seconds
+    :param variables: list of variables from build_variable()
+    :return: The block description
+    """
+    return {"time": time, "time_end": time_end, "interval": interval, "variables": variables}
+
+
+def __build_variables_with_time(builder: flatbuffers.Builder, block: dict) -> int:
+    variable_offsets = list()
+    for variable in block["variables"]:
+        values_offset = None
+        values_int64_offset = None
+        if variable["values"] is not None:
+            values_offset = builder.CreateNumpyVector(np.array(variable["values"], dtype=np.float32))
+        if variable["values_int64"] is not None:
+            values_int64_offset = builder.CreateNumpyVector(np.array(variable["values_int64"], dtype=np.int64))
+        builder.StartObject(13)
+        builder.PrependUint8Slot(0, variable["variable"], 0)
+        if variable["value"] is not None:
+            builder.PrependFloat32Slot(2, variable["value"], 0.0)
+        if values_offset is not None:
+            builder.PrependUOffsetTRelativeSlot(3, values_offset, 0)
+        if values_int64_offset is not None:
+            builder.PrependUOffsetTRelativeSlot(4, values_int64_offset, 0)
+        builder.PrependInt16Slot(5, variable["altitude"], 0)
+        builder.PrependUint8Slot(6, variable["aggregation"], 0)
+        variable_offsets.append(builder.EndObject())
+
+    builder.StartVector(4, len(variable_offsets), 4)
+    for offset in reversed(variable_offsets):
+        builder.PrependUOffsetTRelative(offset)
+    variables_offset = builder.EndVector()
+
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, block["time"], 0)
+    builder.PrependInt64Slot(1, block["time_end"], 0)
+    builder.PrependInt32Slot(2, block["interval"], 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_offset, 0)
+    return builder.EndObject()
+
+
+def build_response(
+    latitude: float = 48.78,
+    longitude: float = 8.94,
+    elevation: float = 409.0,
+    location_id: int = 0,
+    model: int = 0,
+    utc_offset_seconds: int = 0,
+    timezone: str = "UTC",
+    timezone_abbreviation: str = "GMT",
+    current: dict = None,
+    daily: dict = None,
+    hourly: dict = None,
+    minutely_15: dict = None,
+) -> bytes:
+    """
+    Build a length prefixed Open-Meteo FlatBuffers response, like a single entry of the API response body
+
+    :return: The response bytes
+    """
+    builder = flatbuffers.Builder(1024)
+    timezone_offset = builder.CreateString(timezone)
+    timezone_abbreviation_offset = builder.CreateString(timezone_abbreviation)
+    blocks = dict()
+    for slot, block in [(9, current), (10, daily), (11, hourly), (12, minutely_15)]:
+        if block is not None:
+            blocks[slot] = __build_variables_with_time(builder, block)
+
+    builder.StartObject(16)
+    builder.PrependFloat32Slot(0, latitude, 0.0)
+    builder.PrependFloat32Slot(1, longitude, 0.0)
+    builder.PrependFloat32Slot(2, elevation, 0.0)
+    builder.PrependInt64Slot(4, location_id, 0)
+    builder.PrependUint8Slot(5, model, 0)
+    builder.PrependInt32Slot(6, utc_offset_seconds, 0)
+    builder.PrependUOffsetTRelativeSlot(7, timezone_offset, 0)
+    builder.PrependUOffsetTRelativeSlot(8, timezone_abbreviation_offset, 0)
+    for slot, offset in blocks.items():
+        builder.PrependUOffsetTRelativeSlot(slot, offset, 0)
+    builder.Finish(builder.EndObject())
+
+    data = bytes(builder.Output())
+    return len(data).to_bytes(4, byteorder="little") + data
+
+
+class _Body:
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+def parse_responses(body: bytes) -> list:
+    """
+    Parse a response body (one or more concatenated responses) like the Open-Meteo client does
+
+    :param body: The response body
+    :return: list of openmeteo_sdk.WeatherApiResponse
+    """
+    return _process_response(_Body(body))
@@ -0,0 +1,82 @@
+"""
+***************************************************************************
+test_async_engine.py is a python unit test for the python module
+   async_engine
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestAsyncEngine"]
+
+import asyncio
+import threading
+import unittest
+
+from src.app.bin.lib.async_engine import AsyncEngine
+
+
+class TestAsyncEngine(unittest.TestCase):
+    def test_concurrency(self):
+        engine = AsyncEngine(concurrency=2)
+        lock = threading.Lock()
+        # the jobs only continue in pairs, so both slots are used at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        state = {"running": 0, "max": 0}
+
+        def job(value):
+            with lock:
+                state["running"] += 1
+                state["max"] = max(state["max"], state["running"])
+            barrier.wait()
+            with lock:
+                state["running"] -= 1
+            return value * 2
+
+        async def main():
+            return await engine.gather([engine.run(job, i) for i in range(6)])
+
+        self.assertEqual(asyncio.run(main()), [0, 2, 4, 6, 8, 10])
+        self.assertEqual(state["max"], 2)
+        # a new event loop can reuse the engine
+        self.assertEqual(asyncio.run(main()), [0, 2, 4, 6, 8, 10])
+
+    def test_timeout(self):
+        engine = AsyncEngine(concurrency=2, timeout=0.01)
+        event = threading.Event()
+
+        async def main():
+            with self.assertRaises(TimeoutError):
+                await engine.run(event.wait, 5)
+            # the timed out job is released, the job without timeout waits for the event
+            event.set()
+            return await engine.run(event.wait, 5, timeout=None)
+
+        self.assertTrue(asyncio.run(main()))
+
+    def test_gather_raise_first(self):
+        engine = AsyncEngine()
+
+        def fail():
+            raise ValueError("failed")
+
+        async def main():
+            return await engine.gather([engine.run(fail), engine.run(int, "1")], raise_first=True)
+
+        with self.assertLogs("src.app.bin.lib.async_engine", level="ERROR"):
+            self.assertRaises(ValueError, asyncio.run, main())
+
+    def test_invalid_concurrency(self):
+        self.assertRaises(ValueError, AsyncEngine, concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+***************************************************************************
+test_benchmark.py is a python unit test for the micro-benchmark suite
+   benchmark.py
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestBenchmark"]
+
+import unittest
+from test.benchmark import BENCHMARKS, compare, run_benchmarks
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_benchmarks_run(self):
+        # every benchmark fixture must still match the parse functions
+        results = run_benchmarks(min_time=0, repeat=1)
+        self.assertEqual(list(results["results"].keys()), list(BENCHMARKS.keys()))
+        for result in results["results"].values():
+            self.assertGreater(result["seconds_per_op"], 0)
+
+    def test_compare(self):
+        baseline = {"results": {"a": {"seconds_per_op": 1.0}, "b": {"seconds_per_op": 1.0}}}
+        results = {
+            "results": {"a": {"seconds_per_op": 1.2}, "b": {"seconds_per_op": 1.5}, "c": {"seconds_per_op": 9.0}}
+        }
+        self.assertEqual(compare(results, baseline, threshold=0.25), {"b": 0.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
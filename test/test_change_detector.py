@@ -0,0 +1,156 @@
+"""
+***************************************************************************
+test_change_detector.py is a python unit test for the python module
+   change_detector
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestChangeDetector"]
+
+import copy
+import os
+import tempfile
+import unittest
+
+from src.app.bin.lib.change_detector import ChangeDetector
+
+PAYLOAD = {
+    "location": {"latitude": 48.78, "longitude": 8.94, "elevation": 409.0},
+    "current": {
+        "time": "2026-01-06T10:00:00+00:00",
+        "temperature_2m": 10.0,
+        "relative_humidity_2m": 80.0,
+        "weather_code": 3,
+        "weather_code_text": "Overcast",
+    },
+    "hourly": {"time": ["2026-01-06T10:00:00+00:00", "2026-01-06T11:00:00+00:00"], "temperature_2m": [10.0, 11.0]},
+    "message_timestamp": "2026-01-06T10:05:00+00:00",
+}
+
+
+class Clock:
+    def __init__(self, now: float = 0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def changed(**current) -> dict:
+    payload = copy.deepcopy(PAYLOAD)
+    payload["current"].update(current)
+    payload["current"]["time"] = "2026-01-06T10:15:00+00:00"
+    payload["message_timestamp"] = "2026-01-06T10:20:00+00:00"
+    return payload
+
+
+def publish(detector: ChangeDetector, topic: str, payload: dict) -> dict | None:
+    # the filtered payload is published successfully
+    result = detector.filter(topic, payload)
+    detector.commit(topic)
+    return result
+
+
+class TestChangeDetector(unittest.TestCase):
+    def test_parse_deadband(self):
+        self.assertEqual(ChangeDetector.parse_deadband(0.5), (0.5, 0.0))
+        self.assertEqual(ChangeDetector.parse_deadband("5%"), (0.0, 0.05))
+        self.assertRaises(ValueError, ChangeDetector.parse_deadband, "-1")
+        self.assertRaises(ValueError, ChangeDetector.from_string, "temperature_2m")
+
+    def test_unchanged(self):
+        detector = ChangeDetector()
+        self.assertEqual(publish(detector, "weather", PAYLOAD), PAYLOAD)
+        # only timestamps changed
+        self.assertIsNone(publish(detector, "weather", changed()))
+        # other topics are independent
+        self.assertEqual(publish(detector, "other", PAYLOAD), PAYLOAD)
+
+    def test_deadband(self):
+        detector = ChangeDetector.from_string("temperature_2m=0.5,relative_humidity_2m=5%")
+        publish(detector, "weather", PAYLOAD)
+        self.assertIsNone(publish(detector, "weather", changed(temperature_2m=10.4, relative_humidity_2m=83.0)))
+        # compared to the last published value, small changes do not add up unnoticed
+        self.assertIsNotNone(publish(detector, "weather", changed(temperature_2m=10.6)))
+        self.assertIsNone(publish(detector, "weather", changed(temperature_2m=10.6, relative_humidity_2m=76.0)))
+        self.assertIsNotNone(publish(detector, "weather", changed(temperature_2m=10.6, relative_humidity_2m=75.0)))
+        self.assertIsNotNone(publish(detector, "weather", changed(weather_code=2, weather_code_text="Partly cloudy")))
+
+    def test_nan(self):
+        detector = ChangeDetector()
+        publish(detector, "weather", changed(temperature_2m=float("nan")))
+        self.assertIsNone(publish(detector, "weather", changed(temperature_2m=float("nan"))))
+        self.assertIsNotNone(publish(detector, "weather", changed(temperature_2m=1.0)))
+
+    def test_delta(self):
+        detector = ChangeDetector(mode="delta")
+        publish(detector, "weather", PAYLOAD)
+        payload = changed(temperature_2m=12.0)
+        self.assertEqual(
+            publish(detector, "weather", payload),
+            {
+                "location": PAYLOAD["location"],
+                "current": {"time": "2026-01-06T10:15:00+00:00", "temperature_2m": 12.0},
+                "message_timestamp": "2026-01-06T10:20:00+00:00",
+            },
+        )
+        payload["hourly"]["temperature_2m"] = [10.0, 12.0]
+        self.assertEqual(publish(detector, "weather", payload)["hourly"], payload["hourly"])
+        payload = changed(temperature_2m=12.0, weather_code=2)
+        self.assertEqual(list(publish(detector, "weather", payload)["current"].keys()), ["time", "weather_code"])
+
+    def test_refresh_interval(self):
+        clock = Clock()
+        detector = ChangeDetector(refresh_interval=3600, clock=clock)
+        publish(detector, "weather", PAYLOAD)
+        clock.now = 3599
+        self.assertIsNone(publish(detector, "weather", changed()))
+        clock.now = 3600
+        self.assertIsNotNone(publish(detector, "weather", changed()))
+        self.assertIsNone(publish(detector, "weather", changed()))
+
+    def test_changed_structure(self):
+        detector = ChangeDetector()
+        publish(detector, "weather", PAYLOAD)
+        payload = changed()
+        del payload["hourly"]
+        self.assertEqual(publish(detector, "weather", payload), payload)
+
+    def test_state_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "state.json")
+            detector = ChangeDetector(state_file=state_file)
+            publish(detector, "weather", PAYLOAD)
+            detector.save()
+            self.assertIsNone(ChangeDetector(state_file=state_file).filter("weather", changed()))
+
+    def test_not_published(self):
+        detector = ChangeDetector()
+        self.assertEqual(detector.filter("weather", PAYLOAD), PAYLOAD)
+        # the publish failed, the payload is published again
+        detector.discard()
+        self.assertEqual(detector.filter("weather", changed()), changed())
+        detector.commit()
+        self.assertIsNone(detector.filter("weather", changed()))
+
+        detector = ChangeDetector(mode="delta")
+        publish(detector, "weather", PAYLOAD)
+        self.assertIn("current", detector.filter("weather", changed(temperature_2m=12.0)).keys())
+        self.assertIn("current", detector.filter("weather", changed(temperature_2m=12.0)).keys())
+
+    def test_invalid_mode(self):
+        self.assertRaises(ValueError, ChangeDetector, mode="shrink")
+
+
+if __name__ == "__main__":
+    unittest.main()
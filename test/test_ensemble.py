@@ -0,0 +1,123 @@
+"""
+***************************************************************************
+test_ensemble.py is a python unit test for the python module
+   ensemble
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestEnsembleAggregator"]
+
+import math
+import unittest
+from test.openmeteo_fixtures import (
+    build_block,
+    build_response,
+    build_variable,
+    parse_responses,
+)
+
+import numpy as np
+
+from src.app.bin.lib.ensemble import EnsembleAggregator
+from src.app.bin.lib.weather_parser import WeatherBlock
+
+# 2026-01-06T00:00:00+01:00
+START = 1767654000
+HOUR = 3600
+
+
+def hourly_block(temperature: list, weather_code: list, wind_direction: list) -> WeatherBlock:
+    response = parse_responses(
+        build_response(
+            hourly=build_block(
+                time=START,
+                time_end=START + len(temperature) * HOUR,
+                interval=HOUR,
+                variables=[
+                    build_variable("temperature", values=temperature, altitude=2),
+                    build_variable("weather_code", values=weather_code),
+                    build_variable("wind_direction", values=wind_direction, altitude=10),
+                ],
+            )
+        )
+    )[0]
+    return WeatherBlock(data=response.Hourly(), fields=["temperature_2m", "weather_code", "wind_direction_10m"])
+
+
+class TestEnsembleAggregator(unittest.TestCase):
+    def test_invalid_statistic(self):
+        self.assertRaises(ValueError, EnsembleAggregator, statistics=["median"])
+
+    def test_mode(self):
+        values = np.array([[3, 61, 0, np.nan], [61, 61, 1, np.nan], [3, 2, 2, 5]], dtype=np.float64)
+        result, agreement = EnsembleAggregator.mode(values)
+        self.assertEqual(result.tolist(), [3.0, 61.0, 2.0, 5.0])
+        self.assertEqual(agreement.tolist(), [0.67, 0.67, 0.33, 1.0])
+
+        result, agreement = EnsembleAggregator.mode(np.array([[np.nan], [np.nan]]))
+        self.assertTrue(math.isnan(result[0]))
+
+    def test_circular_mean(self):
+        self.assertEqual(EnsembleAggregator.circular_mean(np.array([[350.0, 90.0], [10.0, 180.0]])).tolist(), [0, 135])
+
+    def test_combine_current(self):
+        currents = [
+            {"time": "t", "temperature_2m": 4.0, "weather_code": 3, "weather_code_text": "a"},
+            {"time": "t", "temperature_2m": 5.0, "weather_code": 61, "weather_code_text": "b"},
+            {"time": "t", "temperature_2m": math.nan, "weather_code": 61, "weather_code_text": "b"},
+        ]
+        result = EnsembleAggregator(statistics=["max", "spread"]).combine(
+            [{"current": current} for current in currents], models=["a", "b", "c"]
+        )
+        self.assertEqual(result["ensemble"], {"models": ["a", "b", "c"]})
+        self.assertEqual(
+            result["current"],
+            {
+                "time": "t",
+                "temperature_2m": 4.5,
+                "temperature_2m_ensemble_max": 5.0,
+                "temperature_2m_ensemble_spread": 0.5,
+                "weather_code": 61,
+                "weather_code_ensemble_agreement": 0.67,
+                "weather_code_text": "a",
+            },
+        )
+        self.assertNotIn("models", result.keys())
+
+    def test_combine_block(self):
+        results = [
+            {"hourly": hourly_block([1.0, 2.0], [3.0, 3.0], [350.0, 90.0])},
+            {"hourly": hourly_block([3.0, 2.0], [61.0, 3.0], [10.0, 90.0])},
+        ]
+        result = EnsembleAggregator(include_models=True).combine(results, models=["icon_seamless", "gfs_seamless"])
+        columns = {field: column.tolist() for field, column in result["hourly"].columns.items()}
+        self.assertEqual(columns["temperature_2m"], [2.0, 2.0])
+        self.assertEqual(columns["temperature_2m_ensemble_min"], [1.0, 2.0])
+        self.assertEqual(columns["temperature_2m_ensemble_max"], [3.0, 2.0])
+        self.assertEqual(columns["temperature_2m_ensemble_spread"], [1.0, 0.0])
+        self.assertEqual(columns["weather_code"], [61.0, 3.0])
+        self.assertEqual(columns["weather_code_ensemble_agreement"], [0.5, 1.0])
+        self.assertEqual(columns["wind_direction_10m"], [0.0, 90.0])
+        self.assertEqual(list(result["models"].keys()), ["icon_seamless", "gfs_seamless"])
+        # the weather data of the models is not changed
+        self.assertEqual(results[0]["hourly"].columns["temperature_2m"].tolist(), [1.0, 2.0])
+
+    def test_other_time_axis(self):
+        results = [{"hourly": hourly_block([1.0, 2.0], [3, 3], [0, 0])}, {"hourly": hourly_block([5.0], [3], [0])}]
+        with self.assertLogs("src.app.bin.lib.ensemble", level="WARNING"):
+            result = EnsembleAggregator().combine(results, models=["a", "b"])
+        self.assertEqual(result["hourly"].columns["temperature_2m"].tolist(), [1.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
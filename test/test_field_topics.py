@@ -0,0 +1,77 @@
+"""
+***************************************************************************
+test_field_topics.py is a python unit test for the python module
+   field_topics
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestFieldTopics"]
+
+import json
+import unittest
+
+from src.app.bin.lib.field_topics import FieldTopics
+
+PAYLOAD = {
+    "location": {"latitude": 48.78, "longitude": 8.94},
+    "current": {
+        "time": "2026-01-06T10:00:00+00:00",
+        "temperature_2m": 10.5,
+        "weather_code": 3,
+        "weather_code_text": "Overcast",
+        "precipitation": float("nan"),
+    },
+    "hourly": {"time": ["2026-01-06T10:00:00+00:00"], "temperature_2m": [10.5]},
+    "message_timestamp": "2026-01-06T10:05:00+00:00",
+}
+
+
+class TestFieldTopics(unittest.TestCase):
+    def test_format_value(self):
+        self.assertEqual(FieldTopics.format_value(10.5), "10.5")
+        self.assertEqual(FieldTopics.format_value(3), "3")
+        self.assertEqual(FieldTopics.format_value("Überwiegend bewölkt"), "Überwiegend bewölkt")
+        self.assertEqual(FieldTopics.format_value(float("nan")), "null")
+        self.assertEqual(FieldTopics.format_value([1.0, float("nan")]), "[1.0, null]")
+
+    def test_messages(self):
+        messages = dict(FieldTopics().messages("weather/", PAYLOAD))
+        self.assertEqual(messages["weather/current/temperature_2m"], "10.5")
+        self.assertEqual(messages["weather/current/weather_code_text"], "Overcast")
+        self.assertEqual(messages["weather/current/precipitation"], "null")
+        self.assertEqual(messages["weather/location/latitude"], "48.78")
+        self.assertEqual(messages["weather/hourly/temperature_2m"], "[10.5]")
+        self.assertEqual(messages["weather/message_timestamp"], "2026-01-06T10:05:00+00:00")
+
+    def test_discovery_messages(self):
+        messages = dict(FieldTopics(device_name="Home").discovery_messages("weather", PAYLOAD, node_id="home.current"))
+        self.assertEqual(
+            sorted(messages.keys()),
+            [
+                "homeassistant/sensor/weather2mqtt_home_current/current_precipitation/config",
+                "homeassistant/sensor/weather2mqtt_home_current/current_temperature_2m/config",
+                "homeassistant/sensor/weather2mqtt_home_current/current_weather_code/config",
+                "homeassistant/sensor/weather2mqtt_home_current/current_weather_code_text/config",
+            ],
+        )
+        config = json.loads(messages["homeassistant/sensor/weather2mqtt_home_current/current_temperature_2m/config"])
+        self.assertEqual(config["state_topic"], "weather/current/temperature_2m")
+        self.assertEqual(config["unit_of_measurement"], "°C")
+        self.assertEqual(config["device_class"], "temperature")
+        self.assertEqual(config["state_class"], "measurement")
+        self.assertEqual(config["unique_id"], "weather2mqtt_home_current_current_temperature_2m")
+        self.assertEqual(config["device"]["name"], "Home home_current")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+***************************************************************************
+test_forecast_cache.py is a python unit test for the python module
+   forecast_cache
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestForecastCache"]
+
+import os
+import tempfile
+import threading
+import unittest
+
+from src.app.bin.lib.forecast_cache import ForecastCache
+
+PARAMS = {"latitude": 48.78, "longitude": 8.94, "daily": ["weather_code", "sunrise"], "models": "icon_seamless"}
+# 2026-01-06T01:00:00+00:00
+NOW = 1767661200
+
+
+class Clock:
+    def __init__(self, now: float = NOW):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Fetch:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, params: dict) -> bytes:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(2)
+        if self.error is not None:
+            raise self.error
+        return f"response {self.calls}".encode()
+
+
+class TestForecastCache(unittest.TestCase):
+    def test_key(self):
+        reordered = dict(PARAMS, daily=["sunrise", "weather_code"])
+        self.assertEqual(ForecastCache.key(PARAMS), ForecastCache.key(reordered))
+        self.assertNotEqual(ForecastCache.key(PARAMS), ForecastCache.key(dict(PARAMS, latitude=48.79)))
+        self.assertNotEqual(ForecastCache.key(PARAMS), ForecastCache.key(dict(PARAMS, models="gfs_seamless")))
+
+    def test_update_interval(self):
+        cache = ForecastCache()
+        self.assertEqual(cache.update_interval(PARAMS), 10800)
+        self.assertEqual(cache.update_interval(dict(PARAMS, models="icon_global,icon_d2")), 10800)
+        self.assertEqual(cache.update_interval(dict(PARAMS, models=["ecmwf_ifs025"])), 21600)
+        self.assertEqual(cache.update_interval(dict(PARAMS, current=["temperature_2m"])), 900)
+        self.assertEqual(cache.update_interval({"latitude": 1, "longitude": 2}), 3600)
+        self.assertEqual(ForecastCache(expire_after=60).update_interval(PARAMS), 60)
+        # expires with the next model update after the response was received
+        self.assertEqual(cache.expires_at(PARAMS, NOW), 1767668400)
+
+    def test_fresh_entry(self):
+        fetch = Fetch()
+        cache = ForecastCache(clock=Clock())
+        self.assertEqual(cache.get(PARAMS, fetch).body, b"response 1")
+        self.assertEqual(cache.get(PARAMS, fetch).body, b"response 1")
+        self.assertEqual(fetch.calls, 1)
+
+    def test_expired_entry(self):
+        fetch = Fetch()
+        clock = Clock()
+        cache = ForecastCache(clock=clock)
+        cache.get(PARAMS, fetch)
+        clock.now += 10800
+        entry = cache.get(PARAMS, fetch)
+        self.assertEqual(entry.body, b"response 2")
+        self.assertFalse(entry.stale)
+
+    def test_stale_on_error(self):
+        fetch = Fetch()
+        clock = Clock()
+        cache = ForecastCache(clock=clock, max_stale=3600)
+        cache.get(PARAMS, fetch)
+        clock.now += 10800
+        fetch.error = RuntimeError("API down")
+        entry = cache.get(PARAMS, fetch)
+        self.assertEqual(entry.body, b"response 1")
+        self.assertTrue(entry.stale)
+        # too old to be used
+        clock.now += 3600
+        self.assertRaises(RuntimeError, cache.get, PARAMS, fetch)
+
+    def test_error_without_entry(self):
+        fetch = Fetch()
+        fetch.error = RuntimeError("API down")
+        self.assertRaises(RuntimeError, ForecastCache().get, PARAMS, fetch)
+
+    def test_background_refresh(self):
+        fetch = Fetch()
+        clock = Clock()
+        cache = ForecastCache(clock=clock, background=True)
+        cache.get(PARAMS, fetch)
+        clock.now += 10800
+        fetch.release.clear()
+        fetch.started.clear()
+        # the expired entry is returned immediately while the refresh is running
+        entry = cache.get(PARAMS, fetch)
+        self.assertEqual(entry.body, b"response 1")
+        self.assertFalse(entry.stale)
+        fetch.started.wait(2)
+        fetch.release.set()
+        cache.join()
+        self.assertEqual(cache.get(PARAMS, fetch).body, b"response 2")
+        self.assertEqual(fetch.calls, 2)
+
+    def test_background_refresh_error(self):
+        fetch = Fetch()
+        clock = Clock()
+        cache = ForecastCache(clock=clock, background=True)
+        cache.get(PARAMS, fetch)
+        clock.now += 10800
+        fetch.error = RuntimeError("API down")
+        cache.get(PARAMS, fetch)
+        cache.join()
+        self.assertTrue(cache.get(PARAMS, fetch).stale)
+
+    def test_persistence(self):
+        fetch = Fetch()
+        with tempfile.TemporaryDirectory() as directory:
+            ForecastCache(directory=directory, clock=Clock()).get(PARAMS, fetch)
+            entry = ForecastCache(directory=directory, clock=Clock()).get(PARAMS, fetch)
+            self.assertEqual(entry.body, b"response 1")
+            self.assertEqual(entry.fetched_at, NOW)
+            self.assertEqual(fetch.calls, 1)
+
+    def test_prune(self):
+        fetch = Fetch()
+        clock = Clock()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ForecastCache(directory=directory, clock=clock, max_stale=3600)
+            cache.get(dict(PARAMS, start_date="2026-01-06"), fetch)
+            # an entry of another process that is not loaded
+            ForecastCache(directory=directory, clock=clock).get(dict(PARAMS, start_date="2026-01-05"), fetch)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            self.assertEqual(cache.prune(), 0)
+
+            # the next day the entries are too old to be returned as stale
+            clock.now += 86400
+            cache.get(dict(PARAMS, start_date="2026-01-07"), fetch)
+            self.assertEqual(os.listdir(directory), [f"{ForecastCache.key(dict(PARAMS, start_date='2026-01-07'))}.bin"])
+            self.assertEqual(cache.get(dict(PARAMS, start_date="2026-01-07"), fetch).body, b"response 3")
+
+    def test_max_entries(self):
+        fetch = Fetch()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ForecastCache(directory=directory, clock=Clock(), max_entries=2)
+            first, second, third = (dict(PARAMS, latitude=latitude) for latitude in (48.7, 48.8, 48.9))
+            cache.get(first, fetch)
+            cache.get(second, fetch)
+            # the first entry is used again, so the second is the least recently used one
+            cache.get(first, fetch)
+            cache.get(third, fetch)
+            self.assertEqual(
+                sorted(os.listdir(directory)), sorted(f"{ForecastCache.key(params)}.bin" for params in (first, third))
+            )
+            self.assertEqual(cache.get(second, fetch).body, b"response 4")
+            self.assertEqual(fetch.calls, 4)
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+            # the files of another process beyond the limit are removed, the oldest first
+            ForecastCache(directory=directory, clock=Clock(NOW + 60)).get(dict(PARAMS, latitude=49.0), fetch)
+            self.assertEqual(ForecastCache(directory=directory, clock=Clock(), max_entries=2).prune(), 1)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            self.assertIn(f"{ForecastCache.key(dict(PARAMS, latitude=49.0))}.bin", os.listdir(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+***************************************************************************
+test_grid_index.py is a python unit test for the python module
+   grid_index
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestGridIndex"]
+
+import os
+import tempfile
+import unittest
+
+from src.app.bin.lib.grid_index import GridIndex
+from src.app.bin.lib.locations import Location
+
+A = Location("a", 48.7801, 9.1101)
+B = Location("b", 48.7802, 9.1102)
+C = Location("c", 48.9, 9.3)
+
+
+class TestGridIndex(unittest.TestCase):
+    def test_namespace(self):
+        self.assertEqual(GridIndex.namespace({}), "best_match|land")
+        self.assertEqual(
+            GridIndex.namespace({"models": ["icon_d2", "icon_eu"], "cell_selection": "nearest"}),
+            "icon_d2,icon_eu|nearest",
+        )
+
+    def test_plan(self):
+        index = GridIndex()
+        namespace = GridIndex.namespace({"models": "icon_d2"})
+        # unknown locations are requested on their own
+        self.assertEqual(index.plan(namespace, [A, B, C]), {A: [], B: [], C: []})
+        self.assertTrue(index.learn(namespace, A, 48.78, 9.11, 400.0))
+        self.assertTrue(index.learn(namespace, B, 48.78, 9.11, 400.0))
+        self.assertTrue(index.learn(namespace, C, 48.9, 9.3, 300.0))
+        self.assertFalse(index.learn(namespace, A, 48.78, 9.11, 400.0))
+        self.assertEqual(index.plan(namespace, [A, B, C]), {A: [B], C: []})
+        # other models have other grid cells
+        self.assertEqual(index.plan(GridIndex.namespace({}), [A, B]), {A: [], B: []})
+
+    def test_elevation_is_part_of_the_cell(self):
+        index = GridIndex()
+        index.learn("ns", A, 48.78, 9.11, 400.0)
+        index.learn("ns", B, 48.78, 9.11, 520.0)
+        self.assertEqual(index.plan("ns", [A, B]), {A: [], B: []})
+
+    def test_changed_cell(self):
+        index = GridIndex()
+        index.learn("ns", A, 48.78, 9.11, 400.0)
+        index.learn("ns", B, 48.78, 9.11, 400.0)
+        index.learn("ns", C, 48.9, 9.3, 300.0)
+        index.learn("other", A, 48.78, 9.11, 400.0)
+        self.assertEqual(index.plan("ns", [A, B, C]), {A: [B], C: []})
+        # B is not requested anymore, so a changed cell of A drops the learned cells of the namespace
+        with self.assertLogs("src.app.bin.lib.grid_index", level="INFO"):
+            self.assertTrue(index.learn("ns", A, 48.79, 9.12, 410.0))
+        self.assertEqual(index.plan("ns", [A, B, C]), {A: [], B: [], C: []})
+        self.assertEqual(index.cell("ns", A), "48.79,9.12,410.0")
+        self.assertIsNone(index.cell("ns", C))
+        self.assertEqual(index.cell("other", A), "48.78,9.11,400.0")
+
+    def test_state_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "grid_index.json")
+            index = GridIndex(state_file=state_file)
+            index.learn("ns", A, 48.78, 9.11, 400.0)
+            index.learn("ns", B, 48.78, 9.11, 400.0)
+            index.save()
+            self.assertEqual(GridIndex(state_file=state_file).plan("ns", [A, B]), {A: [B]})
+
+
+if __name__ == "__main__":
+    unittest.main()
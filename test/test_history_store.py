@@ -0,0 +1,95 @@
+"""
+***************************************************************************
+test_history_store.py is a python unit test for the python module
+   history_store
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestHistoryStore"]
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.app.bin.lib.history_store import HistoryStore
+
+START = 1767657600
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.now = START + 100 * 900
+        self.store = HistoryStore(self.directory.name, segment_size=10, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_series_name(self):
+        self.assertEqual(HistoryStore.series_name("home", "current", "temperature_2m"), "home/current/temperature_2m")
+        self.assertEqual(HistoryStore.series_name("../x", "a b"), ".._x/a_b")
+
+    def test_append_and_query(self):
+        series = "home/current/temperature_2m"
+        times = START + np.arange(25) * 900
+        self.assertEqual(self.store.append(series, times, np.arange(25) * 0.5), 25)
+        # 25 records in segments of 10 records
+        self.assertEqual(len(os.listdir(os.path.join(self.directory.name, "home", "current", "temperature_2m"))), 3)
+        self.assertEqual(self.store.series(), [series])
+
+        result_times, values = self.store.query(series)
+        self.assertEqual(result_times.tolist(), times.tolist())
+        result_times, values = self.store.query(series, start=START + 9 * 900, end=START + 11 * 900)
+        self.assertEqual(result_times.tolist(), [START + 9 * 900, START + 10 * 900, START + 11 * 900])
+        self.assertEqual(values.tolist(), [4.5, 5.0, 5.5])
+        self.assertEqual(len(self.store.query("home/current/unknown")[0]), 0)
+
+    def test_append_updates_last_segment(self):
+        series = "home/daily/temperature_2m_max"
+        self.store.append(series, [START, START + 86400], [5.0, 6.0])
+        # the forecast of the second day is revised, the third day is new, the past is ignored
+        self.assertEqual(
+            self.store.append(series, [START - 86400, START + 86400, START + 2 * 86400], [1.0, 6.5, 7.0]), 2
+        )
+        times, values = self.store.query(series)
+        self.assertEqual(times.tolist(), [START, START + 86400, START + 2 * 86400])
+        self.assertEqual(values.tolist(), [5.0, 6.5, 7.0])
+
+    def test_incomplete_record(self):
+        series = "home/current/temperature_2m"
+        self.store.append(series, [START], [1.0])
+        segment = os.path.join(self.directory.name, "home", "current", "temperature_2m", f"{START}.seg")
+        with open(segment, "ab") as f:
+            f.write(b"\x00\x01\x02")
+        self.store.append(series, [START + 900], [2.0])
+        self.assertEqual(self.store.query(series)[1].tolist(), [1.0, 2.0])
+
+    def test_compact(self):
+        series = "home/current/temperature_2m"
+        self.store.append(series, START + np.arange(25) * 900, np.arange(25))
+        self.assertEqual(self.store.compact(), 0)
+        self.store.retention = (100 - 12) * 900
+        self.assertEqual(self.store.compact(), 12)
+        times, values = self.store.query(series)
+        self.assertEqual(values.tolist(), list(range(12, 25)))
+        self.store.append(series, [START + 25 * 900], [25])
+        self.assertEqual(self.store.query(series, start=START + 24 * 900)[1].tolist(), [24, 25])
+        self.now += 86400
+        self.assertEqual(self.store.compact(), 14)
+        self.assertEqual(self.store.series(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
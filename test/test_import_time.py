@@ -0,0 +1,46 @@
+"""
+***************************************************************************
+test_import_time.py is a python unit test for the start up import cost
+   of weather2mqtt.py
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestImportTime"]
+
+import unittest
+from test.import_time import measure_imports, parse_importtime
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   json.decoder
+import time:       300 |        420 | json
+import time:      1000 |       1420 | weather2mqtt
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    def test_parse_importtime(self):
+        imports = parse_importtime(OUTPUT)
+        self.assertEqual([i["module"] for i in imports], ["json.decoder", "json", "weather2mqtt"])
+        self.assertEqual([i["level"] for i in imports], [1, 0, 0])
+        self.assertAlmostEqual(imports[2]["cumulative"], 0.00142)
+        self.assertAlmostEqual(imports[2]["self"], 0.001)
+
+    def test_no_eager_imports(self):
+        # the heavy dependencies are imported on first use only
+        results = measure_imports("weather2mqtt")
+        self.assertEqual(results["lazy_modules_loaded"], [])
+        self.assertGreater(results["total"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
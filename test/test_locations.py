@@ -0,0 +1,69 @@
+"""
+***************************************************************************
+test_locations.py is a python unit test for the python module
+   locations
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestLocations"]
+
+import unittest
+
+from src.app.bin.lib.locations import Location, Locations
+
+
+class TestLocations(unittest.TestCase):
+    def test_from_string(self):
+        locations = Locations.from_string("home:48.7,9.1;office:48.8,9.2,300")
+        self.assertEqual(len(locations), 2)
+        home, office = locations
+        self.assertEqual(home, Location(id="home", latitude=48.7, longitude=9.1))
+        self.assertEqual(office, Location(id="office", latitude=48.8, longitude=9.2, elevation=300))
+
+    def test_from_json_string(self):
+        locations = Locations.from_string(
+            '[{"id": "home", "latitude": 48.7, "longitude": 9.1}, {"latitude": 1, "longitude": 2}]'
+        )
+        self.assertEqual([location.id for location in locations], ["home", "1"])
+
+    def test_invalid_locations(self):
+        self.assertRaises(ValueError, Locations.from_string, "")
+        self.assertRaises(ValueError, Locations.from_string, "home:48.7")
+        self.assertRaises(ValueError, Locations.from_string, "48.7,9.1")
+        self.assertRaises(ValueError, Locations.from_string, "home:48.7,9.1;home:48.8,9.2")
+        self.assertRaises(ValueError, Locations.from_string, "ho/me:48.7,9.1")
+        self.assertRaises(ValueError, Locations.from_file, "/not/existing/file.json")
+
+    def test_batches(self):
+        locations = Locations.from_string("a:1,2;b:3,4;c:5,6,100")
+        batches = locations.batches({"current": ["temperature_2m"]}, url="https://example.com")
+        self.assertEqual(len(batches), 2)
+        # locations with elevation are requested separately
+        self.assertEqual([location.id for location in batches[0][0]], ["c"])
+        self.assertEqual(batches[0][1]["elevation"], "100.0")
+        self.assertEqual([location.id for location in batches[1][0]], ["a", "b"])
+        self.assertEqual(batches[1][1]["latitude"], "1.0,3.0")
+        self.assertEqual(batches[1][1]["longitude"], "2.0,4.0")
+        self.assertNotIn("elevation", batches[1][1])
+
+    def test_batches_url_length(self):
+        locations = Locations.from_list([{"latitude": i, "longitude": i} for i in range(100)])
+        batches = locations.batches({}, url="https://example.com", max_url_length=200)
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(len(batch) for batch, params in batches), 100)
+        for batch, params in batches:
+            self.assertEqual(len(params["latitude"].split(",")), len(batch))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+***************************************************************************
+test_metrics.py is a python unit test for the python module
+   metrics
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestMetrics"]
+
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+from src.app.bin.lib.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_timer(self):
+        metrics = Metrics()
+        with metrics.timer("fetch"):
+            pass
+        with metrics.timer("fetch"):
+            pass
+        stages = metrics.to_dict()["stages"]
+        self.assertEqual(stages["fetch"]["runs"], 2)
+        self.assertGreaterEqual(stages["fetch"]["total_seconds"], stages["fetch"]["last_seconds"])
+
+    def test_timer_records_on_error(self):
+        metrics = Metrics()
+        with self.assertRaises(RuntimeError), metrics.timer("parse"):
+            raise RuntimeError("failed")
+        self.assertEqual(metrics.to_dict()["stages"]["parse"]["runs"], 1)
+
+    def test_counters_and_gauges(self):
+        metrics = Metrics()
+        metrics.increment("cache_hits_total")
+        metrics.increment("cache_hits_total", 2)
+        metrics.set("mqtt_inflight_max", 5)
+        metrics.set("mqtt_inflight_max", 3)
+        snapshot = metrics.to_dict()
+        self.assertEqual(snapshot["counters"], {"cache_hits_total": 3})
+        self.assertEqual(snapshot["gauges"], {"mqtt_inflight_max": 3})
+
+    def test_to_prometheus(self):
+        metrics = Metrics(prefix="test")
+        metrics.observe("fetch", 0.5)
+        metrics.increment("payload_bytes_total", 100, help="Payload bytes")
+        text = metrics.to_prometheus()
+        self.assertIn('test_stage_duration_seconds{stage="fetch"} 0.5\n', text)
+        self.assertIn('test_stage_runs_total{stage="fetch"} 1\n', text)
+        self.assertIn("# HELP test_payload_bytes_total Payload bytes\n", text)
+        self.assertIn("# TYPE test_payload_bytes_total counter\ntest_payload_bytes_total 100\n", text)
+
+    def test_write_textfile(self):
+        metrics = Metrics()
+        metrics.increment("cycles_total")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "weather2mqtt.prom")
+            metrics.write_textfile(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), metrics.to_prometheus())
+            self.assertEqual(os.listdir(directory), ["weather2mqtt.prom"])
+
+    def test_http_server(self):
+        metrics = Metrics()
+        metrics.increment("cycles_total")
+        metrics.start_http_server(port=0, address="127.0.0.1")
+        try:
+            port = metrics._Metrics__server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                self.assertEqual(response.read().decode("utf-8"), metrics.to_prometheus())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/")
+        finally:
+            metrics.stop_http_server()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+***************************************************************************
+test_mqtt_publisher.py is a python unit test for the python module
+   mqtt_publisher
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestMqttPublisher"]
+
+import threading
+import unittest
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.reasoncodes import ReasonCode
+
+from src.app.bin.lib.mqtt_publisher import MqttPublisher, MqttPublishError
+
+
+class FakeClient:
+    """
+    Minimal stand-in for the paho client that acknowledges messages from a background thread
+    """
+
+    def __init__(self, acknowledge: bool = True):
+        self.acknowledge = acknowledge
+        self.published = list()
+        self.max_inflight = None
+        self.mid = 0
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_publish = None
+        self.subscribed = list()
+        self.callbacks = dict()
+
+    def message_callback_add(self, topic, callback):
+        self.callbacks[topic] = callback
+
+    def subscribe(self, topic, qos):
+        self.subscribed.append((topic, qos))
+
+    def max_inflight_messages_set(self, inflight):
+        self.max_inflight = inflight
+
+    def connect(self, host, port, keepalive):
+        pass
+
+    def loop_start(self):
+        self.on_connect(self, None, None, ReasonCode(mqtt.PacketTypes.CONNACK, identifier=0), None)
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def publish(self, topic, payload, qos, retain, properties=None):
+        self.mid += 1
+        self.published.append((topic, payload, qos, retain))
+        info = mqtt.MQTTMessageInfo(self.mid)
+        if self.acknowledge:
+            timer = threading.Timer(0.01, self.on_publish, args=(self, None, self.mid, None, None))
+            timer.start()
+        return info
+
+
+class TestMqttPublisher(unittest.TestCase):
+    def test_publish_and_flush(self):
+        client = FakeClient()
+        publisher = MqttPublisher(client=client, host="localhost", max_inflight=2, timeout=2)
+        publisher.connect()
+        self.assertTrue(publisher.connected)
+        self.assertEqual(client.max_inflight, 2)
+        for i in range(10):
+            publisher.publish(topic=f"test/{i}", payload="{}", qos=1)
+        publisher.flush()
+        self.assertEqual(len(client.published), 10)
+
+        statistics = publisher.statistics()
+        self.assertEqual(statistics["published"], 10)
+        self.assertEqual(statistics["failed"], 0)
+        self.assertEqual(statistics["inflight"], 0)
+        self.assertLessEqual(statistics["inflight_max"], 2)
+        self.assertGreater(statistics["latency_avg"], 0)
+        self.assertEqual(publisher.statistics()["published"], 0)
+        publisher.disconnect()
+
+    def test_flush_timeout(self):
+        publisher = MqttPublisher(client=FakeClient(acknowledge=False), host="localhost", max_inflight=1, timeout=0.1)
+        publisher.connect()
+        publisher.publish(topic="test", payload="{}", qos=2)
+        self.assertRaises(MqttPublishError, publisher.flush)
+        self.assertEqual(publisher.statistics()["failed"], 1)
+        # the in-flight slot is available again after the message was given up
+        publisher.publish(topic="test", payload="{}", qos=2)
+        self.assertEqual(publisher.inflight, 1)
+
+    def test_window_full(self):
+        publisher = MqttPublisher(client=FakeClient(acknowledge=False), host="localhost", max_inflight=1, timeout=0.1)
+        publisher.connect()
+        publisher.publish(topic="test", payload="{}", qos=1)
+        self.assertRaises(MqttPublishError, publisher.publish, topic="test", payload="{}", qos=1)
+
+    def test_subscribe(self):
+        client = FakeClient()
+        publisher = MqttPublisher(client=client, host="localhost")
+        publisher.subscribe("$share/weather/weather/request", print, qos=1)
+        # the subscription is sent on connect and the callback is registered without the share prefix
+        self.assertEqual(client.subscribed, [])
+        self.assertIn("weather/request", client.callbacks)
+        publisher.connect()
+        self.assertEqual(client.subscribed, [("$share/weather/weather/request", 1)])
+        publisher.subscribe("other", print)
+        self.assertEqual(client.subscribed[-1], ("other", 0))
+
+    def test_invalid_window(self):
+        self.assertRaises(ValueError, MqttPublisher, client=FakeClient(), host="localhost", max_inflight=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
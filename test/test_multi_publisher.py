@@ -0,0 +1,153 @@
+"""
+***************************************************************************
+test_multi_publisher.py is a python unit test for the python module
+   multi_publisher
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestMultiPublisher"]
+
+import threading
+import unittest
+
+from src.app.bin.lib.multi_publisher import (
+    MultiPublisher,
+    MultiPublishError,
+    PublishTarget,
+)
+
+
+class FakePublisher:
+    """
+    Stand-in for the MqttPublisher that records the published messages
+    """
+
+    def __init__(self, release: threading.Event = None, error: Exception = None):
+        self.release = release
+        self.error = error
+        self.connected = True
+        self.published = list()
+        self.drained = 0
+        self.disconnected = False
+
+    def publish(self, topic, payload, qos=0, retain=False, properties=None):
+        if self.release is not None:
+            # a slow broker, the message is completed when the test releases it
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        self.published.append((topic, payload, qos, retain))
+
+    def flush(self, timeout=None):
+        pass
+
+    def statistics(self, reset=True):
+        return {
+            "published": len(self.published),
+            "failed": 0,
+            "inflight": 0,
+            "inflight_max": 1,
+            "latency_min": 0.01 if self.published else None,
+            "latency_avg": 0.01 * len(self.published) if self.published else None,
+            "latency_max": 0.05 if self.published else None,
+        }
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class SpoolingFakePublisher(FakePublisher):
+    def drain(self):
+        self.drained += 2
+        return 2
+
+
+class TestMultiPublisher(unittest.TestCase):
+    def test_invalid_targets(self):
+        self.assertRaises(ValueError, MultiPublisher, targets=[])
+        targets = [PublishTarget("edge", FakePublisher()), PublishTarget("edge", FakePublisher())]
+        self.assertRaises(ValueError, MultiPublisher, targets=targets)
+
+    def test_publish(self):
+        edge, central = FakePublisher(), FakePublisher()
+        publisher = MultiPublisher(
+            [PublishTarget("edge", edge, qos=0, retain=False), PublishTarget("central", central, qos=2, retain=True)]
+        )
+        publisher.publish("weather", b"{}")
+        publisher.publish("weather/0", b"[]", retain=True)
+        publisher.flush()
+        self.assertEqual(edge.published, [("weather", b"{}", 0, False), ("weather/0", b"[]", 0, True)])
+        self.assertEqual(central.published, [("weather", b"{}", 2, True), ("weather/0", b"[]", 2, True)])
+        # the same bytes are published to every target
+        self.assertIs(edge.published[0][1], central.published[0][1])
+        self.assertIs(publisher.primary, edge)
+
+        statistics = publisher.statistics()
+        self.assertEqual((statistics["published"], statistics["failed"], statistics["inflight_max"]), (4, 0, 1))
+        self.assertAlmostEqual(statistics["latency_avg"], 0.02)
+        self.assertEqual(statistics["latency_max"], 0.05)
+        self.assertEqual(statistics["targets"]["central"]["published"], 2)
+
+        publisher.disconnect()
+        self.assertTrue(edge.disconnected and central.disconnected)
+
+    def test_slow_target(self):
+        release = threading.Event()
+        fast, slow = FakePublisher(), FakePublisher(release=release)
+        publisher = MultiPublisher([PublishTarget("fast", fast), PublishTarget("slow", slow, timeout=0.05)])
+        # the message is queued, publish does not wait for the slow broker
+        publisher.publish("weather", b"{}")
+        with self.assertRaisesRegex(MultiPublishError, "slow: timed out"):
+            publisher.flush()
+        # the fast target is not delayed by the slow one
+        self.assertEqual(len(fast.published), 1)
+        self.assertEqual(len(slow.published), 0)
+        release.set()
+        publisher.disconnect()
+        self.assertEqual(len(slow.published), 1)
+
+    def test_failed_target(self):
+        healthy, broken = FakePublisher(), FakePublisher(error=ConnectionError("broker down"))
+        publisher = MultiPublisher([PublishTarget("broken", broken), PublishTarget("healthy", healthy)])
+        publisher.publish("weather", b"{}")
+        with self.assertRaisesRegex(MultiPublishError, "broken: broker down"):
+            publisher.flush()
+        self.assertEqual(len(healthy.published), 1)
+        # the errors are raised once
+        publisher.flush()
+
+    def test_dropped(self):
+        event = threading.Event()
+        blocked = FakePublisher()
+        blocked.publish = lambda *args, **kwargs: event.wait()
+        publisher = MultiPublisher([PublishTarget("blocked", blocked)], max_pending=2)
+        for i in range(3):
+            publisher.publish(f"weather/{i}", b"{}")
+        self.assertEqual(publisher.statistics(reset=False)["failed"], 1)
+        event.set()
+        with self.assertRaisesRegex(MultiPublishError, "blocked: 1 messages dropped"):
+            publisher.flush()
+        # the dropped messages are raised once, the statistics count them until they are reset
+        publisher.flush()
+        self.assertEqual(publisher.statistics()["failed"], 1)
+        self.assertEqual(publisher.statistics()["failed"], 0)
+
+    def test_drain(self):
+        spooling, plain = SpoolingFakePublisher(), FakePublisher()
+        publisher = MultiPublisher([PublishTarget("spooling", spooling), PublishTarget("plain", plain)])
+        self.assertEqual(publisher.drain(), 2)
+        self.assertEqual(spooling.drained, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+***************************************************************************
+test_quota.py is a python unit test for the python module
+   quota
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestApiQuota"]
+
+import os
+import tempfile
+import unittest
+
+from src.app.bin.lib.quota import ApiQuota, QuotaExceededError
+
+
+class Clock:
+    def __init__(self, now: float = 1767657600.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestApiQuota(unittest.TestCase):
+    def test_weight(self):
+        self.assertEqual(ApiQuota.weight({"current": ["temperature_2m"], "latitude": 1.0}), 1)
+        self.assertEqual(ApiQuota.weight({"daily": ["a"] * 15, "forecast_days": 7}), 1.5)
+        self.assertEqual(ApiQuota.weight({"hourly": "a,b", "forecast_days": 16, "past_days": 12}), 2)
+        self.assertEqual(ApiQuota.weight({"hourly": ["a"], "latitude": "1.0,2.0,3.0", "models": ["x", "y"]}), 6)
+        window = {"daily": ["a"] * 20, "start_date": "2026-10-19", "end_date": "2026-11-15"}
+        self.assertEqual(ApiQuota.weight(window), 4)
+
+    def test_from_string(self):
+        quota = ApiQuota.from_string("minute=10, day=100")
+        self.assertEqual(quota.limits, {"minute": 10, "hour": 5000, "day": 100})
+        self.assertRaises(ValueError, ApiQuota.from_string, "week=10")
+        self.assertRaises(ValueError, ApiQuota.from_string, "10")
+
+    def test_acquire_waits_for_tokens(self):
+        clock = Clock()
+        quota = ApiQuota(limits={"minute": 6}, clock=clock, sleep=clock.sleep)
+        for _ in range(6):
+            self.assertEqual(quota.acquire(1), 0)
+        # one token is refilled every 10 seconds
+        self.assertAlmostEqual(quota.wait_time(2), 20)
+        self.assertAlmostEqual(quota.acquire(2), 20)
+        self.assertEqual(quota.statistics()["calls_total"], 7)
+        self.assertEqual(quota.statistics()["weight_total"], 8)
+
+    def test_acquire_max_wait(self):
+        clock = Clock()
+        quota = ApiQuota(limits={"minute": 6, "day": 6}, max_wait=60, clock=clock, sleep=clock.sleep)
+        quota.acquire(6)
+        # the day bucket refills 6 calls per day
+        self.assertRaises(QuotaExceededError, quota.acquire, 1)
+        self.assertRaises(QuotaExceededError, quota.acquire, 7)
+
+    def test_block(self):
+        clock = Clock()
+        quota = ApiQuota(clock=clock, sleep=clock.sleep)
+        with self.assertLogs("src.app.bin.lib.quota", level="WARNING"):
+            quota.block(30)
+        self.assertGreaterEqual(quota.wait_time(1), 30)
+
+    def test_statistics_windows(self):
+        clock = Clock()
+        quota = ApiQuota(clock=clock, sleep=clock.sleep)
+        quota.acquire(2.5)
+        statistics = quota.statistics()
+        self.assertEqual(statistics["minute"]["weight"], 2.5)
+        self.assertEqual(statistics["minute"]["available"], 597.5)
+        clock.now += 60
+        statistics = quota.statistics()
+        self.assertEqual(statistics["minute"]["calls"], 0)
+        self.assertEqual(statistics["day"]["calls"], 1)
+
+    def test_state_file(self):
+        clock = Clock()
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "quota.json")
+            quota = ApiQuota(limits={"minute": 6}, state_file=state_file, clock=clock, sleep=clock.sleep)
+            quota.acquire(6)
+            quota.save()
+            restored = ApiQuota(limits={"minute": 6}, state_file=state_file, clock=clock, sleep=clock.sleep)
+            self.assertAlmostEqual(restored.wait_time(1), 10)
+            self.assertEqual(restored.statistics()["calls_total"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
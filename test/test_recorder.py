@@ -0,0 +1,85 @@
+"""
+***************************************************************************
+test_recorder.py is a python unit test for the python module
+   recorder
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestRecorder"]
+
+import os
+import tempfile
+import unittest
+
+from src.app.bin.lib.recorder import ResponseRecorder, ResponseReplayer
+
+
+class Clock:
+    def __init__(self, now: float = 1767657600.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "responses.rec")
+        self.clock = Clock()
+        recorder = ResponseRecorder(self.path, clock=self.clock)
+        recorder.start_cycle()
+        recorder.record({"latitude": "1.0,2.0", "current": ["temperature_2m"]}, b"\x01\x02")
+        recorder.record({"latitude": 3.0}, b"\x03", timestamp=1767657000.0)
+        self.clock.now += 600
+        recorder.start_cycle()
+        recorder.record({"latitude": 1.0}, b"\x04\x05\x06")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_recordings(self):
+        recordings = list(ResponseReplayer(self.path).recordings())
+        self.assertEqual([r.body for r in recordings], [b"\x01\x02", b"\x03", b"\x04\x05\x06"])
+        self.assertEqual(recordings[0].params, {"latitude": "1.0,2.0", "current": ["temperature_2m"]})
+        self.assertEqual(recordings[1].timestamp, 1767657000.0)
+        self.assertEqual(recordings[2].timestamp, 1767658200.0)
+
+    def test_append(self):
+        ResponseRecorder(self.path, clock=self.clock).record({"latitude": 1.0}, b"\x07")
+        self.assertEqual(len(list(ResponseReplayer(self.path).recordings())), 4)
+
+    def test_cycles_with_original_timing(self):
+        waits = list()
+        replayer = ResponseReplayer(self.path, speed=2, sleep=waits.append)
+        self.assertEqual([len(cycle) for cycle in replayer.cycles()], [2, 1])
+        self.assertEqual(waits, [300.0])
+        waits.clear()
+        list(ResponseReplayer(self.path, sleep=waits.append).cycles())
+        self.assertEqual(waits, [])
+
+    def test_incomplete_record(self):
+        with open(self.path, "ab") as f:
+            f.write(b"\x10\x00")
+        with self.assertLogs("src.app.bin.lib.recorder", level="WARNING"):
+            self.assertEqual(len(list(ResponseReplayer(self.path).recordings())), 3)
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"something else")
+        self.assertRaises(ValueError, ResponseReplayer, self.path)
+        self.assertRaises(ValueError, ResponseReplayer, self.path + ".missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+***************************************************************************
+test_request_planner.py is a python unit test for the python module
+   request_planner
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestRequestPlanner"]
+
+import math
+import unittest
+from test.openmeteo_fixtures import (
+    build_block,
+    build_response,
+    build_variable,
+    parse_responses,
+)
+
+import numpy as np
+
+from src.app.bin.lib.request_planner import (
+    RequestPlanner,
+    apparent_temperature,
+    daily_aggregate,
+    dew_point,
+)
+from src.app.bin.lib.weather_parser import WeatherBlock
+
+# 2026-01-06T00:00:00+01:00
+START = 1767654000
+DAY = 86400
+HOUR = 3600
+
+
+class TestRequestPlanner(unittest.TestCase):
+    def test_deduplicate(self):
+        plan = RequestPlanner(derive=True).plan({"current": ["temperature_2m", "surface_pressure", "surface_pressure"]})
+        self.assertEqual(plan.params["current"], ["temperature_2m", "surface_pressure"])
+        plan = RequestPlanner(derive=False).plan({"hourly": "temperature_2m,rain,rain", "forecast_hours": 12})
+        self.assertEqual(plan.params, {"hourly": ["temperature_2m", "rain"], "forecast_hours": 12})
+
+    def test_derive(self):
+        fields = ["temperature_2m", "dew_point_2m", "relative_humidity_2m", "apparent_temperature", "wind_speed_10m"]
+        plan = RequestPlanner(derive=True).plan({"current": fields})
+        self.assertEqual(plan.params["current"], ["temperature_2m", "relative_humidity_2m", "wind_speed_10m"])
+        self.assertEqual(plan.derived, {"current": ["dew_point_2m", "apparent_temperature"]})
+
+        # the inputs are not requested anyway or the formulas need other units
+        self.assertEqual(RequestPlanner(derive=True).plan({"current": ["dew_point_2m", "temperature_2m"]}).derived, {})
+        plan = RequestPlanner(derive=True).plan({"current": fields, "temperature_unit": "fahrenheit"})
+        self.assertEqual(plan.params["current"], fields)
+        self.assertEqual(RequestPlanner(derive=False).plan({"current": fields}).params["current"], fields)
+
+    def test_aggregate(self):
+        daily = ["temperature_2m_max", "temperature_2m_min", "rain_sum", "wind_speed_10m_max"]
+        plan = RequestPlanner(derive=True).plan({"daily": daily})
+        self.assertEqual(plan.params["daily"], ["rain_sum", "wind_speed_10m_max"])
+        self.assertEqual(plan.params["hourly"], ["temperature_2m"])
+        self.assertEqual(list(plan.aggregated.keys()), ["temperature_2m_max", "temperature_2m_min"])
+
+        # a single daily variable is aggregated, if the hourly variable is requested anyway
+        plan = RequestPlanner(derive=True).plan({"daily": daily, "hourly": ["wind_speed_10m"]})
+        self.assertEqual(plan.params["daily"], ["rain_sum"])
+        self.assertEqual(plan.params["hourly"], ["wind_speed_10m", "temperature_2m"])
+
+        # the hourly time axis does not cover the days or the daily block would have no variable left
+        self.assertEqual(RequestPlanner(derive=True).plan({"daily": daily, "forecast_hours": 24}).aggregated, {})
+        self.assertEqual(RequestPlanner(derive=True).plan({"daily": daily[0:2]}).aggregated, {})
+
+    def test_dew_point(self):
+        result = dew_point(np.array([20.0, 0.0, 10.0]), np.array([50.0, 100.0, 0.0]))
+        self.assertAlmostEqual(result[0], 9.26, places=2)
+        self.assertAlmostEqual(result[1], 0.0, places=6)
+        self.assertTrue(math.isnan(result[2]))
+
+    def test_apparent_temperature(self):
+        result = apparent_temperature(np.array([25.0]), np.array([60.0]), np.array([18.0]))
+        self.assertAlmostEqual(result[0], 23.75, places=2)
+
+    def test_daily_aggregate(self):
+        hourly_time = np.arange(START, START + 2 * DAY, HOUR)
+        values = np.arange(48, dtype=np.float64)
+        values[30] = np.nan
+        daily_time = np.array([START, START + DAY, START + 2 * DAY])
+        self.assertEqual(daily_aggregate(hourly_time, values, daily_time, 3600, "min")[0:2].tolist(), [0.0, 24.0])
+        self.assertEqual(daily_aggregate(hourly_time, values, daily_time, 3600, "max")[0:2].tolist(), [23.0, 47.0])
+        result = daily_aggregate(hourly_time, values, daily_time, 3600, "mean")
+        self.assertEqual(result[0], 11.5)
+        self.assertAlmostEqual(result[1], (sum(range(24, 48)) - 30) / 23)
+        # the last day has no hourly values
+        self.assertTrue(math.isnan(result[2]))
+
+        values[40] = np.nan
+        self.assertTrue(math.isnan(daily_aggregate(hourly_time, values, daily_time, 3600, "max")[1]))
+
+    def test_apply(self):
+        params = {
+            "current": ["temperature_2m", "dew_point_2m", "relative_humidity_2m"],
+            "daily": ["temperature_2m_min", "temperature_2m_max", "weather_code"],
+        }
+        plan = RequestPlanner(derive=True).plan(params)
+        self.assertEqual(plan.params["current"], ["temperature_2m", "relative_humidity_2m"])
+        self.assertEqual(plan.params["daily"], ["weather_code"])
+        self.assertEqual(plan.params["hourly"], ["temperature_2m"])
+
+        response = parse_responses(
+            build_response(
+                utc_offset_seconds=3600,
+                current=build_block(
+                    time=START,
+                    time_end=START + 900,
+                    interval=900,
+                    variables=[
+                        build_variable("temperature", value=20.0, altitude=2),
+                        build_variable("relative_humidity", value=50.0, altitude=2),
+                    ],
+                ),
+                daily=build_block(
+                    time=START,
+                    time_end=START + DAY,
+                    interval=DAY,
+                    variables=[build_variable("weather_code", values=[3.0])],
+                ),
+                hourly=build_block(
+                    time=START,
+                    time_end=START + DAY,
+                    interval=HOUR,
+                    variables=[build_variable("temperature", values=list(range(24)), altitude=2)],
+                ),
+            )
+        )[0]
+        result = {
+            "current": {
+                "time": "2026-01-06T00:00:00+01:00",
+                "temperature_2m": 20.0,
+                "relative_humidity_2m": 50.0,
+                "weather_code_text": "x",
+            },
+            "daily": WeatherBlock(data=response.Daily(), fields=plan.params["daily"], utc_offset_seconds=3600),
+            "hourly": WeatherBlock(data=response.Hourly(), fields=plan.params["hourly"], utc_offset_seconds=3600),
+        }
+        result = plan.apply(result)
+
+        self.assertEqual(
+            list(result["current"].keys()),
+            ["time", "temperature_2m", "dew_point_2m", "relative_humidity_2m", "weather_code_text"],
+        )
+        self.assertEqual(result["current"]["dew_point_2m"], 9.3)
+        self.assertEqual(list(result["daily"].columns.keys()), params["daily"])
+        self.assertEqual(result["daily"].columns["temperature_2m_min"].tolist(), [0.0])
+        self.assertEqual(result["daily"].columns["temperature_2m_max"].tolist(), [23.0])
+        # the hourly block was only requested for the daily values
+        self.assertNotIn("hourly", result.keys())
+
+    def test_apply_fallback(self):
+        self.assertEqual(
+            RequestPlanner().plan({"daily": ["temperature_2m_max", "temperature_2m_min", "rain_sum"]}).aggregated, {}
+        )
+        plan = RequestPlanner(derive=True).plan({"daily": ["temperature_2m_max", "temperature_2m_min", "rain_sum"]})
+
+        def parse():
+            response = parse_responses(
+                build_response(
+                    utc_offset_seconds=3600,
+                    daily=build_block(
+                        time=START,
+                        time_end=START + 2 * DAY,
+                        interval=DAY,
+                        variables=[build_variable("rain", values=[0.0, 1.0], aggregation=10)],
+                    ),
+                    # the hourly values do not cover the second day
+                    hourly=build_block(
+                        time=START,
+                        time_end=START + DAY + 12 * HOUR,
+                        interval=HOUR,
+                        variables=[build_variable("temperature", values=list(range(36)), altitude=2)],
+                    ),
+                )
+            )[0]
+            return {
+                "daily": WeatherBlock(data=response.Daily(), fields=plan.params["daily"], utc_offset_seconds=3600),
+                "hourly": WeatherBlock(data=response.Hourly(), fields=plan.params["hourly"], utc_offset_seconds=3600),
+            }
+
+        requested = list()
+
+        def fallback(fields):
+            requested.append(fields)
+            return {"temperature_2m_max": [22.5, 41.5], "temperature_2m_min": [0.5, 20.5]}
+
+        result = plan.apply(parse(), fallback=fallback)
+        self.assertEqual(requested, [["temperature_2m_max", "temperature_2m_min"]])
+        # the aggregated values are kept for the covered days
+        self.assertEqual(result["daily"].columns["temperature_2m_max"].tolist(), [23.0, 41.5])
+        self.assertEqual(result["daily"].columns["temperature_2m_min"].tolist(), [0.0, 20.5])
+
+        result = plan.apply(parse())
+        self.assertTrue(math.isnan(result["daily"].columns["temperature_2m_max"][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
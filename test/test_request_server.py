@@ -0,0 +1,127 @@
+"""
+***************************************************************************
+test_request_server.py is a python unit test for the python module
+   request_server
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestRequestCoalescer", "TestRequestServer"]
+
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from src.app.bin.lib.request_server import RequestCoalescer, RequestServer
+
+
+class FakePublisher:
+    """
+    Minimal stand-in for the MqttPublisher that records the subscriptions and messages
+    """
+
+    def __init__(self):
+        self.subscriptions = dict()
+        self.published = list()
+        self.lock = threading.Lock()
+
+    def subscribe(self, topic, callback, qos=0):
+        self.subscriptions[topic] = callback
+
+    def publish(self, topic, payload, qos=0, retain=False, properties=None):
+        with self.lock:
+            self.published.append((topic, payload, properties))
+
+
+def build_message(payload: dict, response_topic: str = "client/response", correlation_data: bytes = b"1") -> any:
+    properties = SimpleNamespace(ResponseTopic=response_topic, CorrelationData=correlation_data)
+    return SimpleNamespace(topic="weather/request", payload=json.dumps(payload).encode("utf-8"), properties=properties)
+
+
+class TestRequestCoalescer(unittest.TestCase):
+    def test_run(self):
+        coalescer = RequestCoalescer()
+        self.assertEqual(coalescer.run("a", lambda: 1), (1, False))
+        # a finished call is not shared
+        self.assertEqual(coalescer.run("a", lambda: 2), (2, False))
+        self.assertRaises(ZeroDivisionError, coalescer.run, "a", lambda: 1 / 0)
+        self.assertEqual(coalescer.run("a", lambda: 3), (3, False))
+
+
+class TestRequestServer(unittest.TestCase):
+    def test_handle(self):
+        publisher = FakePublisher()
+        server = RequestServer(publisher=publisher, topic="weather/request", handler=lambda request: {"echo": request})
+        server.start()
+        self.assertIn("weather/request", publisher.subscriptions)
+        server.handle(build_message({"latitude": 1.0}, correlation_data=b"abc"))
+        topic, payload, properties = publisher.published[0]
+        self.assertEqual(topic, "client/response")
+        self.assertEqual(json.loads(payload), {"echo": {"latitude": 1.0}})
+        self.assertEqual(properties.CorrelationData, b"abc")
+        server.stop()
+
+    def test_errors(self):
+        publisher = FakePublisher()
+
+        def handler(request):
+            raise ValueError("Invalid request")
+
+        server = RequestServer(publisher=publisher, topic="weather/request", handler=handler)
+        server.handle(build_message({"latitude": 1.0}))
+        server.handle(build_message([1, 2]))
+        server.handle(build_message({"latitude": 1.0}, response_topic=None))
+        self.assertEqual(len(publisher.published), 2)
+        self.assertEqual(json.loads(publisher.published[0][1]), {"error": "Invalid request"})
+        self.assertEqual(json.loads(publisher.published[1][1]), {"error": "The request must be a JSON object."})
+        statistics = server.statistics()
+        self.assertEqual(statistics["requests"], 2)
+        self.assertEqual(statistics["errors"], 2)
+        self.assertEqual(statistics["ignored"], 1)
+        self.assertEqual(server.statistics()["requests"], 0)
+        server.stop()
+
+    def test_coalesce(self):
+        publisher = FakePublisher()
+        started = threading.Event()
+        calls = list()
+
+        def handler(request):
+            calls.append(request)
+            started.set()
+            # keep the request running while the identical request arrives
+            time.sleep(0.2)
+            return {"value": 1}
+
+        server = RequestServer(publisher=publisher, topic="weather/request", handler=handler, workers=4)
+        first = threading.Thread(target=server.handle, args=(build_message({"a": 1, "b": 2}, correlation_data=b"1"),))
+        first.start()
+        started.wait(timeout=2)
+        # the same request with a different key order waits for the running request
+        server.handle(build_message({"b": 2, "a": 1}, correlation_data=b"2"))
+        first.join(timeout=2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(publisher.published), 2)
+        self.assertEqual({properties.CorrelationData for _, _, properties in publisher.published}, {b"1", b"2"})
+        self.assertEqual(publisher.published[0][1], publisher.published[1][1])
+        self.assertEqual(server.statistics()["coalesced"], 1)
+        server.stop()
+
+    def test_invalid_workers(self):
+        self.assertRaises(ValueError, RequestServer, publisher=FakePublisher(), topic="t", handler=dict, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+***************************************************************************
+test_scheduler.py is a python unit test for the python module
+   scheduler
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestScheduler"]
+
+import datetime
+import threading
+import unittest
+import zoneinfo
+
+from src.app.bin.lib.scheduler import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    def test_interval(self):
+        start = datetime.datetime(2026, 1, 1, 12, 0, 0)
+        self.assertEqual(Scheduler("600").next_run(start), datetime.datetime(2026, 1, 1, 12, 10, 0))
+        self.assertEqual(Scheduler("30s").next_run(start), datetime.datetime(2026, 1, 1, 12, 0, 30))
+        self.assertEqual(Scheduler("15m").next_run(start), datetime.datetime(2026, 1, 1, 12, 15, 0))
+        self.assertEqual(Scheduler("2h").next_run(start), datetime.datetime(2026, 1, 1, 14, 0, 0))
+
+    def test_cron(self):
+        start = datetime.datetime(2026, 1, 1, 12, 7, 30)
+        self.assertEqual(Scheduler("*/15 * * * *").next_run(start), datetime.datetime(2026, 1, 1, 12, 15))
+        self.assertEqual(Scheduler("0 6 * * *").next_run(start), datetime.datetime(2026, 1, 2, 6, 0))
+        self.assertEqual(Scheduler("30 10 1 * *").next_run(start), datetime.datetime(2026, 2, 1, 10, 30))
+        # 2026-01-01 is a thursday, next monday is 2026-01-05
+        self.assertEqual(Scheduler("0 0 * * 1").next_run(start), datetime.datetime(2026, 1, 5, 0, 0))
+        self.assertEqual(Scheduler("0 0 * * 7").next_run(start), datetime.datetime(2026, 1, 4, 0, 0))
+        self.assertEqual(Scheduler("0 8-10/2 * 3 *").next_run(start), datetime.datetime(2026, 3, 1, 8, 0))
+
+    def test_daylight_saving_time(self):
+        berlin = zoneinfo.ZoneInfo("Europe/Berlin")
+        scheduler = Scheduler("0 6 * * *", timezone=berlin)
+        # the last sunday of march 2026 switches from CET (+01:00) to CEST (+02:00)
+        next_run = scheduler.next_run(datetime.datetime(2026, 3, 28, 7, 0, tzinfo=berlin))
+        self.assertEqual(next_run.isoformat(), "2026-03-29T06:00:00+02:00")
+        next_run = scheduler.next_run(datetime.datetime(2026, 3, 28, 7, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(next_run.isoformat(), "2026-03-29T06:00:00+02:00")
+        # the interval is counted in absolute time
+        next_run = Scheduler("1h", timezone=berlin).next_run(datetime.datetime(2026, 3, 29, 1, 30, tzinfo=berlin))
+        self.assertEqual(next_run.isoformat(), "2026-03-29T03:30:00+02:00")
+
+    def test_invalid_expression(self):
+        self.assertRaises(ValueError, Scheduler, "0")
+        self.assertRaises(ValueError, Scheduler, "foo")
+        self.assertRaises(ValueError, Scheduler, "* * * *")
+        self.assertRaises(ValueError, Scheduler, "60 * * * *")
+        self.assertRaises(ValueError, Scheduler, "*/0 * * * *")
+
+    def test_jitter(self):
+        self.assertEqual(Scheduler("600").jitter_delay(), 0.0)
+        scheduler = Scheduler("600", jitter=30)
+        for _ in range(20):
+            self.assertTrue(0 <= scheduler.jitter_delay() <= 30)
+        self.assertRaises(ValueError, Scheduler, "600", jitter=-1)
+
+    def test_run_until_stopped(self):
+        stop_event = threading.Event()
+        calls = []
+
+        def job():
+            calls.append(1)
+            stop_event.set()
+
+        Scheduler("1h").run(job=job, stop_event=stop_event)
+        self.assertEqual(len(calls), 1)
+
+    def test_run_all(self):
+        stop_event = threading.Event()
+        calls = []
+
+        def job(name):
+            calls.append(name)
+            if len(calls) == 2:
+                stop_event.set()
+
+        jobs = [(Scheduler("1h"), lambda: job("current")), (Scheduler("0 18 * * *"), lambda: job("tomorrow"))]
+        Scheduler.run_all(jobs=jobs, stop_event=stop_event)
+        self.assertEqual(calls, ["current", "tomorrow"])
+
+    def test_run_survives_failing_job(self):
+        stop_event = threading.Event()
+
+        def job():
+            stop_event.set()
+            raise Exception("job failed")
+
+        Scheduler("1h").run(job=job, stop_event=stop_event)
+        self.assertTrue(stop_event.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+***************************************************************************
+test_serializer.py is a python unit test for the python module
+   serializer
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestPayloadSerializer"]
+
+import json
+import unittest
+from unittest import mock
+
+from src.app.bin.lib.serializer import PayloadSerializer, cbor2, msgpack
+
+PAYLOAD = {
+    "current": {"temperature_2m": 4.320000171661377, "pressure_msl": 1013.25, "weather_code_text": "Nebel"},
+    "daily": {"temperature_2m_max": {"2026-01-06": 5.449999809265137, "2026-01-07": float("nan")}},
+    "hourly": {"temperature_2m": [1.2345, 2.3456]},
+}
+
+
+class TestPayloadSerializer(unittest.TestCase):
+    def test_from_string(self):
+        serializer = PayloadSerializer.from_string("2, temperature_2m=1,pressure_msl=0")
+        self.assertEqual(serializer.default_precision, 2)
+        self.assertEqual(serializer.precision, {"temperature_2m": 1, "pressure_msl": 0})
+        self.assertIsNone(PayloadSerializer.from_string("").default_precision)
+        self.assertRaises(ValueError, PayloadSerializer.from_string, "temperature_2m=one")
+
+    def test_normalize(self):
+        serializer = PayloadSerializer(precision={"temperature_2m": 1, "pressure_msl": 0}, default_precision=2)
+        self.assertEqual(
+            serializer.normalize(PAYLOAD),
+            {
+                "current": {"temperature_2m": 4.3, "pressure_msl": 1013, "weather_code_text": "Nebel"},
+                "daily": {"temperature_2m_max": {"2026-01-06": 5.45, "2026-01-07": None}},
+                "hourly": {"temperature_2m": [1.2, 2.3]},
+            },
+        )
+
+    def test_encode_json(self):
+        message = PayloadSerializer(default_precision=1).encode(PAYLOAD)
+        self.assertIsInstance(message, bytes)
+        self.assertEqual(json.loads(message)["current"]["temperature_2m"], 4.3)
+        self.assertEqual(json.loads(message)["daily"]["temperature_2m_max"]["2026-01-07"], None)
+
+    def test_encode_json_without_orjson(self):
+        payload = {
+            "current": {"temperature_2m": float("nan"), "wind_gusts_10m": float("inf")},
+            "hourly": PAYLOAD["hourly"],
+        }
+        with mock.patch("src.app.bin.lib.serializer.orjson", None):
+            message = PayloadSerializer().encode(payload)
+            self.assertEqual(json.loads(message)["hourly"], PAYLOAD["hourly"])
+            self.assertEqual(json.loads(message)["current"], {"temperature_2m": None, "wind_gusts_10m": None})
+            self.assertEqual(PayloadSerializer().encode(PAYLOAD["hourly"]), b'{"temperature_2m":[1.2345,2.3456]}')
+
+    @unittest.skipIf(cbor2 is None, "cbor2 is not installed")
+    def test_encode_cbor(self):
+        message = PayloadSerializer(format="cbor", default_precision=1).encode(PAYLOAD)
+        self.assertEqual(cbor2.loads(message)["hourly"]["temperature_2m"], [1.2, 2.3])
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_encode_msgpack(self):
+        message = PayloadSerializer(format="msgpack", default_precision=1).encode(PAYLOAD)
+        self.assertEqual(msgpack.unpackb(message)["current"]["weather_code_text"], "Nebel")
+
+    def test_invalid_format(self):
+        self.assertRaises(ValueError, PayloadSerializer, format="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
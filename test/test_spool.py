@@ -0,0 +1,199 @@
+"""
+***************************************************************************
+test_spool.py is a python unit test for the python module
+   spool
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestMessageSpool", "TestSpoolingPublisher"]
+
+import os
+import tempfile
+import unittest
+
+from src.app.bin.lib.spool import MessageSpool, SpooledMessage, SpoolingPublisher
+
+
+class FakeInfo:
+    def __init__(self, published: bool):
+        self.published = published
+
+    def is_published(self) -> bool:
+        return self.published
+
+
+class FakePublisher:
+    """
+    Stand-in for the MqttPublisher that records the published messages
+    """
+
+    def __init__(self, connected: bool = True, complete: bool = True):
+        self.connected = connected
+        self.complete = complete
+        self.published = list()
+        self.disconnected = False
+
+    def publish(self, topic, payload, qos=0, retain=False, properties=None):
+        if not self.connected:
+            raise ConnectionError("not connected")
+        self.published.append((topic, payload, qos, retain))
+        return FakeInfo(self.complete)
+
+    def flush(self, timeout=None):
+        if not self.complete:
+            raise TimeoutError("not completed")
+
+    def statistics(self, reset=True):
+        return {"published": len(self.published)}
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class TestMessageSpool(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_drain(self):
+        # the clock stands still, so every batch waits its full share of the rate
+        spool = MessageSpool(self.directory.name, clock=lambda: 1767657600.0)
+        for i in range(5):
+            spool.append(SpooledMessage(f"weather/{i}", f"payload {i}", qos=1, retain=True, timestamp=i))
+        self.assertEqual(spool.depth, 5)
+
+        messages = spool.peek(2)
+        self.assertEqual([message.topic for message in messages], ["weather/0", "weather/1"])
+        self.assertEqual(messages[1].payload, b"payload 1")
+        self.assertEqual((messages[1].qos, messages[1].retain, messages[1].timestamp), (1, True, 1))
+
+        published = list()
+        waits = list()
+        drained = spool.drain(publish=published.append, batch_size=2, rate=1000, sleep=waits.append)
+        self.assertEqual(drained, 5)
+        self.assertEqual([message.topic for message in published], [f"weather/{i}" for i in range(5)])
+        self.assertEqual(waits, [0.002, 0.002, 0.001])
+        self.assertEqual(spool.depth, 0)
+        statistics = spool.statistics()
+        self.assertEqual((statistics["spooled"], statistics["drained"], statistics["bytes"]), (5, 5, 0))
+
+    def test_failed_drain(self):
+        spool = MessageSpool(self.directory.name)
+        for i in range(3):
+            spool.append(SpooledMessage(f"weather/{i}", b"x"))
+
+        def fail(message):
+            raise ConnectionError("broker down")
+
+        self.assertEqual(spool.drain(publish=fail, batch_size=2), 0)
+        self.assertEqual(spool.depth, 3)
+
+    def test_persistence(self):
+        spool = MessageSpool(self.directory.name)
+        for i in range(3):
+            spool.append(SpooledMessage(f"weather/{i}", b"x"))
+        spool.commit(spool.peek(1))
+
+        # an interrupted append leaves an incomplete record
+        segment = [name for name in os.listdir(self.directory.name) if name.endswith(".spool")][0]
+        with open(os.path.join(self.directory.name, segment), "ab") as f:
+            f.write(b"\x00\x01")
+
+        spool = MessageSpool(self.directory.name)
+        self.assertEqual(spool.depth, 2)
+        self.assertEqual([message.topic for message in spool.peek(10)], ["weather/1", "weather/2"])
+        spool.append(SpooledMessage("weather/3", b"x"))
+        self.assertEqual([message.topic for message in spool.peek(10)], ["weather/1", "weather/2", "weather/3"])
+
+    def test_eviction(self):
+        # every record is 16 bytes header, 9 bytes topic and 100 bytes payload
+        spool = MessageSpool(self.directory.name, max_bytes=1000, segment_bytes=250)
+        for i in range(10):
+            spool.append(SpooledMessage(f"weather/{i}", b"x" * 100))
+        self.assertLessEqual(spool.statistics(reset=False)["bytes"], 1000)
+        # the segment with the two oldest messages is evicted
+        self.assertEqual(spool.depth, 8)
+        self.assertEqual(spool.statistics()["evicted"], 2)
+        self.assertEqual(spool.peek(1)[0].topic, "weather/2")
+
+        spool.append(SpooledMessage("large", b"x" * 2000))
+        self.assertEqual(spool.depth, 8)
+
+
+class TestSpoolingPublisher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spool = MessageSpool(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_connect_failed(self):
+        def connect():
+            raise ConnectionRefusedError("refused")
+
+        publisher = SpoolingPublisher(connect=connect, spool=self.spool)
+        self.assertFalse(publisher.connect())
+        message = publisher.publish("weather", b"{}", qos=1, retain=True)
+        self.assertIsNone(message.mid)
+        publisher.flush()
+        publisher.disconnect()
+        self.assertEqual(publisher.statistics()["published"], 0)
+        self.assertEqual(self.spool.depth, 1)
+
+        # the messages are forwarded after reconnect
+        mqtt_publisher = FakePublisher()
+        publisher = SpoolingPublisher(connect=lambda: mqtt_publisher, spool=self.spool, rate=None)
+        self.assertEqual(publisher.drain(), 1)
+        self.assertEqual(mqtt_publisher.published, [("weather", b"{}", 1, True)])
+        self.assertEqual(self.spool.depth, 0)
+
+    def test_disconnected(self):
+        mqtt_publisher = FakePublisher(connected=False)
+        publisher = SpoolingPublisher(connect=lambda: mqtt_publisher, spool=self.spool)
+        publisher.publish("weather", b"{}")
+        self.assertEqual(self.spool.depth, 1)
+        self.assertEqual(publisher.drain(), 0)
+
+        mqtt_publisher.connected = True
+        publisher.publish("weather", b"{}")
+        self.assertEqual(len(mqtt_publisher.published), 1)
+        self.assertEqual(self.spool.depth, 1)
+
+    def test_not_completed(self):
+        mqtt_publisher = FakePublisher(complete=False)
+        publisher = SpoolingPublisher(connect=lambda: mqtt_publisher, spool=self.spool)
+        publisher.connect()
+        publisher.publish("weather/1", b"1")
+        publisher.publish("weather/2", b"2")
+        publisher.flush()
+        self.assertEqual([message.topic for message in self.spool.peek(10)], ["weather/1", "weather/2"])
+
+    def test_subscribe(self):
+        calls = list()
+
+        class SubscribingPublisher(FakePublisher):
+            def subscribe(self, topic, callback, qos=0):
+                calls.append((topic, qos))
+
+        publisher = SpoolingPublisher(connect=SubscribingPublisher, spool=self.spool)
+        publisher.subscribe("weather/request", None, qos=1)
+        self.assertEqual(calls, [])
+        publisher.connect()
+        self.assertEqual(calls, [("weather/request", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,16 +17,42 @@ __version__ = ".".join(__version_info__)
 
 __all__ = ["TestWeather2Mqtt"]
 
+import datetime
 import logging
 import os
+import tempfile
+import time
 import unittest
+from test.openmeteo_fixtures import (
+    build_block,
+    build_response,
+    build_variable,
+    parse_responses,
+)
 
 import paho.mqtt.client as mqtt
+from openmeteo_sdk.Model import Model
 
+from src.app.bin.lib.locations import Locations
+from src.app.bin.lib.recorder import Recording, ResponseRecorder
+from src.app.bin.lib.spool import MessageSpool
 from src.app.bin.weather2mqtt import __initialize_mqtt_client as initialize_mqtt_client
 from src.app.bin.weather2mqtt import (
+    get_available_modes,
+    get_request_payload,
+    get_schedules,
+    get_topic,
+    handle_weather_request,
     initialize_logger,
     load_config_file,
+    parse_current_weather,
+    parse_daily_weather,
+    parse_day_offset,
+    parse_mqtt_targets,
+    parse_timeseries_weather,
+    prepare_weather_payload,
+    replay_weather_data,
+    run_replay,
 )
 
 
@@ -67,6 +93,256 @@ class TestWeather2Mqtt(unittest.TestCase):
         self.assertIsInstance(config["data"]["timezone"], str)
         self.assertEqual(config["data"]["timezone"], "UTC")
 
+    def test_load_config_file_multiple_modes(self):
+        os.environ["MODE"] = "current,tomorrow"
+        config = load_config_file()
+        self.assertEqual(list(config["modes"].keys()), ["current", "tomorrow"])
+        self.assertIn("current", config["data"])
+        self.assertIn("daily", config["data"])
+        self.assertEqual(config["data"]["forecast_days"], 3)
+        self.assertEqual(config["data"]["latitude"], 1.0)
+        os.environ["MODE"] = "current"
+
+    def test_get_topic(self):
+        os.environ["MQTT_TOPIC"] = "weather"
+        self.assertEqual(get_topic(), "weather")
+        self.assertEqual(get_topic(mode="current"), "weather")
+        os.environ["MODE"] = "current,tomorrow"
+        self.assertEqual(get_topic(mode="tomorrow"), "weather/tomorrow")
+        os.environ["MQTT_TOPIC"] = "weather/{mode}/data"
+        self.assertEqual(get_topic(mode="tomorrow"), "weather/tomorrow/data")
+        os.environ["MODE"] = "current"
+        del os.environ["MQTT_TOPIC"]
+
+    def test_prepare_weather_payload(self):
+        weather_result = {
+            "location": {"latitude": 1.0, "longitude": 2.0, "elevation": 3.0},
+            "current": {"time": "2026-01-01T00:00:00+00:00", "temperature_2m": 1.5, "rain": 0.0},
+            "daily": {"rain_sum": {"2026-01-01": 1.0}},
+        }
+        payload = prepare_weather_payload(
+            weather_result=weather_result, mode="current", mode_data={"current": ["temperature_2m"]}
+        )
+        self.assertEqual(payload["current"], {"time": "2026-01-01T00:00:00+00:00", "temperature_2m": 1.5})
+        self.assertNotIn("daily", payload)
+        self.assertIn("message_timestamp", payload)
+
+    def test_parse_day_offset(self):
+        self.assertEqual(parse_day_offset(1), (1, 1))
+        self.assertEqual(parse_day_offset([0, 2]), (0, 2))
+        self.assertEqual(parse_day_offset("2"), (2, 2))
+        self.assertEqual(parse_day_offset("-1..1"), (-1, 1))
+        self.assertRaises(ValueError, parse_day_offset, "2..1")
+        self.assertRaises(ValueError, parse_day_offset, [1, 2, 3])
+
+    def test_get_request_payload(self):
+        today = datetime.datetime.now(tz=datetime.timezone.utc).date()
+        config = {
+            "data": {"daily": ["rain_sum"], "forecast_days": 3, "timezone": "UTC"},
+            "modes": {"tomorrow": {"daily": ["rain_sum"], "day_offset": (1, 2)}},
+        }
+        payload = get_request_payload(config)
+        self.assertNotIn("forecast_days", payload)
+        self.assertEqual(payload["start_date"], (today + datetime.timedelta(days=1)).isoformat())
+        self.assertEqual(payload["end_date"], (today + datetime.timedelta(days=2)).isoformat())
+        self.assertEqual(config["data"]["forecast_days"], 3)
+
+        # the date in the timezone of the API is not known before the request
+        config["data"]["timezone"] = "auto"
+        config["modes"]["tomorrow"]["day_offset"] = (-1, 4)
+        payload = get_request_payload(config)
+        self.assertEqual((payload["forecast_days"], payload.get("past_days")), (5, 1))
+        self.assertNotIn("start_date", payload)
+
+        config["data"] = {"daily": ["rain_sum"], "hourly": ["rain"], "forecast_days": 3, "timezone": "UTC"}
+        config["modes"]["tomorrow"]["day_offset"] = (1, 1)
+        payload = get_request_payload(config)
+        self.assertEqual(payload["forecast_days"], 3)
+        self.assertNotIn("start_date", payload)
+
+    def test_prepare_weather_payload_day_offset(self):
+        # the time axis starts yesterday at midnight UTC
+        start = int(time.time()) // 86400 * 86400 - 86400
+        daily = build_block(
+            start,
+            start + 4 * 86400,
+            86400,
+            [
+                build_variable("rain", values=[0.0, 1.0, 2.0, 3.0], aggregation=10),
+                build_variable("weather_code", values=[0, 1, 2, 3]),
+            ],
+        )
+        block = parse_timeseries_weather(
+            data=parse_responses(build_response(daily=daily))[0].Daily(), fields=["rain_sum", "weather_code"]
+        )
+        dates = block.dates()
+        mode_data = {"daily": ["rain_sum", "weather_code"], "day_offset": (1, 1)}
+        payload = prepare_weather_payload(weather_result={"daily": block}, mode="tomorrow", mode_data=mode_data)
+        self.assertNotIn("daily", payload)
+        self.assertEqual(payload["tomorrow"]["date"], dates[2])
+        self.assertEqual(payload["tomorrow"]["rain_sum"], 2.0)
+        self.assertEqual(payload["tomorrow"]["weather_code"], 2)
+        self.assertIn("weather_code_text", payload["tomorrow"])
+
+        mode_data["day_offset"] = (0, 2)
+        payload = prepare_weather_payload(weather_result={"daily": block}, mode="forecast", mode_data=mode_data)
+        self.assertEqual(payload["daily"]["rain_sum"], {dates[1]: 1.0, dates[2]: 2.0, dates[3]: 3.0})
+
+        # a day outside the time axis is not published
+        mode_data["day_offset"] = (5, 5)
+        payload = prepare_weather_payload(weather_result={"daily": block}, mode="tomorrow", mode_data=mode_data)
+        self.assertNotIn("tomorrow", payload)
+
+    def test_parse_current_weather(self):
+        response = parse_responses(
+            build_response(
+                current=build_block(
+                    time=1767690000,
+                    time_end=1767690900,
+                    interval=900,
+                    variables=[
+                        build_variable("temperature", value=-6.5, altitude=2),
+                        build_variable("weather_code", value=71.0),
+                    ],
+                )
+            )
+        )[0]
+        parsed = parse_current_weather(data=response.Current(), fields=["temperature_2m", "weather_code"])
+        self.assertEqual(parsed["time"], "2026-01-06T09:00:00+00:00")
+        self.assertEqual(parsed["temperature_2m"], -6.5)
+        self.assertEqual(parsed["weather_code"], 71)
+        self.assertEqual(parsed["weather_code_text"], "Snow fall: Slight intensity")
+
+    def test_parse_daily_weather(self):
+        response = parse_responses(
+            build_response(
+                daily=build_block(
+                    time=1767657600,
+                    time_end=1767657600 + 2 * 86400,
+                    interval=86400,
+                    variables=[
+                        build_variable("weather_code", values=[3.0, float("nan")]),
+                        build_variable("sunrise", values_int64=[1767686400, 1767772800]),
+                    ],
+                )
+            )
+        )[0]
+        parsed = parse_daily_weather(data=response.Daily(), fields=["weather_code", "sunrise"], utc_offset_seconds=0)
+        self.assertEqual(parsed["weather_code"]["2026-01-06"], 3)
+        self.assertEqual(parsed["weather_code_text"], {"2026-01-06": "Cloudy", "2026-01-07": "Unknown weather code"})
+        self.assertEqual(parsed["sunrise"]["2026-01-06"], "2026-01-06T08:00:00+00:00")
+
+    def test_replay_weather_data(self):
+        os.environ["GRID_DEDUP"] = "false"
+        current = build_block(1767657600, 1767658500, 900, [build_variable("temperature", value=4.5, altitude=2)])
+        body = build_response(location_id=0, current=current) + build_response(location_id=1, current=current)
+        params = {"current": ["temperature_2m"], "latitude": "1.0,3.0", "longitude": "2.0,4.0"}
+        config = {
+            "data": {"current": ["temperature_2m"]},
+            "locations": Locations.from_string("a:1.0,2.0;b:3.0,4.0"),
+        }
+        results = replay_weather_data([Recording(1767657600, 1767657600, params, body)], config)
+        self.assertEqual([location.id for location, _ in results], ["a", "b"])
+        self.assertEqual(results[1][1]["location"]["id"], "b")
+        self.assertEqual(results[1][1]["current"]["temperature_2m"], 4.5)
+
+        config["locations"] = Locations.from_string("c:5.0,6.0")
+        self.assertRaises(ValueError, replay_weather_data, [Recording(0, 0, params, body)], config)
+        del os.environ["GRID_DEDUP"]
+
+    def test_run_replay(self):
+        current = build_block(1767657600, 1767658500, 900, [build_variable("temperature", value=4.5, altitude=2)])
+        config = {"data": {"current": ["temperature_2m"]}, "modes": {"current": {"current": ["temperature_2m"]}}}
+        with tempfile.TemporaryDirectory() as directory:
+            replay_file = os.path.join(directory, "recording.bin")
+            recorder = ResponseRecorder(replay_file, clock=lambda: 1767657600)
+            recorder.start_cycle()
+            recorder.record(
+                {"current": ["temperature_2m"], "latitude": "1.0", "longitude": "2.0"}, build_response(current=current)
+            )
+            os.environ.update(
+                {"REPLAY_FILE": replay_file, "MQTT_TOPIC": "weather", "SPOOL_DIR": os.path.join(directory, "spool")}
+            )
+            try:
+                # the default environment publishes without spool, the MQTT server is not reachable
+                with self.assertRaises(Exception) as context:
+                    run_replay(config)
+                self.assertNotIsInstance(context.exception, AttributeError)
+
+                # the spooling publisher keeps the messages while the MQTT server is not reachable
+                os.environ["SPOOL"] = "true"
+                run_replay(config)
+                self.assertEqual(MessageSpool(directory=os.path.join(directory, "spool")).depth, 1)
+            finally:
+                for name in ["REPLAY_FILE", "MQTT_TOPIC", "SPOOL_DIR", "SPOOL"]:
+                    os.environ.pop(name, None)
+
+    def test_replay_weather_data_ensemble(self):
+        os.environ["GRID_DEDUP"] = "false"
+        body = b""
+        for model, temperature, weather_code in [(Model.icon_seamless, 4.0, 3.0), (Model.gfs_seamless, 5.0, 61.0)]:
+            current = build_block(
+                1767657600,
+                1767658500,
+                900,
+                [
+                    build_variable("temperature", value=temperature, altitude=2),
+                    build_variable("weather_code", value=weather_code),
+                ],
+            )
+            body += build_response(location_id=0, model=model, current=current)
+        params = {"current": ["temperature_2m", "weather_code"], "latitude": "1.0", "longitude": "2.0"}
+        config = {"data": {"current": params["current"]}, "locations": Locations.from_string("a:1.0,2.0")}
+        results = replay_weather_data([Recording(1767657600, 1767657600, params, body)], config)
+        self.assertEqual(len(results), 1)
+        result = results[0][1]
+        self.assertEqual(result["ensemble"], {"models": ["icon_seamless", "gfs_seamless"]})
+        self.assertEqual(result["current"]["temperature_2m"], 4.5)
+        self.assertEqual(result["current"]["weather_code"], 61)
+        self.assertEqual(result["current"]["weather_code_text"], "Rain: Slight intensity")
+
+        payload = prepare_weather_payload(result, mode="current", mode_data={"current": ["temperature_2m"]})
+        self.assertEqual(payload["ensemble"], {"models": ["icon_seamless", "gfs_seamless"]})
+        self.assertEqual(
+            list(payload["current"].keys()),
+            [
+                "time",
+                "temperature_2m",
+                "temperature_2m_ensemble_min",
+                "temperature_2m_ensemble_max",
+                "temperature_2m_ensemble_spread",
+                "weather_code_text",
+            ],
+        )
+        del os.environ["GRID_DEDUP"]
+
+    def test_handle_weather_request_validation(self):
+        config = {"data": {}, "modes": {"current": {"current": ["temperature_2m"]}}}
+        self.assertEqual(get_available_modes(), ["current", "hourly", "minutely_15", "tomorrow"])
+        self.assertRaises(ValueError, handle_weather_request, {"latitude": 1.0}, config)
+        self.assertRaises(ValueError, handle_weather_request, {"latitude": "x", "longitude": 2.0}, config)
+        self.assertRaises(ValueError, handle_weather_request, {"latitude": 91.0, "longitude": 2.0}, config)
+        self.assertRaises(
+            ValueError, handle_weather_request, {"latitude": 1.0, "longitude": 2.0, "mode": "../x"}, config
+        )
+        self.assertRaises(ValueError, handle_weather_request, {"latitude": 1.0, "longitude": 2.0, "mode": ""}, config)
+        self.assertRaises(ValueError, handle_weather_request, {"history": "default/current/temperature_2m"}, config)
+
+    def test_get_schedules(self):
+        mode = os.environ.get("MODE")
+        os.environ["MODE"] = "current,tomorrow,daily"
+        os.environ["SCHEDULE"] = "10m"
+        os.environ["SCHEDULE_TOMORROW"] = "0 18 * * *"
+        try:
+            schedules = get_schedules()
+        finally:
+            os.environ["MODE"] = mode or "current"
+            del os.environ["SCHEDULE"]
+            del os.environ["SCHEDULE_TOMORROW"]
+        self.assertEqual([modes for modes, scheduler in schedules], [["current", "daily"], ["tomorrow"]])
+        self.assertEqual(schedules[0][1].interval, 600)
+        self.assertEqual(schedules[1][1].expression, "0 18 * * *")
+
     def test_initialize_mqtt_client(self):
         mqtt_client = initialize_mqtt_client()
         self.assertIsInstance(mqtt_client, mqtt.Client)
@@ -76,6 +352,37 @@ class TestWeather2Mqtt(unittest.TestCase):
         self.assertEqual(mqtt_client._host, "")
         self.assertEqual(mqtt_client._port, 1883)
 
+        targets = parse_mqtt_targets('[{"name": "edge", "server": "edge.local", "username": "u", "password": "p"}]')
+        mqtt_client = initialize_mqtt_client(target=targets[0])
+        self.assertEqual(mqtt_client._username, b"u")
+        self.assertEqual(mqtt_client._password, b"p")
+
+    def test_parse_mqtt_targets(self):
+        os.environ["MQTT_SERVER"] = "broker.local"
+        os.environ["MQTT_QOS"] = "1"
+        try:
+            targets = parse_mqtt_targets()
+            self.assertEqual(len(targets), 1)
+            self.assertEqual(
+                (targets[0]["name"], targets[0]["server"], targets[0]["qos"]), ("default", "broker.local", 1)
+            )
+
+            targets = parse_mqtt_targets(
+                '[{"name": "edge", "retain": true},'
+                ' {"server": "central.example.com", "port": 8883, "tls": true, "qos": 2}]'
+            )
+            self.assertEqual([target["name"] for target in targets], ["edge", "central.example.com"])
+            self.assertEqual((targets[0]["server"], targets[0]["qos"], targets[0]["retain"]), ("broker.local", 1, True))
+            self.assertEqual((targets[1]["port"], targets[1]["tls"], targets[1]["qos"]), (8883, True, 2))
+        finally:
+            del os.environ["MQTT_SERVER"]
+            del os.environ["MQTT_QOS"]
+
+        self.assertRaises(ValueError, parse_mqtt_targets, "[]")
+        self.assertRaises(ValueError, parse_mqtt_targets, '[{"name": "a"}, {"name": "a"}]')
+        self.assertRaises(ValueError, parse_mqtt_targets, '[{"name": "a", "qos": 3}]')
+        self.assertRaises(ValueError, parse_mqtt_targets, '[{"name": "a", "hostname": "x"}]')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -5,14 +5,14 @@ test_weather_codes.py is a python unit test for the python module
 Author: Michael Oberdorf
 Date:   2025-04-11
 Last modified by: Michael Oberdorf
-Last modified at: 2026-01-11
+Last modified at: 2026-10-18
 ***************************************************************************
 """
 
 __author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
 __status__ = "production"
-__date__ = "2026-01-11"
-__version_info__ = ("1", "1", "0")
+__date__ = "2026-10-18"
+__version_info__ = ("1", "2", "0")
 __version__ = ".".join(__version_info__)
 
 __all__ = ["TestWeatherCodes"]
@@ -72,6 +72,32 @@ class TestWeatherCodes(unittest.TestCase):
         # Check if NaN is handled correctly
         self.assertEqual(WeatherCodes().translate(code=float("nan")), "Unknown weather code")
 
+    def test_translate_many(self):
+        self.assertEqual(
+            WeatherCodes().translate_many([0, 3.0, float("nan"), 199, -1]),
+            ["Clear sky", "Cloudy", "Unknown weather code", "Unknown weather code", "Unknown weather code"],
+        )
+        self.assertEqual(WeatherCodes(language="de").translate_many([45]), ["Nebel"])
+        self.assertEqual(WeatherCodes().translate_many([]), [])
+
+    def test_weather_codes(self):
+        weather_codes = WeatherCodes(language="de").weather_codes
+        self.assertEqual(weather_codes["45"], "Nebel")
+        # the translations are shared, so they are read-only
+        with self.assertRaises(TypeError):
+            weather_codes["45"] = "Fog"
+        with self.assertRaises(AttributeError):
+            WeatherCodes().weather_codes = dict()
+        self.assertEqual(WeatherCodes(language="foo").weather_codes["77"], "Snow Grains")
+        self.assertEqual(WeatherCodes().translate_many([]), [])
+
+    def test_shared_table(self):
+        # the translation file is loaded only once per language
+        self.assertIs(WeatherCodes(language="de").table, WeatherCodes(language="de").table)
+        self.assertIs(WeatherCodes.get_table("en"), WeatherCodes().table)
+        self.assertIn("de", WeatherCodes.languages())
+        self.assertIn("en", WeatherCodes.languages())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,152 @@
+"""
+***************************************************************************
+test_weather_parser.py is a python unit test for the python module
+   weather_parser
+Author: Michael Oberdorf
+Date:   2026-10-18
+Last modified by: Michael Oberdorf
+Last modified at: 2026-10-18
+***************************************************************************
+"""
+
+__author__ = "Michael Oberdorf <info@oberdorf-itc.de>"
+__status__ = "production"
+__date__ = "2026-10-18"
+__version_info__ = ("1", "0", "0")
+__version__ = ".".join(__version_info__)
+
+__all__ = ["TestWeatherParser"]
+
+import math
+import unittest
+from test.openmeteo_fixtures import (
+    build_block,
+    build_response,
+    build_variable,
+    parse_responses,
+)
+
+import numpy as np
+
+from src.app.bin.lib.weather_parser import WeatherBlock
+
+# 2026-01-06T00:00:00+01:00
+START = 1767654000
+DAY = 86400
+
+
+def daily_response():
+    return parse_responses(
+        build_response(
+            utc_offset_seconds=3600,
+            daily=build_block(
+                time=START,
+                time_end=START + 3 * DAY,
+                interval=DAY,
+                variables=[
+                    build_variable("temperature", values=[1.5, 2.5, 3.5], altitude=2),
+                    build_variable("weather_code", values=[3.0, float("nan"), 71.0]),
+                    build_variable("sunrise", values_int64=[START + 8 * 3600, START + DAY + 8 * 3600, 0]),
+                ],
+            ),
+        )
+    )[0]
+
+
+class TestWeatherParser(unittest.TestCase):
+    def test_time_axis(self):
+        block = WeatherBlock(
+            data=daily_response().Daily(), fields=["temperature_2m", "weather_code", "sunrise"], utc_offset_seconds=3600
+        )
+        self.assertEqual(len(block), 3)
+        self.assertEqual(block.dates(), ["2026-01-06", "2026-01-07", "2026-01-08"])
+        self.assertEqual(block.isoformat()[1], "2026-01-07T00:00:00+01:00")
+        self.assertEqual(block.utc_offset, "+01:00")
+
+    def test_values(self):
+        block = WeatherBlock(data=daily_response().Daily(), fields=["temperature_2m", "weather_code", "sunrise"])
+        self.assertEqual(block.values("temperature_2m"), [1.5, 2.5, 3.5])
+        weather_codes = block.values("weather_code")
+        self.assertEqual(weather_codes[0], 3)
+        self.assertIsInstance(weather_codes[0], int)
+        self.assertTrue(math.isnan(weather_codes[1]))
+        self.assertEqual(block.values("sunrise")[0], "2026-01-06T07:00:00+00:00")
+
+    def test_rows(self):
+        block = WeatherBlock(
+            data=daily_response().Daily(), fields=["temperature_2m", "weather_code", "sunrise"], utc_offset_seconds=3600
+        )
+        self.assertEqual(block.dates(slice(1, 2)), ["2026-01-07"])
+        self.assertEqual(block.values("temperature_2m", slice(1, 3)), [2.5, 3.5])
+        self.assertEqual(block.values("sunrise", slice(1, 2)), ["2026-01-07T08:00:00+01:00"])
+
+    def test_day_index(self):
+        block = WeatherBlock(data=daily_response().Daily(), fields=["temperature_2m"], utc_offset_seconds=3600)
+        # 2026-01-06T23:30:00+01:00 is still the 6th in local time
+        now = START + DAY - 1800
+        self.assertEqual(block.day_index(now=now), 0)
+        self.assertEqual(block.day_index(offset=1, now=now), 1)
+        self.assertEqual(block.day_index(offset=2, now=now), 2)
+        self.assertEqual(block.day_index(offset=3, now=now), -1)
+        self.assertEqual(block.day_index(offset=-1, now=now), -1)
+        self.assertEqual(block.day_index(offset=1, now=now + 3600), 2)
+
+    def test_negative_utc_offset(self):
+        block = WeatherBlock(data=daily_response().Daily(), fields=["temperature_2m"], utc_offset_seconds=-9000)
+        self.assertEqual(block.utc_offset, "-02:30")
+
+    def test_to_columns(self):
+        block = WeatherBlock(data=daily_response().Daily(), fields=["temperature_2m", "weather_code", "sunrise"])
+        columns = block.to_columns(fields=["temperature_2m"], extra_columns={"weather_code_text": ["a", "b", "c"]})
+        self.assertEqual(list(columns.keys()), ["time", "temperature_2m", "weather_code_text"])
+        self.assertEqual(columns["temperature_2m"], [1.5, 2.5, 3.5])
+        self.assertEqual(len(columns["time"]), 3)
+
+    def test_timesteps(self):
+        block = WeatherBlock(data=daily_response().Daily(), fields=["temperature_2m", "weather_code", "sunrise"])
+        timesteps = block.timesteps(fields=["temperature_2m", "weather_code"])
+        self.assertEqual(
+            next(timesteps), {"time": "2026-01-05T23:00:00+00:00", "temperature_2m": 1.5, "weather_code": 3}
+        )
+        self.assertEqual(len(list(timesteps)), 2)
+
+    def test_field_indexes(self):
+        # the API returns the variables of the deduplicated request, not necessarily in the requested order
+        response = parse_responses(
+            build_response(
+                daily=build_block(
+                    time=START,
+                    time_end=START + DAY,
+                    interval=DAY,
+                    variables=[
+                        build_variable("temperature", values=[7.5], altitude=2, aggregation=2),
+                        build_variable("rain", values=[1.2], aggregation=10),
+                        build_variable("temperature", values=[-1.5], altitude=2, aggregation=1),
+                    ],
+                ),
+            )
+        )[0]
+        fields = ["temperature_2m_min", "temperature_2m_max", "rain_sum", "temperature_2m_min", "unknown"]
+        with self.assertLogs("src.app.bin.lib.weather_parser", level="WARNING"):
+            self.assertEqual(WeatherBlock.field_indexes(response.Daily(), fields), [2, 0, 1, 2, -1])
+        # a field with an unknown name does not get the values of another variable
+        with self.assertLogs("src.app.bin.lib.weather_parser", level="WARNING"):
+            self.assertEqual(WeatherBlock.field_indexes(response.Daily(), ["unknown", "rain_sum"]), [-1, 1])
+        self.assertEqual(WeatherBlock.variable_name(response.Daily().Variables(1)), "rain_sum")
+        block = WeatherBlock(data=response.Daily(), fields=["temperature_2m_min", "temperature_2m_max", "rain_sum"])
+        self.assertEqual(block.columns["temperature_2m_min"].tolist(), [-1.5])
+        self.assertEqual(block.columns["temperature_2m_max"].tolist(), [7.5])
+
+    def test_missing_block(self):
+        self.assertRaises(ValueError, WeatherBlock, data=None, fields=[])
+
+    def test_round_float32(self):
+        values = np.array([4.32, 1013.25, 0.1, -3.7, 0.0, np.nan], dtype=np.float32)
+        self.assertEqual(np.float32(4.32).item(), 4.320000171661377)
+        result = WeatherBlock.round_float32(values).tolist()
+        self.assertEqual(result[0:5], [4.32, 1013.25, 0.1, -3.7, 0.0])
+        self.assertTrue(math.isnan(result[5]))
+
+
+if __name__ == "__main__":
+    unittest.main()